@@ -1,10 +1,58 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
+
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from app.routers import trigger, event_log
+from app.routers import trigger, event_log, debug
+from app.services.cache import cache_client
 from app.services.db import Base, engine
-from app.services.trigger_scheduler import initialize_scheduler, shutdown_scheduler
+from app.services.trigger_scheduler import (
+    SchedulerState,
+    scheduler,
+    shutdown_scheduler,
+    start_scheduler,
+)
+from app.services.profiling import ProfilingConfig, ProfilingMiddleware
+
+
+def configure_logging():
+    """Log INFO and above from the app's modules to stderr (once per process)."""
+    logger = logging.getLogger("app")
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+@lru_cache(maxsize=None)
+def _templates():
+    # jinja2 is only imported once the index page is requested
+    from fastapi.templating import Jinja2Templates
+
+    return Jinja2Templates(directory="static")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    # Loading the triggers runs in the background so requests are served
+    # right away; /ready reports when the scheduler is up.
+    start = asyncio.create_task(start_scheduler())
+    try:
+        yield
+    finally:
+        if not start.done():
+            start.cancel()
+            with suppress(asyncio.CancelledError):
+                await start
+        await shutdown_scheduler()
+        await cache_client.cleanup()
 
 
 def create_app() -> FastAPI:
@@ -12,28 +60,43 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Event Trigger Platform",
         description="A platform to manage and execute event triggers (Scheduled and API-based).",
+        lifespan=lifespan,
     )
 
-    # scheduler initialization and shutdown
-    @app.on_event("startup")
-    def startup_event():
-        initialize_scheduler()
-
-    @app.on_event("shutdown")
-    def shutdown_event():
-        shutdown_scheduler()
-
     app.mount("/static", StaticFiles(directory="static"), name="static")
-    templates = Jinja2Templates(directory="static")
     # all the routers
     app.include_router(trigger.router, prefix="/triggers", tags=["Triggers"])
     app.include_router(event_log.router, prefix="/event-logs", tags=["Event Logs"])
 
+    # Large listings (triggers, event logs) are compressed; level 6 is several
+    # times cheaper than the default 9 for a slightly larger body
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+    # Opt-in profiling: not installed at all unless enabled
+    if ProfilingConfig.ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+        app.include_router(debug.router, prefix="/debug", tags=["Debug"])
+
     # Health check endpoints
     @app.get("/health", tags=["Health"])
     def health_check():
         return {"status": "ok", "message": "Event Trigger Platform is up and running!"}
 
+    @app.get("/ready", tags=["Health"])
+    def readiness_check():
+        """200 once the scheduler has loaded the triggers, 503 otherwise."""
+        ready = scheduler.state == SchedulerState.READY
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={"status": scheduler.state.value},
+        )
+
+    @app.get("/metrics/dispatch", tags=["Health"])
+    async def dispatch_metrics():
+        """Peak-to-average load and lateness of the recent scheduled fires."""
+        # On the event loop, which records the dispatches, not in a worker
+        return scheduler.dispatch_stats()
+
     @app.get("/db-health", tags=["Health"])
     def db_health_check():
         try:
@@ -48,7 +111,7 @@ def create_app() -> FastAPI:
     # Serve the index.html file
     @app.get("/", response_class=HTMLResponse)
     async def serve_index(request: Request):
-        return templates.TemplateResponse("index.html", {"request": request})
+        return _templates().TemplateResponse("index.html", {"request": request})
 
     return app
 
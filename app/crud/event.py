@@ -1,57 +1,202 @@
 import logging
 import json
+from typing import Callable, Iterable, List, Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models import EventLog
+from sqlalchemy import MetaData, Select, Table, delete, func, select, union_all
+from app.models import EventLog, EventPayload, EventString
+from app.services.archive import SEGMENT_FIELDS, ArchiveConfig, EventArchive
 from app.services.cache import cache_client
-from app.utils.eventlogs import deserialize_logs, serialize_logs
+from app.services.dedup import event_content
+from app.services.partitions import event_log_partitions
+from app.services.profiling import span, timed
+from app.utils.eventlogs import LOG_FIELDS, LOG_FETCH_SIZE, encode_log_rows
 import datetime
 
 logger = logging.getLogger(__name__)
 
 
-async def get_recent_logs(db: Session, hours: int = 2):
+# Fields partitions store as ids: the id column and the table it points into
+_INTERNED = {
+    "name": ("name_id", EventString.__table__, "value"),
+    "trigger_type": ("type_id", EventString.__table__, "value"),
+    "payload": ("payload_id", EventPayload.__table__, "body"),
+}
+
+
+def add_event_logs(db: Session, rows: Iterable[dict]):
+    """Insert event logs into the partitions of their triggered_at, with
+    their names, types and payloads deduplicated."""
+    rows = event_content(db).encode_rows(db, rows)
+    event_log_partitions(db).insert(db, rows)
+
+
+def upgrade_event_logs(db: Session):
+    """
+    Rewrite the SQLite partitions created before deduplication with ids.
+    On Postgres their rows keep the text columns, which reads fall back to.
+    """
+    partitions = event_log_partitions(db)
+    content = event_content(db)
+    for start in partitions.legacy_periods(db):
+        name = partitions.name(start)
+        legacy = Table(name, MetaData(), autoload_with=db.connection())
+        rows = [row._asdict() for row in db.execute(select(legacy))]
+        partitions.drop(db, start)
+        encoded = content.encode_rows(db, rows)
+        # Ids are kept: clients may hold them
+        for row, ids in zip(rows, encoded):
+            ids["id"] = row["id"]
+        partitions.insert(db, encoded)
+        logger.info(f"Upgraded {len(rows)} event logs of {name}")
+
+
+def _select_logs(table: Table, fields: Sequence[str]) -> Select:
+    """Select `fields` of one log table, joining back the interned text."""
+    source = table
+    columns = []
+    for field in fields:
+        if field not in _INTERNED or _INTERNED[field][0] not in table.c:
+            columns.append(table.c[field])
+            continue
+        id_column, values, value = _INTERNED[field]
+        joined = values.alias(f"{field}_values")
+        source = source.outerjoin(joined, joined.c.id == table.c[id_column])
+        column = joined.c[value]
+        if field in table.c:
+            # Postgres: rows from before deduplication still hold the text
+            column = func.coalesce(column, table.c[field])
+        columns.append(column.label(field))
+    return select(*columns).select_from(source)
+
+
+def select_event_logs(
+    db: Session,
+    fields: Sequence[str] = LOG_FIELDS,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+) -> Select:
+    """Select `fields` of the logs triggered in [start, end), from only the
+    partitions overlapping that range."""
+    partitions = event_log_partitions(db)
+    if partitions.native:
+        # Postgres prunes the partitions of event_logs itself
+        tables = [partitions.parent]
+    else:
+        # event_logs keeps the rows written before partitioning until they expire
+        tables = [EventLog.__table__]
+        tables += [partitions.table(p) for p in partitions.between(db, start, end)]
+    selects = []
+    for table in tables:
+        query = _select_logs(table, fields)
+        if start is not None:
+            query = query.where(table.c.triggered_at >= start)
+        if end is not None:
+            query = query.where(table.c.triggered_at < end)
+        selects.append(query)
+    return selects[0] if len(selects) == 1 else union_all(*selects)
+
+
+def compact_event_logs(
+    db: Session, archive: EventArchive, now: datetime.datetime
+) -> List[datetime.datetime]:
+    """
+    Write an archive segment for every sealed partition that has none yet.
+    Returns the compacted period starts.
+    """
+    partitions = event_log_partitions(db)
+    sealed = now - datetime.timedelta(seconds=ArchiveConfig.SEAL_DELAY_SECONDS)
+    compacted = []
+    for start in partitions.periods(db):
+        end = start + partitions.period
+        if end > sealed:
+            break
+        if archive.has(start):
+            continue
+        rows = db.execute(
+            select_event_logs(db, fields=SEGMENT_FIELDS, start=start, end=end)
+        )
+        archive.write(start, end, rows)
+        compacted.append(start)
+    return compacted
+
+
+def expire_event_logs(
+    db: Session,
+    cutoff: datetime.datetime,
+    now: datetime.datetime,
+    archived: Optional[Callable[[datetime.datetime], bool]] = None,
+) -> List[datetime.datetime]:
+    """
+    Drop the partitions whose whole period is before `cutoff` (only those
+    `archived` accepts, when given), and create the next period's partition
+    ahead of its first insert. Returns the dropped period starts.
+    """
+    partitions = event_log_partitions(db)
+    dropped = partitions.drop_before(db, cutoff, can_drop=archived)
+    if not partitions.native:
+        db.execute(delete(EventLog).where(EventLog.triggered_at < cutoff))
+    partitions.ensure(db, now + partitions.period)
+    return dropped
+
+
+def _encode_logs(db: Session, **time_range) -> bytes:
+    # Plain column tuples, streamed: no ORM instances, identity map or
+    # pydantic models, and no full list of rows next to the body
+    rows = db.execute(
+        select_event_logs(db, **time_range),
+        execution_options={"yield_per": LOG_FETCH_SIZE},
+    )
+    with span("serialize.event_logs"):
+        return encode_log_rows(rows)
+
+
+@timed("crud.get_recent_logs")
+async def get_recent_logs(db: Session, hours: int = 2) -> bytes:
+    """JSON body of the logs from the last `hours`."""
     cache_key = "recent_logs"
 
     try:
         cached_logs = await cache_client.get(cache_key)
         if cached_logs:
-            return deserialize_logs(cached_logs)
+            return cached_logs
     except Exception as e:
         logger.warning(f"Cache read failed: {str(e)}")
 
     two_hours_ago = datetime.datetime.utcnow() - datetime.timedelta(hours=hours)
-    logs = db.query(EventLog).filter(EventLog.triggered_at >= two_hours_ago).all()
+    body = _encode_logs(db, start=two_hours_ago)
 
     try:
-        await cache_client.set(cache_key, serialize_logs(logs), expire=10)
+        await cache_client.set(cache_key, body, expire=10)
     except Exception as e:
         logger.warning(f"Cache write failed: {str(e)}")
 
-    return logs
+    return body
 
 
-async def get_archived_logs(db: Session, hours: int = 2):
+@timed("crud.get_archived_logs")
+async def get_archived_logs(db: Session, hours: int = 2) -> bytes:
+    """JSON body of the logs older than `hours`."""
     cache_key = "archived_logs"
 
     try:
         cached_logs = await cache_client.get(cache_key)
         if cached_logs:
-            return deserialize_logs(cached_logs)
+            return cached_logs
     except Exception as e:
         logger.warning(f"Cache read failed: {str(e)}")
 
     two_hours_ago = datetime.datetime.utcnow() - datetime.timedelta(hours=hours)
-    logs = db.query(EventLog).filter(EventLog.triggered_at < two_hours_ago).all()
+    body = _encode_logs(db, end=two_hours_ago)
 
     try:
-        await cache_client.set(cache_key, serialize_logs(logs), expire=600)
+        await cache_client.set(cache_key, body, expire=600)
     except Exception as e:
         logger.warning(f"Cache write failed: {str(e)}")
 
-    return logs
+    return body
 
 
+@timed("crud.get_event_stats")
 async def get_event_stats(db: Session):
     cache_key = "event-log-stats"
 
@@ -62,11 +207,12 @@ async def get_event_stats(db: Session):
     except Exception as e:
         logger.warning(f"Cache read failed: {str(e)}")
 
-    logs = (
-        db.query(EventLog.name, func.count(EventLog.id).label("event_count"))
-        .group_by(EventLog.name)
-        .all()
-    )
+    names = select_event_logs(db, fields=("name",)).subquery()
+    logs = db.execute(
+        select(names.c.name, func.count().label("event_count")).group_by(
+            names.c.name
+        )
+    ).all()
     response_logs = [{"name": log[0], "event_count": log[1]} for log in logs]
     try:
         await cache_client.set(cache_key, json.dumps(response_logs), expire=300)
@@ -2,32 +2,91 @@ from datetime import datetime
 from json import dumps, loads
 import json
 import logging
+from typing import List, Optional, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from json import loads
 
-from app.models import Trigger
+from app.models import Trigger, TriggerTombstone
 from app.schemas import TriggerCreate
 from app.utils.trigger import generate_test_id, serialize_trigger
+from app.services.executions import Execution
 from app.services.trigger_scheduler import scheduler
 from app.services.cache import cache_client
+from app.services.profiling import timed
+
+
+# Columns a listing may be restricted to (the TriggerResponse fields)
+LISTING_FIELDS = (
+    "id",
+    "name",
+    "trigger_type",
+    "payload",
+    "schedule",
+    "is_recurring",
+    "interval_seconds",
+    "jitter_seconds",
+)
+
+
+@timed("crud.get_all_triggers")
+def get_all_triggers(
+    db: Session,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Sequence[str] = LISTING_FIELDS,
+) -> List[dict]:
+    """
+    Triggers as dicts of `fields`, in id order.
+
+    Pages are keyed by the last id seen (`after_id`), so each page is an
+    index range scan. Only the requested columns are selected.
+    """
+    query = db.query(*(getattr(Trigger, field) for field in fields))
+    if after_id is not None:
+        query = query.filter(Trigger.id > after_id)
+    query = query.order_by(Trigger.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return [dict(zip(fields, row)) for row in query]
+
+
+@timed("crud.get_trigger_by_id")
+def get_trigger_by_id(db: Session, trigger_id: int):
+    return db.query(Trigger).filter(Trigger.id == trigger_id).first()
 
 
-def get_all_triggers(db: Session):
-    return db.query(Trigger).all()
+async def _attach_execution(
+    trigger: Trigger, execution: Optional[Execution], wait: float
+):
+    """Expose a queued API execution on the trigger returned to the client,
+    after waiting up to `wait` seconds for it to finish."""
+    if execution is None:
+        return
+    if wait:
+        await scheduler.executions.wait(execution, wait)
+    trigger.execution = execution
 
 
-def get_trigger_by_id(db: Session, trigger_id: int):
-    return db.query(Trigger).filter(Trigger.id == trigger_id).first()
+async def get_execution(execution_id: str, wait: float = 0) -> Optional[Execution]:
+    """An API-trigger execution, waiting up to `wait` seconds for it to finish."""
+    execution = scheduler.executions.get(execution_id)
+    if execution is not None and wait:
+        await scheduler.executions.wait(execution, wait)
+    return execution
 
 
-async def create_trigger_in_db(trigger: TriggerCreate, db: Session) -> Trigger:
+@timed("crud.create_trigger_in_db")
+async def create_trigger_in_db(
+    trigger: TriggerCreate, db: Session, wait: float = 0
+) -> Trigger:
     try:
         new_trigger = Trigger(
             name=trigger.name,
             trigger_type=trigger.trigger_type,
             schedule=trigger.schedule,
             interval_seconds=trigger.interval_seconds,
+            jitter_seconds=trigger.jitter_seconds,
             is_recurring=trigger.is_recurring,
             payload=trigger.payload,
         )
@@ -35,36 +94,22 @@ async def create_trigger_in_db(trigger: TriggerCreate, db: Session) -> Trigger:
         db.add(new_trigger)
         db.commit()
         db.refresh(new_trigger)
-        await scheduler.add_trigger(new_trigger)
+        execution = await scheduler.add_trigger(new_trigger)
+        await _attach_execution(new_trigger, execution, wait)
         return new_trigger
     except SQLAlchemyError as e:
         db.rollback()
         raise e
 
 
-async def update_trigger(db: Session, trigger_id: int, trigger_data: dict):
-    existing_trigger = db.query(Trigger).filter(Trigger.id == trigger_id).first()
-    if not existing_trigger:
-        return None
-    for key, value in trigger_data.items():
-        setattr(existing_trigger, key, value)
-    existing_trigger.updated_at = datetime.utcnow()
-    existing_trigger.validate_trigger()
-    scheduler.remove_trigger(trigger_id)
-
-    await scheduler.add_trigger(existing_trigger)
-
-    db.commit()
-    db.refresh(existing_trigger)
-    return existing_trigger
-
-
+@timed("crud.delete_trigger_from_db")
 async def delete_trigger_from_db(db: Session, trigger_id: int):
     trigger = db.query(Trigger).filter(Trigger.id == trigger_id).first()
     if not trigger:
         return None
     try:
         db.delete(trigger)
+        db.merge(TriggerTombstone(trigger_id=trigger_id, deleted_at=datetime.utcnow()))
         db.commit()
         scheduler.remove_trigger(trigger_id)
         return trigger
@@ -73,7 +118,10 @@ async def delete_trigger_from_db(db: Session, trigger_id: int):
         raise
 
 
-async def update_trigger_in_db(db: Session, trigger_id: int, trigger_data: dict):
+@timed("crud.update_trigger_in_db")
+async def update_trigger_in_db(
+    db: Session, trigger_id: int, trigger_data: dict, wait: float = 0
+):
     try:
         existing_trigger = db.query(Trigger).filter(Trigger.id == trigger_id).first()
         if not existing_trigger:
@@ -87,21 +135,30 @@ async def update_trigger_in_db(db: Session, trigger_id: int, trigger_data: dict)
 
         db.commit()
         db.refresh(existing_trigger)
-        scheduler.remove_trigger(trigger_id)
-        await scheduler.add_trigger(existing_trigger)
+        # Applied here rather than left to reconciliation, so the caller sees
+        # its own write; API triggers still run on every update.
+        if existing_trigger.trigger_type == "api":
+            # add_trigger drops the job of a formerly scheduled trigger; its
+            # fire count, and so {{seq}}, carries on across updates
+            execution = await scheduler.add_trigger(existing_trigger)
+            await _attach_execution(existing_trigger, execution, wait)
+        else:
+            await scheduler.apply_change(existing_trigger)
         return existing_trigger
     except SQLAlchemyError:
         db.rollback()
         raise
 
 
-async def create_test_trigger(trigger_data: TriggerCreate):
+@timed("crud.create_test_trigger")
+async def create_test_trigger(trigger_data: TriggerCreate, wait: float = 0):
     # Create trigger object
     new_trigger = Trigger(
         name=trigger_data.name,
         trigger_type=trigger_data.trigger_type,
         schedule=trigger_data.schedule,
         interval_seconds=trigger_data.interval_seconds,
+        jitter_seconds=trigger_data.jitter_seconds,
         is_recurring=trigger_data.is_recurring,
         payload=trigger_data.payload,
     )
@@ -128,7 +185,8 @@ async def create_test_trigger(trigger_data: TriggerCreate):
     )
 
     # Add to scheduler after caching
-    await scheduler.add_trigger(new_trigger, test=True)
+    execution = await scheduler.add_trigger(new_trigger, test=True)
+    await _attach_execution(new_trigger, execution, wait)
 
     return new_trigger
 
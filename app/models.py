@@ -1,6 +1,7 @@
 import json
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
 from app.services.db import Base
+from app.services.payload import compile_payload
 import datetime
 
 
@@ -13,13 +14,25 @@ class Trigger(Base):
     interval_seconds = Column(Integer, nullable=True)
     is_recurring = Column(Boolean, default=False)
     payload = Column(String, nullable=False, default="{}")
+    # Seconds a fire may be late, spent on jitter and dispatch smoothing;
+    # None uses SCHEDULER_DEFAULT_JITTER_SECONDS
+    jitter_seconds = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # Reconciliation reads changes past a watermark on this column, so writes
+    # made outside the ORM must bump it as well.
+    updated_at = Column(
+        DateTime,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+        index=True,
+    )
 
     def validate_trigger(self):
 
         if self.trigger_type not in ["scheduled", "api"]:
             raise ValueError("Trigger type must be either 'scheduled' or 'api'.")
+        if self.jitter_seconds is not None and self.jitter_seconds < 0:
+            raise ValueError("'jitter_seconds' must not be negative.")
         if self.trigger_type == "scheduled":
             if self.is_recurring and not self.interval_seconds:
                 raise ValueError(
@@ -39,8 +52,9 @@ class Trigger(Base):
                     raise ValueError("Scheduled time must be in the future.")
         if self.trigger_type == "api":
             if self.payload:
+                # Compiled once here; dispatch reuses the cached body
                 try:
-                    json.loads(self.payload)
+                    compile_payload(self.payload)
                 except json.JSONDecodeError:
                     raise ValueError("Payload must be valid JSON.")
             if self.is_recurring or self.schedule:
@@ -59,3 +73,31 @@ class EventLog(Base):
     name = Column(String, nullable=False)
     payload = Column(String, nullable=True)
     is_test = Column(Boolean, default=False)
+
+
+class EventString(Base):
+    """A name or trigger type of event logs, stored once and referenced by id."""
+
+    __tablename__ = "event_strings"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(String, nullable=False, unique=True)
+
+
+class EventPayload(Base):
+    """An event-log payload, stored once per distinct body under its digest."""
+
+    __tablename__ = "event_payloads"
+
+    id = Column(Integer, primary_key=True)
+    digest = Column(String(32), nullable=False, unique=True)
+    body = Column(String, nullable=False)
+
+
+class TriggerTombstone(Base):
+    """Marks a deleted trigger so reconciliation can drop its job."""
+
+    __tablename__ = "trigger_tombstones"
+
+    trigger_id = Column(Integer, primary_key=True)
+    deleted_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
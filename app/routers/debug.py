@@ -0,0 +1,35 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.services.profiling import ProfilingConfig, get_profile, list_profiles
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    """Only allow access with the configured PROFILING_DEBUG_TOKEN."""
+    expected = ProfilingConfig.DEBUG_TOKEN
+    if not expected:
+        raise HTTPException(status_code=404, detail="Debug endpoints are disabled")
+    if not x_debug_token or not hmac.compare_digest(x_debug_token, expected):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+router = APIRouter(dependencies=[Depends(require_debug_token)])
+
+
+@router.get("/profiles")
+def get_profiles():
+    """List the sampled request profiles."""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def download_profile(profile_id: str):
+    """Download a profile in collapsed-stack format (flamegraph.pl, speedscope)."""
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        profile,
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
@@ -1,27 +1,104 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
+from app.services.archive import event_archive
 from app.services.db import get_db
-from app.schemas import EventLogResponse
+from app.schemas import EventCount, EventLogResponse, HistogramBucket, TriggerRate
 from app.crud.event import get_recent_logs, get_archived_logs, get_event_stats
 
 router = APIRouter()
 
+DEFAULT_ANALYTICS_DAYS = 30
 
+
+# The CRUD functions return the encoded body (cached as is), so these skip
+# response_model validation; the model still documents the response.
 @router.get("/", response_model=list[EventLogResponse])
 async def list_recent_logs(db: Session = Depends(get_db)):
     """Fetch event logs from the last 2 hours."""
-    logs = await get_recent_logs(db)
-    return [EventLogResponse.from_orm(log) for log in logs]
+    return Response(content=await get_recent_logs(db), media_type="application/json")
 
 
 @router.get("/archived", response_model=list[EventLogResponse])
 async def list_archived_logs(db: Session = Depends(get_db)):
     """Fetch archived event logs."""
-    logs = await get_archived_logs(db)
-    return [EventLogResponse.from_orm(log) for log in logs]
+    return Response(
+        content=await get_archived_logs(db), media_type="application/json"
+    )
 
 
 @router.get("/stats")
 async def list_event_stats(db: Session = Depends(get_db)):
     """Fetch event log statistics."""
     return await get_event_stats(db)
+
+
+def _time_range(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    """Naive UTC [start, end), by default the last DEFAULT_ANALYTICS_DAYS."""
+
+    def naive_utc(moment: datetime) -> datetime:
+        if moment.tzinfo is None:
+            return moment
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+    end = naive_utc(end) if end else datetime.utcnow()
+    start = naive_utc(start) if start else end - timedelta(days=DEFAULT_ANALYTICS_DAYS)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start, end
+
+
+# Analytics read the archive segments of sealed periods, not the database.
+# Sync handlers: the NumPy scans run in the threadpool.
+@router.get("/analytics/counts", response_model=list[EventCount])
+def archived_event_counts(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    by: Literal["name", "trigger_type", "trigger_id"] = "name",
+    include_tests: bool = False,
+):
+    """Archived event counts per name, trigger type or trigger id."""
+    start, end = _time_range(start, end)
+    counts = event_archive.counts(start, end, by=by, include_tests=include_tests)
+    return [{"key": key, "count": count} for key, count in counts]
+
+
+@router.get("/analytics/histogram", response_model=list[HistogramBucket])
+def archived_event_histogram(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket_seconds: int = Query(3600, ge=60),
+    name: Optional[str] = None,
+    include_tests: bool = False,
+):
+    """Archived event counts per time bucket, optionally for one trigger name."""
+    start, end = _time_range(start, end)
+    try:
+        buckets = event_archive.histogram(
+            start,
+            end,
+            timedelta(seconds=bucket_seconds),
+            name=name,
+            include_tests=include_tests,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [{"start": bucket, "count": count} for bucket, count in buckets]
+
+
+@router.get("/analytics/rates", response_model=list[TriggerRate])
+def archived_trigger_rates(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    include_tests: bool = False,
+):
+    """Archived events per trigger, and per hour of archived time."""
+    start, end = _time_range(start, end)
+    rates = event_archive.trigger_rates(start, end, include_tests=include_tests)
+    return [
+        {"trigger_id": trigger_id, "count": count, "per_hour": per_hour}
+        for trigger_id, count, per_hour in rates
+    ]
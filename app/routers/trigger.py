@@ -1,26 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app.crud.trigger import (
+    LISTING_FIELDS,
     create_test_trigger,
     create_trigger_in_db,
     delete_trigger_from_db,
     deserialize_triggers,
     fetch_cached_triggers,
     get_all_triggers,
+    get_execution,
     get_trigger_by_id,
     update_trigger_in_db,
 )
+from app.services.admission import Overloaded, Priority, admission_limiter
 from app.services.db import get_db
-from app.schemas import TriggerCreate, TriggerUpdate, TriggerResponse
+from app.services.executions import ExecutionConfig
+from app.services.versioning import etag_matches, triggers_version
+from app.schemas import (
+    ExecutionResponse,
+    TriggerCreate,
+    TriggerUpdate,
+    TriggerResponse,
+)
 from sqlalchemy.exc import SQLAlchemyError
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 1000
+# API triggers run in the background; `wait` holds the response up to this
+# many seconds for the execution to finish
+WAIT_QUERY = Query(0, ge=0, le=ExecutionConfig.MAX_WAIT_SECONDS)
+
+
+def admitted(priority: Priority):
+    """Dependency shedding the request with a 429/503 when over the limit."""
+
+    async def admit(request: Request):
+        try:
+            started = admission_limiter.acquire(priority)
+        except Overloaded as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail="Too many requests, retry later",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        try:
+            yield
+        finally:
+            # Requests held by `wait` keep their slot but are not samples
+            admission_limiter.release(
+                started, sample="wait" not in request.query_params
+            )
+
+    return Depends(admit)
 
-@router.post("/", response_model=TriggerResponse)
-async def create_trigger_view(trigger: TriggerCreate, db: Session = Depends(get_db)):
+
+ADMIT_API = admitted(Priority.API)
+ADMIT_TEST = admitted(Priority.TEST)
+
+
+@router.post("/", response_model=TriggerResponse, dependencies=[ADMIT_API])
+async def create_trigger_view(
+    trigger: TriggerCreate, wait: float = WAIT_QUERY, db: Session = Depends(get_db)
+):
     try:
-        new_trigger = await create_trigger_in_db(trigger, db)
+        new_trigger = await create_trigger_in_db(trigger, db, wait=wait)
         return new_trigger
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -30,10 +77,10 @@ async def create_trigger_view(trigger: TriggerCreate, db: Session = Depends(get_
         raise HTTPException(status_code=501, detail=str(e))
 
 
-@router.post("/test/", response_model=TriggerResponse)
-async def test_trigger(trigger: TriggerCreate):
+@router.post("/test/", response_model=TriggerResponse, dependencies=[ADMIT_TEST])
+async def test_trigger(trigger: TriggerCreate, wait: float = WAIT_QUERY):
     try:
-        new_trigger = await create_test_trigger(trigger)
+        new_trigger = await create_test_trigger(trigger, wait=wait)
         return new_trigger
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -41,7 +88,9 @@ async def test_trigger(trigger: TriggerCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/test/", response_model=list[TriggerResponse])
+@router.get(
+    "/test/", response_model=list[TriggerResponse], dependencies=[ADMIT_TEST]
+)
 async def get_test_triggers():
     try:
         cached_triggers = await fetch_cached_triggers()
@@ -50,12 +99,63 @@ async def get_test_triggers():
         return []
 
 
-@router.get("/", response_model=list[TriggerResponse])
-def get_triggers(db: Session = Depends(get_db)):
-    return get_all_triggers(db)
+@router.get("/", response_model=list[TriggerResponse], dependencies=[ADMIT_API])
+def get_triggers(
+    request: Request,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    List triggers, optionally paged by id (`after_id`, `limit`) and restricted
+    to a comma-separated list of `fields`.
+
+    Responses carry an ETag; a matching If-None-Match gets a 304 after one
+    aggregate query, without reading any rows.
+    """
+    # Read before the query: a concurrent change then only costs a later 200
+    etag = triggers_version.etag(db)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    selected = LISTING_FIELDS
+    if fields:
+        selected = tuple(field.strip() for field in fields.split(","))
+        unknown = [field for field in selected if field not in LISTING_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}"
+            )
+    # The page cursor needs the id even when it was not asked for
+    columns = selected if "id" in selected else ("id",) + selected
+    rows = get_all_triggers(db, after_id=after_id, limit=limit, fields=columns)
+
+    if limit is not None and len(rows) == limit:
+        next_url = request.url.include_query_params(after_id=rows[-1]["id"])
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    if columns is not selected:
+        for row in rows:
+            del row["id"]
+    body = json.dumps(
+        rows, default=datetime.isoformat, ensure_ascii=False, separators=(",", ":")
+    )
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
-@router.get("/{trigger_id}", response_model=TriggerResponse)
+@router.get("/executions/{execution_id}", response_model=ExecutionResponse)
+async def get_execution_status(execution_id: str, wait: float = WAIT_QUERY):
+    """Status of a queued API-trigger execution, optionally waiting for it."""
+    execution = await get_execution(execution_id, wait=wait)
+    if execution is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return execution
+
+
+@router.get(
+    "/{trigger_id}", response_model=TriggerResponse, dependencies=[ADMIT_API]
+)
 def get_trigger_id(trigger_id: int, db: Session = Depends(get_db)):
     trigger = get_trigger_by_id(db, trigger_id)
     if not trigger:
@@ -63,13 +163,18 @@ def get_trigger_id(trigger_id: int, db: Session = Depends(get_db)):
     return trigger
 
 
-@router.put("/{trigger_id}", response_model=TriggerResponse)
+@router.put(
+    "/{trigger_id}", response_model=TriggerResponse, dependencies=[ADMIT_API]
+)
 async def update_trigger(
-    trigger_id: int, trigger: TriggerUpdate, db: Session = Depends(get_db)
+    trigger_id: int,
+    trigger: TriggerUpdate,
+    wait: float = WAIT_QUERY,
+    db: Session = Depends(get_db),
 ):
     try:
         updated_trigger = await update_trigger_in_db(
-            db, trigger_id, trigger.dict(exclude_unset=True)
+            db, trigger_id, trigger.dict(exclude_unset=True), wait=wait
         )
         if not updated_trigger:
             raise HTTPException(status_code=404, detail="Trigger not found")
@@ -84,7 +189,7 @@ async def update_trigger(
         )
 
 
-@router.delete("/{trigger_id}")
+@router.delete("/{trigger_id}", dependencies=[ADMIT_API])
 async def delete_trigger(trigger_id: int, db: Session = Depends(get_db)):
     try:
         deleted_trigger = await delete_trigger_from_db(db, trigger_id)
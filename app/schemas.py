@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 from datetime import datetime
 
 
@@ -10,6 +10,7 @@ class TriggerBase(BaseModel):
     schedule: Optional[datetime] = None
     is_recurring: Optional[bool] = False
     interval_seconds: Optional[int] = None
+    jitter_seconds: Optional[int] = None
 
 
 class TriggerCreate(TriggerBase):
@@ -23,13 +24,30 @@ class TriggerUpdate(BaseModel):
     schedule: Optional[str] = None
     interval_seconds: Optional[int] = None
     is_recurring: Optional[bool] = None
+    jitter_seconds: Optional[int] = None
+
+
+class ExecutionResponse(BaseModel):
+    id: str
+    trigger_id: int
+    is_test: bool
+    status: str
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
 
 
 class TriggerResponse(TriggerBase):
     id: int
+    # API triggers only: the execution queued by this request
+    execution: Optional[ExecutionResponse] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class EventLogResponse(BaseModel):
@@ -43,3 +61,19 @@ class EventLogResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class EventCount(BaseModel):
+    key: Union[int, str, None]
+    count: int
+
+
+class HistogramBucket(BaseModel):
+    start: datetime
+    count: int
+
+
+class TriggerRate(BaseModel):
+    trigger_id: Optional[int]
+    count: int
+    per_hour: float
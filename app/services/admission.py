@@ -0,0 +1,120 @@
+"""
+Adaptive admission control for the trigger endpoints.
+
+`AdaptiveLimiter` bounds the work in flight: admitted requests plus
+scheduled fires and queued API executions. The bound adapts to observed
+latency (AIMD): it grows by about one per window of fast requests and is cut
+by `BACKOFF` when a request takes longer than `TARGET_MS`. Requests over the
+bound are rejected right away instead of queueing, with a `Retry-After`.
+
+Priority classes decide who is shed first: scheduled fires are never shed,
+API requests may fill the whole limit, and test requests only its
+`TEST_SHARE`.
+"""
+import math
+import os
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, Dict
+
+
+class AdmissionConfig:
+    INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "64"))
+    MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "4"))
+    MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "1000"))
+    # Latency above which the limit is cut
+    TARGET_MS = float(os.getenv("ADMISSION_TARGET_MS", "250"))
+    BACKOFF = 0.9
+    # Fraction of the limit test requests may fill
+    TEST_SHARE = float(os.getenv("ADMISSION_TEST_SHARE", "0.5"))
+
+
+class Priority(IntEnum):
+    # Scheduled fires and accepted executions: counted, never shed
+    SCHEDULED = 0
+    API = 1
+    TEST = 2
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; 503 at the full limit, 429 over a share."""
+
+    def __init__(self, status_code: int, retry_after: int):
+        super().__init__(f"Overloaded, retry after {retry_after}s")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit on latency; used from the event loop only."""
+
+    def __init__(
+        self,
+        initial: int = AdmissionConfig.INITIAL_LIMIT,
+        min_limit: int = AdmissionConfig.MIN_LIMIT,
+        max_limit: int = AdmissionConfig.MAX_LIMIT,
+        target_ms: float = AdmissionConfig.TARGET_MS,
+        backoff: float = AdmissionConfig.BACKOFF,
+        test_share: float = AdmissionConfig.TEST_SHARE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target = target_ms / 1000
+        self.backoff = backoff
+        self.shares = {
+            Priority.SCHEDULED: math.inf,
+            Priority.API: 1.0,
+            Priority.TEST: test_share,
+        }
+        self.clock = clock
+        self.in_flight = 0
+        # Moving average of the sampled latencies, in seconds
+        self.latency = 0.0
+        self.rejected: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._last_decrease = -math.inf
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait: about one request's latency."""
+        return max(1, math.ceil(self.latency))
+
+    def acquire(self, priority: Priority) -> float:
+        """Admit one unit of work or raise `Overloaded`; returns its start time."""
+        if self.in_flight >= self.limit * self.shares[priority]:
+            self.rejected[priority] += 1
+            status_code = 503 if self.in_flight >= self.limit else 429
+            raise Overloaded(status_code, self.retry_after())
+        self.in_flight += 1
+        return self.clock()
+
+    def release(self, started: float, sample: bool = True):
+        """Finish admitted work; `sample` feeds its latency to the limit."""
+        self.in_flight -= 1
+        if not sample:
+            return
+        now = self.clock()
+        latency = now - started
+        self.latency += (latency - self.latency) * 0.1
+        if latency > self.target:
+            # At most one cut per target interval: the requests finishing
+            # right after the first slow one saw the same overload
+            if now - self._last_decrease >= self.target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow a limit that is being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    @contextmanager
+    def hold(self):
+        """Count accepted work (fires, queued executions) without shedding it."""
+        started = self.acquire(Priority.SCHEDULED)
+        try:
+            yield
+        finally:
+            self.release(started, sample=False)
+
+
+admission_limiter = AdaptiveLimiter()
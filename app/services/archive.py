@@ -0,0 +1,370 @@
+"""
+Columnar archive of sealed event-log periods.
+
+Once a partition's period has ended, its logs are compacted into one
+immutable segment file. The file holds a small JSON header, then one column
+block each:
+- `ts_delta`: microseconds since the previous row (rows sorted by time);
+  the first row's timestamp is in the header.
+- `name`, `trigger_type`: codes into per-segment dictionaries.
+- `trigger_id`, `is_test`.
+Payloads and ids are not archived. Segments are memory-mapped and scanned
+with NumPy, so queries over months of history need neither the database nor
+a copy of the files in memory.
+"""
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class ArchiveConfig:
+    DIRECTORY = os.getenv("EVENT_ARCHIVE_DIR", "archive")
+    # A period is compacted this long after it ends, for late commits
+    SEAL_DELAY_SECONDS = int(os.getenv("EVENT_ARCHIVE_SEAL_DELAY_SECONDS", "60"))
+    RETENTION_DAYS = int(os.getenv("EVENT_ARCHIVE_RETENTION_DAYS", "365"))
+    MAX_HISTOGRAM_BUCKETS = 10_000
+
+
+# Event-log columns a segment is built from, in this order
+SEGMENT_FIELDS = ("trigger_id", "triggered_at", "trigger_type", "name", "is_test")
+COUNT_KEYS = ("name", "trigger_type", "trigger_id")
+
+_MAGIC = b"EVSG"
+_VERSION = 1
+# magic, version, header length
+_PREFIX = struct.Struct("<4sHI")
+_ALIGN = 8
+_FILE = re.compile(r"^segment_(\d{10})\.evs$")
+_EPOCH = datetime(1970, 1, 1)
+_NULL_TRIGGER_ID = -(2**31)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _micros(moment: datetime) -> int:
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def _aligned(size: int) -> int:
+    return -(-size // _ALIGN) * _ALIGN
+
+
+def _code_dtype(size: int) -> str:
+    return "<u1" if size <= 2**8 else "<u2" if size <= 2**16 else "<u4"
+
+
+def _encode(values: Sequence[str]) -> Tuple[List[str], List[int]]:
+    index: Dict[str, int] = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return list(index), codes
+
+
+class Segment:
+    """One memory-mapped segment file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, length = _PREFIX.unpack_from(self._buffer)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a version {_VERSION} event segment")
+        header = json.loads(self._buffer[_PREFIX.size : _PREFIX.size + length])
+        self.path = path
+        self.start = datetime.fromisoformat(header["start"])
+        self.end = datetime.fromisoformat(header["end"])
+        self.rows = header["rows"]
+        self.names = header["names"]
+        self.types = header["types"]
+        self._ts_base = header["ts_base"]
+        self._columns = header["columns"]
+        self._data_start = _aligned(_PREFIX.size + length)
+        # Filled in by EventArchive: segment code -> archive-wide code
+        self.archive_codes: Dict[str, "np.ndarray"] = {}
+
+    def column(self, name: str) -> "np.ndarray":
+        """A read-only view of a column, straight from the mapped file."""
+        import numpy as np
+
+        dtype, offset = self._columns[name]
+        return np.frombuffer(
+            self._buffer,
+            dtype=dtype,
+            count=self.rows,
+            offset=self._data_start + offset,
+        )
+
+    def timestamps(self) -> "np.ndarray":
+        """Microseconds since the epoch, decoded from the deltas."""
+        import numpy as np
+
+        return self._ts_base + np.cumsum(self.column("ts_delta"), dtype=np.int64)
+
+
+def write_segment(path: str, start: datetime, end: datetime, rows: Iterable[tuple]):
+    """Write `SEGMENT_FIELDS` rows as a segment covering [start, end)."""
+    import numpy as np
+
+    rows = sorted(rows, key=lambda row: row[1])
+    trigger_ids, stamps, types, names, tests = list(zip(*rows)) or [()] * 5
+    timestamps = np.array(stamps, dtype="datetime64[us]").astype(np.int64)
+    deltas = np.diff(timestamps, prepend=timestamps[:1])
+    delta_dtype = "<u4" if deltas.size == 0 or deltas.max() < 2**32 else "<u8"
+    name_dictionary, name_codes = _encode(names)
+    type_dictionary, type_codes = _encode(types)
+    columns = {
+        "ts_delta": np.asarray(deltas, dtype=delta_dtype),
+        "name": np.asarray(name_codes, dtype=_code_dtype(len(name_dictionary))),
+        "trigger_type": np.asarray(
+            type_codes, dtype=_code_dtype(len(type_dictionary))
+        ),
+        "trigger_id": np.array(
+            [_NULL_TRIGGER_ID if value is None else value for value in trigger_ids],
+            dtype="<i4",
+        ),
+        "is_test": np.array([bool(value) for value in tests], dtype="<u1"),
+    }
+
+    # Offsets are relative to the data section, which starts at the first
+    # aligned position after the header
+    offset = 0
+    layout = {}
+    for name, values in columns.items():
+        layout[name] = [values.dtype.str, offset]
+        offset += _aligned(values.nbytes)
+    encoded = json.dumps(
+        {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "rows": len(rows),
+            "ts_base": int(timestamps[0]) if rows else 0,
+            "names": name_dictionary,
+            "types": type_dictionary,
+            "columns": layout,
+        }
+    ).encode()
+    padding = _aligned(_PREFIX.size + len(encoded)) - _PREFIX.size - len(encoded)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(_PREFIX.pack(_MAGIC, _VERSION, len(encoded)))
+        f.write(encoded + b"\0" * padding)
+        for values in columns.values():
+            data = values.tobytes()
+            f.write(data + b"\0" * (_aligned(len(data)) - len(data)))
+    os.replace(temporary, path)
+
+
+class EventArchive:
+    """The segment files in one directory, and the analytics over them."""
+
+    def __init__(self, directory: str = ArchiveConfig.DIRECTORY):
+        self.directory = directory
+        self._segments: Dict[str, Segment] = {}
+        # Archive-wide dictionaries: key -> code, in first-seen order
+        self._dictionaries: Dict[str, Dict[str, int]] = {
+            "name": {},
+            "trigger_type": {},
+        }
+        self._lock = threading.Lock()
+
+    def path(self, start: datetime) -> str:
+        return os.path.join(self.directory, f"segment_{start:%Y%m%d%H}.evs")
+
+    def has(self, start: datetime) -> bool:
+        return os.path.exists(self.path(start))
+
+    def write(self, start: datetime, end: datetime, rows: Iterable[tuple]):
+        os.makedirs(self.directory, exist_ok=True)
+        write_segment(self.path(start), start, end, rows)
+
+    def _starts(self) -> List[datetime]:
+        try:
+            files = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            datetime.strptime(match.group(1), "%Y%m%d%H")
+            for match in map(_FILE.match, files)
+            if match
+        )
+
+    def segments(self, start: datetime, end: datetime) -> List[Segment]:
+        """Segments overlapping [start, end), oldest first."""
+        found = []
+        for segment_start in self._starts():
+            if segment_start >= end:
+                break
+            path = self.path(segment_start)
+            with self._lock:
+                segment = self._segments.get(path)
+                if segment is None:
+                    segment = self._segments[path] = Segment(path)
+            if segment.end > start:
+                found.append(segment)
+        return found
+
+    def prune(self, cutoff: datetime) -> int:
+        """Delete the segments whose whole period is before `cutoff`."""
+        pruned = 0
+        for segment_start in self._starts():
+            # Later segments start, and so end, after the cutoff: only the
+            # segments read here are ever opened, once each
+            if segment_start >= cutoff:
+                break
+            path = self.path(segment_start)
+            with self._lock:
+                segment = self._segments.get(path)
+                if segment is None:
+                    segment = self._segments[path] = Segment(path)
+                if segment.end > cutoff:
+                    continue
+                # Views held by running queries keep the mapping alive
+                self._segments.pop(path, None)
+            os.remove(path)
+            pruned += 1
+        return pruned
+
+    def _scan(
+        self,
+        start: datetime,
+        end: datetime,
+        include_tests: bool,
+        with_timestamps: bool = False,
+    ):
+        """
+        (segment, row selector, timestamps) for the segments overlapping
+        [start, end). Timestamps are only decoded when asked for or when the
+        range cuts through the segment.
+        """
+        import numpy as np
+
+        start_us, end_us = _micros(start), _micros(end)
+        for segment in self.segments(start, end):
+            timestamps = None
+            rows = slice(0, segment.rows)
+            if with_timestamps or segment.start < start or segment.end > end:
+                timestamps = segment.timestamps()
+                lo, hi = np.searchsorted(timestamps, [start_us, end_us])
+                rows = slice(lo, hi)
+            if not include_tests:
+                tests = segment.column("is_test")[rows]
+                rows = np.flatnonzero(tests == 0) + rows.start
+            yield segment, rows, timestamps
+
+    def _archive_codes(self, segment: Segment, by: str) -> "np.ndarray":
+        """Map from the segment's dictionary codes to archive-wide codes."""
+        import numpy as np
+
+        with self._lock:
+            codes = segment.archive_codes.get(by)
+            if codes is None:
+                index = self._dictionaries[by]
+                dictionary = segment.names if by == "name" else segment.types
+                codes = segment.archive_codes[by] = np.array(
+                    [index.setdefault(key, len(index)) for key in dictionary],
+                    dtype=np.int64,
+                )
+        return codes
+
+    def coverage(self, start: datetime, end: datetime) -> timedelta:
+        """How much of [start, end) the segments cover."""
+        return sum(
+            (
+                min(end, segment.end) - max(start, segment.start)
+                for segment in self.segments(start, end)
+            ),
+            timedelta(0),
+        )
+
+    def counts(
+        self,
+        start: datetime,
+        end: datetime,
+        by: str = "name",
+        include_tests: bool = False,
+    ) -> List[Tuple[object, int]]:
+        """Event counts per `by` key, most frequent first."""
+        import numpy as np
+
+        if by not in COUNT_KEYS:
+            raise ValueError(f"Cannot count by {by!r}")
+        selected = [
+            (segment, segment.column(by)[rows])
+            for segment, rows, _ in self._scan(start, end, include_tests)
+        ]
+        if by == "trigger_id":
+            values = np.concatenate(
+                [values for _, values in selected] or [np.empty(0, dtype="<i4")]
+            )
+            nulls = int(np.count_nonzero(values == _NULL_TRIGGER_ID))
+            values = values[values != _NULL_TRIGGER_ID].astype(np.int64)
+            keys, counts = np.unique(values, return_counts=True)
+            totals = dict(zip(keys.tolist(), counts.tolist()))
+            if nulls:
+                totals[None] = nulls
+        else:
+            remapped = [
+                self._archive_codes(segment, by)[values]
+                for segment, values in selected
+            ]
+            dictionary = list(self._dictionaries[by])
+            counts = np.zeros(len(dictionary), dtype=np.int64)
+            for codes in remapped:
+                counts += np.bincount(codes, minlength=len(dictionary))
+            totals = {
+                dictionary[code]: int(counts[code]) for code in np.flatnonzero(counts)
+            }
+        return sorted(totals.items(), key=lambda item: -item[1])
+
+    def histogram(
+        self,
+        start: datetime,
+        end: datetime,
+        bucket: timedelta,
+        name: Optional[str] = None,
+        include_tests: bool = False,
+    ) -> List[Tuple[datetime, int]]:
+        """Event counts per `bucket` of [start, end), optionally for one name."""
+        import numpy as np
+
+        buckets = -(-(end - start) // bucket)
+        if buckets > ArchiveConfig.MAX_HISTOGRAM_BUCKETS:
+            raise ValueError(
+                f"{buckets} buckets requested, the limit is "
+                f"{ArchiveConfig.MAX_HISTOGRAM_BUCKETS}"
+            )
+        totals = np.zeros(buckets, dtype=np.int64)
+        start_us, bucket_us = _micros(start), bucket // _MICROSECOND
+        for segment, rows, timestamps in self._scan(
+            start, end, include_tests, with_timestamps=True
+        ):
+            selected = timestamps[rows]
+            if name is not None:
+                if name not in segment.names:
+                    continue
+                codes = segment.column("name")[rows]
+                selected = selected[codes == segment.names.index(name)]
+            totals += np.bincount((selected - start_us) // bucket_us, minlength=buckets)
+        return [(start + i * bucket, count) for i, count in enumerate(totals.tolist())]
+
+    def trigger_rates(
+        self, start: datetime, end: datetime, include_tests: bool = False
+    ) -> List[Tuple[Optional[int], int, float]]:
+        """(trigger_id, count, events per hour of archived time) per trigger."""
+        hours = self.coverage(start, end) / timedelta(hours=1)
+        return [
+            (trigger_id, count, round(count / hours, 3) if hours else 0.0)
+            for trigger_id, count in self.counts(
+                start, end, by="trigger_id", include_tests=include_tests
+            )
+        ]
+
+
+event_archive = EventArchive()
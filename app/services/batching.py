@@ -0,0 +1,127 @@
+"""
+Per-destination micro-batching of webhook requests.
+
+With `BatchConfig.WINDOW_MS` set, a webhook body is held for up to that long
+and sent in one request with the other bodies for the same URL, up to
+`MAX_SIZE` bodies. Discord messages (`{"content": ...}`) are combined by
+joining their contents with newlines, as long as the result stays within
+Discord's `MAX_CONTENT` characters; any other body is sent on its own. Every
+body still gets the result of the request that carried it.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatchConfig:
+    # 0 disables batching: every fire is its own request
+    WINDOW_MS = float(os.getenv("WEBHOOK_BATCH_WINDOW_MS", "0"))
+    MAX_SIZE = int(os.getenv("WEBHOOK_BATCH_MAX_SIZE", "10"))
+    # Discord rejects messages with longer content
+    MAX_CONTENT = 2000
+
+
+Send = Callable[[str, bytes], Awaitable[Dict[str, Any]]]
+
+
+def _content(body: bytes) -> Optional[str]:
+    """The content of a Discord message body that can be combined, or None."""
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(message, dict) and message.keys() == {"content"}:
+        content = message["content"]
+        if isinstance(content, str):
+            return content
+    return None
+
+
+class _Batch:
+    def __init__(self):
+        self.items: List[Tuple[bytes, str, asyncio.Future]] = []
+        self.length = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class WebhookBatcher:
+    """Combines the webhook bodies sent to one URL within a short window."""
+
+    def __init__(
+        self,
+        send: Send,
+        window_ms: float = BatchConfig.WINDOW_MS,
+        max_size: int = BatchConfig.MAX_SIZE,
+        max_content: int = BatchConfig.MAX_CONTENT,
+    ):
+        self.send = send
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.max_content = max_content
+        # Requests sent, and bodies they carried
+        self.requests = 0
+        self.bodies = 0
+        self._batches: Dict[str, _Batch] = {}
+        self._sending: Set[asyncio.Task] = set()
+
+    async def submit(self, url: str, body: bytes) -> Dict[str, Any]:
+        """Send `body` to `url`, possibly combined with others; its result."""
+        content = _content(body)
+        if content is None or len(content) > self.max_content:
+            return await self._send(url, body, 1)
+
+        batch = self._batches.get(url)
+        # The newline joining it to the batch counts too
+        if batch is not None and batch.length + 1 + len(content) > self.max_content:
+            self.flush(url)
+            batch = None
+        if batch is None:
+            batch = self._batches[url] = _Batch()
+            loop = asyncio.get_running_loop()
+            batch.timer = loop.call_later(self.window, self.flush, url)
+        else:
+            batch.length += 1
+        result = asyncio.get_running_loop().create_future()
+        batch.items.append((body, content, result))
+        batch.length += len(content)
+        if len(batch.items) >= self.max_size:
+            self.flush(url)
+        return await result
+
+    def flush(self, url: str):
+        """Send the bodies waiting for `url` now."""
+        batch = self._batches.pop(url, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = asyncio.create_task(self._send_batch(url, batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    def flush_all(self):
+        for url in list(self._batches):
+            self.flush(url)
+
+    async def _send_batch(self, url: str, batch: _Batch):
+        if len(batch.items) == 1:
+            body = batch.items[0][0]
+        else:
+            content = "\n".join(content for _, content, _ in batch.items)
+            body = json.dumps({"content": content}).encode()
+        result = await self._send(url, body, len(batch.items))
+        for _, _, future in batch.items:
+            if not future.done():
+                future.set_result(result)
+
+    async def _send(self, url: str, body: bytes, count: int) -> Dict[str, Any]:
+        self.requests += 1
+        self.bodies += count
+        try:
+            return await self.send(url, body)
+        except Exception as e:
+            logger.error(f"Webhook request error: {e}")
+            return {"success": False, "error": str(e)}
@@ -1,8 +1,10 @@
 from pymemcache.client.base import PooledClient
 import asyncio
 import logging
+import threading
 from typing import Any, Optional
 from concurrent.futures import ThreadPoolExecutor
+from app.services.profiling import timed
 
 logger = logging.getLogger(__name__)
 
@@ -17,17 +19,34 @@ class CacheConfig:
 
 class AsyncCache:
     def __init__(self):
-        self._client = PooledClient(
-            CacheConfig.SERVER_LIST[0],
-            connect_timeout=CacheConfig.TIMEOUT,
-            timeout=CacheConfig.TIMEOUT,
-            max_pool_size=CacheConfig.MAX_POOL_SIZE,
-        )
-        self._executor = ThreadPoolExecutor(max_workers=CacheConfig.MAX_POOL_SIZE)
+        # Built on first use, so importing the app creates no client or pool
+        self._client: Optional[PooledClient] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._client_lock = threading.Lock()
         self._failure_count = 0
         self._circuit_open = False
         self._last_failure_time = 0
 
+    def _get_client(self) -> PooledClient:
+        # Called from the executor threads
+        with self._client_lock:
+            if self._client is None:
+                self._client = PooledClient(
+                    CacheConfig.SERVER_LIST[0],
+                    connect_timeout=CacheConfig.TIMEOUT,
+                    timeout=CacheConfig.TIMEOUT,
+                    max_pool_size=CacheConfig.MAX_POOL_SIZE,
+                )
+            return self._client
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=CacheConfig.MAX_POOL_SIZE, thread_name_prefix="cache"
+            )
+        return self._executor
+
+    @timed("cache.get")
     async def get(self, key: str, default: Any = None) -> Optional[Any]:
         if self._circuit_open:
             logger.warning("Circuit breaker open - skipping cache")
@@ -35,7 +54,7 @@ class AsyncCache:
 
         try:
             result = await asyncio.get_event_loop().run_in_executor(
-                self._executor, self._safe_get, key
+                self._get_executor(), self._safe_get, key
             )
             self._failure_count = 0
             return result
@@ -43,18 +62,20 @@ class AsyncCache:
             self._handle_failure(e)
             return default
 
+    @timed("cache.set")
     async def set(self, key: str, value: Any, expire: int = 0) -> bool:
         if self._circuit_open:
             return False
 
         try:
             return await asyncio.get_event_loop().run_in_executor(
-                self._executor, self._safe_set, key, value, expire
+                self._get_executor(), self._safe_set, key, value, expire
             )
         except Exception as e:
             self._handle_failure(e)
             return False
 
+    @timed("cache.delete")
     async def delete(self, key: str) -> bool:
         """Delete a key from cache asynchronously."""
         if self._circuit_open:
@@ -62,7 +83,7 @@ class AsyncCache:
 
         try:
             return await asyncio.get_event_loop().run_in_executor(
-                self._executor, self._safe_delete, key
+                self._get_executor(), self._safe_delete, key
             )
         except Exception as e:
             self._handle_failure(e)
@@ -70,7 +91,7 @@ class AsyncCache:
 
     def _safe_get(self, key: str) -> Optional[Any]:
         try:
-            result = self._client.get(key)
+            result = self._get_client().get(key)
             return result.decode("utf-8") if result else None
         except Exception as e:
             logger.error(f"Cache get error: {str(e)}")
@@ -78,7 +99,7 @@ class AsyncCache:
 
     def _safe_set(self, key: str, value: Any, expire: int = 0) -> bool:
         try:
-            return bool(self._client.set(key, value, expire=expire))
+            return bool(self._get_client().set(key, value, expire=expire))
         except Exception as e:
             logger.error(f"Cache set error: {str(e)}")
             raise
@@ -86,7 +107,7 @@ class AsyncCache:
     def _safe_delete(self, key: str) -> bool:
         """Safely execute delete operation."""
         try:
-            return bool(self._client.delete(key))
+            return bool(self._get_client().delete(key))
         except Exception as e:
             logger.error(f"Cache delete error: {str(e)}")
             raise
@@ -101,8 +122,12 @@ class AsyncCache:
             logger.warning("Circuit breaker opened")
 
     async def cleanup(self):
-        self._executor.shutdown(wait=True)
-        self._client.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
 
 cache_client = AsyncCache()
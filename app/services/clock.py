@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+
+class SystemClock:
+    """Wall-clock time in UTC."""
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+
+class VirtualClock:
+    """Manually advanced clock for simulations and tests."""
+
+    def __init__(self, start: datetime):
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance_to(self, moment: datetime):
+        if moment < self._now:
+            raise ValueError("Virtual clock cannot move backwards.")
+        self._now = moment
+
+    def advance(self, seconds: float):
+        self._now += timedelta(seconds=seconds)
@@ -0,0 +1,212 @@
+import calendar
+import functools
+import re
+from datetime import datetime, timedelta, tzinfo
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from apscheduler.triggers.base import BaseTrigger
+
+# Same conventions as APScheduler's CronTrigger.from_crontab, so stored
+# expressions keep their meaning: weekdays count from Monday (0) and the
+# day-of-month and day-of-week fields must both match.
+FIELDS: Tuple[Tuple[str, int, int], ...] = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("day_of_week", 0, 6),
+)
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+MAX_SEARCH_YEARS = 8
+
+_range_re = re.compile(r"^(?:(\*)|(\w+)(?:-(\w+))?)(?:/(\d+))?$")
+
+
+def _value(token: str, field: str) -> int:
+    lowered = token.lower()
+    if field == "day_of_week" and lowered in WEEKDAYS:
+        return WEEKDAYS.index(lowered)
+    if field == "month" and lowered in MONTHS:
+        return MONTHS.index(lowered) + 1
+    if not token.isdigit():
+        raise ValueError(f'Unsupported value "{token}" in cron field {field}')
+    return int(token)
+
+
+def _field_mask(expression: str, field: str, low: int, high: int) -> int:
+    """Bitmask with bit `n` set for every value `n` the field matches."""
+    mask = 0
+    for part in expression.split(","):
+        match = _range_re.match(part)
+        if not match:
+            raise ValueError(f'Unsupported expression "{part}" in cron field {field}')
+        star, first, last, step = match.groups()
+        step = int(step) if step else 1
+        if step == 0:
+            raise ValueError("Increment must be higher than 0")
+        if star:
+            start, end = low, high
+        else:
+            start = _value(first, field)
+            if last is not None:
+                end = _value(last, field)
+            else:
+                end = high if match.group(4) else start
+        if start < low or end > high or start > end:
+            raise ValueError(f'Value out of range in cron field {field}: "{part}"')
+        # APScheduler rejects steps wider than the range they apply to.
+        if match.group(4) and step > (end or high) - start:
+            raise ValueError(
+                f'Step is higher than the total range in cron field {field}: "{part}"'
+            )
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    return mask
+
+
+def _next_bit(mask: int, start: int) -> int:
+    """Smallest set bit at or above `start`, or -1."""
+    remaining = mask >> start
+    if not remaining:
+        return -1
+    return start + (remaining & -remaining).bit_length() - 1
+
+
+class CompiledCron:
+    """A crontab expression precompiled into one bitmask per field."""
+
+    __slots__ = ("expression", "minutes", "hours", "months", "_day_masks")
+
+    def __init__(self, expression: str):
+        values = expression.split()
+        if len(values) != 5:
+            raise ValueError(f"Wrong number of fields; got {len(values)}, expected 5")
+        masks = [
+            _field_mask(value, name, low, high)
+            for value, (name, low, high) in zip(values, FIELDS)
+        ]
+        self.expression = " ".join(values)
+        self.minutes, self.hours, days, self.months, weekdays = masks
+        # Days matching both day fields, keyed by the weekday of the 1st.
+        self._day_masks = tuple(
+            days
+            & sum(
+                1 << day
+                for day in range(1, 32)
+                if weekdays >> ((first_weekday + day - 1) % 7) & 1
+            )
+            for first_weekday in range(7)
+        )
+
+    def _day_mask(self, year: int, month: int) -> int:
+        first_weekday, length = calendar.monthrange(year, month)
+        return self._day_masks[first_weekday] & ((1 << (length + 1)) - 1)
+
+    def next_fire(self, start: datetime) -> Optional[datetime]:
+        """First matching minute at or after `start`, in `start`'s timezone."""
+        if start.second or start.microsecond:
+            start = start.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month, day = start.year, start.month, start.day
+        hour, minute = start.hour, start.minute
+
+        while year <= start.year + MAX_SEARCH_YEARS:
+            next_month = _next_bit(self.months, month)
+            if next_month < 0:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute = next_month, 1, 0, 0
+
+            next_day = _next_bit(self._day_mask(year, month), day)
+            if next_day < 0:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                if month > 12:
+                    year, month = year + 1, 1
+                continue
+            if next_day != day:
+                day, hour, minute = next_day, 0, 0
+
+            next_hour = _next_bit(self.hours, hour)
+            if next_hour < 0:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute = next_hour, 0
+
+            next_minute = _next_bit(self.minutes, minute)
+            if next_minute < 0:
+                hour, minute = hour + 1, 0
+                continue
+            return start.replace(
+                year=year, month=month, day=day, hour=hour, minute=next_minute
+            )
+        return None
+
+
+# Upper bound on distinct expressions kept compiled at once.
+INTERN_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=INTERN_CACHE_SIZE)
+def _compile(expression: str) -> CompiledCron:
+    return CompiledCron(expression)
+
+
+def compile_cron(expression: str) -> CompiledCron:
+    """Compile a crontab expression, returning the shared instance for repeats."""
+    return _compile(" ".join(expression.split()))
+
+
+def next_fire_times(
+    schedules: Iterable[CompiledCron], start: datetime
+) -> List[Optional[datetime]]:
+    """
+    Next fire time of many schedules in one pass.
+
+    Schedules are interned, so the search runs once per distinct expression
+    and every trigger sharing it reuses the result.
+    """
+    computed: Dict[int, Optional[datetime]] = {}
+    result = []
+    for schedule in schedules:
+        key = id(schedule)
+        if key not in computed:
+            computed[key] = schedule.next_fire(start)
+        result.append(computed[key])
+    return result
+
+
+class CompiledCronTrigger(BaseTrigger):
+    """APScheduler trigger backed by a shared CompiledCron."""
+
+    __slots__ = ("cron", "timezone")
+
+    def __init__(self, cron: CompiledCron, timezone: tzinfo):
+        self.cron = cron
+        self.timezone = timezone
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        start = now
+        if previous_fire_time is not None:
+            # Same as CronTrigger: never return the previous fire time again.
+            start = min(now, previous_fire_time + timedelta(microseconds=1))
+            if start == previous_fire_time:
+                start += timedelta(microseconds=1)
+        return self.cron.next_fire(start.astimezone(self.timezone))
+
+    def __str__(self):
+        return f"cron[{self.cron.expression}]"
+
+    def __repr__(self):
+        return f"<CompiledCronTrigger ({self.cron.expression!r}, timezone={self.timezone})>"
+
+
+@functools.lru_cache(maxsize=INTERN_CACHE_SIZE)
+def _cron_trigger(expression: str, timezone: tzinfo) -> CompiledCronTrigger:
+    return CompiledCronTrigger(_compile(expression), timezone)
+
+
+def cron_trigger(expression: str, timezone: tzinfo) -> CompiledCronTrigger:
+    """Shared, stateless trigger for every job using the same expression."""
+    return _cron_trigger(" ".join(expression.split()), timezone)
@@ -0,0 +1,140 @@
+"""
+Deduplicated event-log content.
+
+Event-log partitions store ids instead of text: names and trigger types are
+interned in `event_strings`, and payloads are stored once per distinct body
+in `event_payloads`, addressed by their digest. A trigger firing every
+second then adds a row of a few integers per fire instead of a copy of its
+payload. Reads join the text back (`app.crud.event.select_event_logs`).
+
+The dictionaries only grow with distinct names and payloads, not with fires,
+and are never pruned: a log row may reference an entry until its partition
+is dropped.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models import EventPayload, EventString
+
+
+class DedupConfig:
+    # Ids of strings and of payloads kept in memory, least recently used out
+    CACHE_SIZE = int(os.getenv("EVENT_LOG_DEDUP_CACHE_SIZE", "10000"))
+
+
+# Session.info key for ids resolved in the session's transaction
+_RESOLVED = "event_content"
+
+
+def payload_digest(body: str) -> str:
+    return hashlib.blake2b(body.encode(), digest_size=16).hexdigest()
+
+
+class EventContent:
+    """Interned strings and payloads of one database, with their ids cached."""
+
+    def __init__(self, bind: Engine, cache_size: int = DedupConfig.CACHE_SIZE):
+        self._insert = (
+            postgresql.insert if bind.dialect.name == "postgresql" else sqlite.insert
+        )
+        self.cache_size = cache_size
+        # Committed ids: string value or payload body -> id
+        self._ids: Dict[type, OrderedDict] = {
+            EventString: OrderedDict(),
+            EventPayload: OrderedDict(),
+        }
+
+    def encode_rows(self, db: Session, rows: Iterable[dict]) -> List[dict]:
+        """Partition rows of event logs: their texts replaced by ids."""
+        rows = list(rows)
+        strings = self.ids(
+            db,
+            EventString,
+            {row[key] for row in rows for key in ("name", "trigger_type")},
+        )
+        payloads = self.ids(
+            db, EventPayload, {row.get("payload") for row in rows} - {None}
+        )
+        return [
+            {
+                "trigger_id": row.get("trigger_id"),
+                "triggered_at": row.get("triggered_at"),
+                "name_id": strings[row["name"]],
+                "type_id": strings[row["trigger_type"]],
+                "payload_id": payloads.get(row.get("payload")),
+                "is_test": bool(row.get("is_test", False)),
+            }
+            for row in rows
+        ]
+
+    def ids(self, db: Session, model: type, values: Iterable[str]) -> Dict[str, int]:
+        """Id of each value, adding the values stored for the first time."""
+        cache = self._ids[model]
+        ids, missing = {}, []
+        for value in values:
+            if value in cache:
+                cache.move_to_end(value)
+                ids[value] = cache[value]
+            else:
+                missing.append(value)
+        if missing:
+            resolved = self._resolve(db, model, missing)
+            ids.update(resolved)
+            # Only cached once the transaction commits: a rollback may undo
+            # the insert, and SQLite would hand the id out again
+            db.info.setdefault(_RESOLVED, []).append((self, model, resolved))
+        return ids
+
+    def _resolve(self, db: Session, model: type, values: List[str]) -> Dict[str, int]:
+        if model is EventString:
+            rows = [{"value": value} for value in values]
+            key, column = "value", EventString.value
+        else:
+            rows = [{"digest": payload_digest(body), "body": body} for body in values]
+            key, column = "digest", EventPayload.digest
+        # Concurrent writers may add the same value: the loser reads its id
+        db.execute(
+            self._insert(model).on_conflict_do_nothing(index_elements=[key]), rows
+        )
+        keys = [row[key] for row in rows]
+        query = select(column, model.id).where(column.in_(keys))
+        by_key = dict(db.execute(query).all())
+        return {value: by_key[key] for value, key in zip(values, keys)}
+
+    def _remember(self, model: type, ids: Dict[str, int]):
+        cache = self._ids[model]
+        cache.update(ids)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+
+_registry: "WeakKeyDictionary[Engine, EventContent]" = WeakKeyDictionary()
+
+
+def event_content(db: Session) -> EventContent:
+    """The interned event-log content of the database `db` is bound to."""
+    bind = db.get_bind()
+    engine = bind.engine if isinstance(bind, Connection) else bind
+    content = _registry.get(engine)
+    if content is None:
+        content = _registry[engine] = EventContent(engine)
+    return content
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_resolved(session: Session):
+    for content, model, ids in session.info.pop(_RESOLVED, ()):
+        content._remember(model, ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_resolved(session: Session):
+    session.info.pop(_RESOLVED, None)
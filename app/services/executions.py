@@ -0,0 +1,147 @@
+"""
+Background execution of API triggers.
+
+Creating or testing an API trigger queues its execution here and returns
+right away; the webhook round trip happens on a background task, bounded by
+`ExecutionConfig.CONCURRENCY`. Each execution gets an id whose status can be
+looked up (and waited on) until it falls out of the bounded history.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.services.admission import AdaptiveLimiter, admission_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionConfig:
+    # Executions running at once; the rest wait in QUEUED
+    CONCURRENCY = int(os.getenv("API_EXECUTION_CONCURRENCY", "32"))
+    # Executions whose status is kept, oldest dropped first
+    HISTORY = int(os.getenv("API_EXECUTION_HISTORY", "10000"))
+    MAX_WAIT_SECONDS = 30
+
+
+class ExecutionStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Execution:
+    """One queued run of an API trigger."""
+
+    def __init__(self, trigger_id: int, is_test: bool):
+        self.id = uuid.uuid4().hex
+        self.trigger_id = trigger_id
+        self.is_test = is_test
+        self.status = ExecutionStatus.QUEUED
+        self.submitted_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def _finish(self, result: Optional[Dict[str, Any]]):
+        if result is None or result.get("success"):
+            self.status = ExecutionStatus.SUCCEEDED
+        else:
+            self.status = ExecutionStatus.FAILED
+            self.error = str(result.get("error"))
+        self.finished_at = datetime.utcnow()
+        self._done.set()
+
+
+class ExecutionTracker:
+    """Runs executions on background tasks and keeps their status."""
+
+    def __init__(
+        self,
+        concurrency: int = ExecutionConfig.CONCURRENCY,
+        history: int = ExecutionConfig.HISTORY,
+        limiter: AdaptiveLimiter = admission_limiter,
+    ):
+        self.concurrency = concurrency
+        self.history = history
+        self.limiter = limiter
+        self._executions: "OrderedDict[str, Execution]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        # Created in the loop that runs the executions
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        """Executions queued or running."""
+        return len(self._tasks)
+
+    def submit(
+        self,
+        trigger_id: int,
+        is_test: bool,
+        run: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Execution:
+        """Queue `run` and return its execution without waiting for it."""
+        execution = Execution(trigger_id, is_test)
+        self._executions[execution.id] = execution
+        while len(self._executions) > self.history:
+            self._executions.popitem(last=False)
+        task = asyncio.create_task(self._run(execution, run))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return execution
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def _run(self, execution: Execution, run):
+        # Stays the result if the task is cancelled, queued or running
+        result = {"success": False, "error": "Execution was cancelled"}
+        semaphore = self._get_semaphore()
+        try:
+            # Waiting executions count against admission: a burst of API
+            # fires is shed instead of growing the queue
+            with self.limiter.hold():
+                await semaphore.acquire()
+            try:
+                execution.status = ExecutionStatus.RUNNING
+                execution.started_at = datetime.utcnow()
+                result = await run()
+            finally:
+                semaphore.release()
+        except Exception as e:
+            logger.error(f"Execution {execution.id} failed: {e}")
+            result = {"success": False, "error": str(e)}
+        finally:
+            execution._finish(result)
+
+    def get(self, execution_id: str) -> Optional[Execution]:
+        return self._executions.get(execution_id)
+
+    async def wait(self, execution: Execution, timeout: float) -> Execution:
+        """Wait up to `timeout` seconds for `execution` to finish."""
+        try:
+            await asyncio.wait_for(execution._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return execution
+
+    async def join(self, timeout: Optional[float] = None):
+        """Wait for every queued and running execution, up to `timeout`."""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
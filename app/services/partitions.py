@@ -0,0 +1,296 @@
+"""
+Time-partitioned event-log storage.
+
+Every period of `PartitionConfig.PERIOD_HOURS` gets its own table: on
+Postgres a native range partition of `event_logs`, on SQLite a plain
+`event_logs_pYYYYMMDDHH` table. A query reads only the periods it covers,
+and expiring a period is a DROP TABLE rather than a row-by-row delete.
+"""
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    event,
+    insert,
+    inspect,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+
+class PartitionConfig:
+    PERIOD_HOURS = int(os.getenv("EVENT_LOG_PARTITION_HOURS", "6"))
+
+
+PARENT = "event_logs"
+_NAME = re.compile(rf"^{PARENT}_p(\d{{10}})$")
+_EPOCH = datetime(1970, 1, 1)
+# SQLite ids start at the period's epoch seconds times this, so ids stay
+# unique across partitions (and below 2**53 for JSON clients)
+_ID_STRIDE = 1_000_000
+# Session.info key for partitions created in the session's transaction
+_CREATED = "event_log_partitions"
+
+# Postgres: the primary key of a partitioned table must include the
+# partition key, and the trigger_id foreign key is left out so deleting a
+# trigger does not scan its history. Rows written before deduplication keep
+# their text columns instead of ids (app.services.dedup).
+POSTGRES_PARENT_DDL = f"""
+CREATE TABLE IF NOT EXISTS {PARENT} (
+    id BIGSERIAL,
+    trigger_id INTEGER,
+    triggered_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+    name_id INTEGER,
+    type_id INTEGER,
+    payload_id INTEGER,
+    is_test BOOLEAN DEFAULT false,
+    trigger_type VARCHAR,
+    name VARCHAR,
+    payload VARCHAR,
+    PRIMARY KEY (id, triggered_at)
+) PARTITION BY RANGE (triggered_at)
+"""
+
+# Parents created before deduplication
+POSTGRES_PARENT_UPGRADE_DDL = f"""
+ALTER TABLE {PARENT}
+    ADD COLUMN IF NOT EXISTS name_id INTEGER,
+    ADD COLUMN IF NOT EXISTS type_id INTEGER,
+    ADD COLUMN IF NOT EXISTS payload_id INTEGER,
+    ALTER COLUMN trigger_type DROP NOT NULL,
+    ALTER COLUMN name DROP NOT NULL
+"""
+
+_SQLITE_CATALOG = text(
+    "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :pattern"
+)
+_POSTGRES_CATALOG = text(
+    "SELECT c.relname FROM pg_inherits i"
+    " JOIN pg_class c ON c.oid = i.inhrelid"
+    " JOIN pg_class p ON p.oid = i.inhparent"
+    " WHERE p.relname = :parent"
+)
+_SEED_SEQUENCE = text(
+    "INSERT INTO sqlite_sequence (name, seq) SELECT :name, :seq"
+    " WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"
+)
+
+
+def _columns(legacy: bool = False) -> List[Column]:
+    # Ids into event_strings and event_payloads; `legacy` adds the text
+    # columns of rows written before deduplication
+    columns = [
+        Column("id", Integer, primary_key=True),
+        Column("trigger_id", Integer),
+        Column("triggered_at", DateTime, nullable=False, default=datetime.utcnow),
+        Column("name_id", Integer, nullable=legacy),
+        Column("type_id", Integer, nullable=legacy),
+        Column("payload_id", Integer, nullable=True),
+        Column("is_test", Boolean, default=False),
+    ]
+    if legacy:
+        columns += [
+            Column("trigger_type", String),
+            Column("name", String),
+            Column("payload", String),
+        ]
+    return columns
+
+
+def create_partitioned_parent(bind: Engine):
+    """Create or upgrade the partitioned `event_logs` table on Postgres;
+    no-op elsewhere."""
+    if bind.dialect.name != "postgresql":
+        return
+    with bind.begin() as conn:
+        conn.execute(text(POSTGRES_PARENT_DDL))
+        conn.execute(text(POSTGRES_PARENT_UPGRADE_DDL))
+
+
+class EventLogPartitions:
+    """Partition catalog of one database: naming, creation and drops."""
+
+    def __init__(
+        self, bind: Engine, period_hours: int = PartitionConfig.PERIOD_HOURS
+    ):
+        self.native = bind.dialect.name == "postgresql"
+        self.period = timedelta(hours=period_hours)
+        self._metadata = MetaData()
+        self._tables: Dict[datetime, Table] = {}
+        # Periods whose table is known to be committed
+        self._known = set()
+
+    def period_start(self, moment: datetime) -> datetime:
+        return moment - (moment - _EPOCH) % self.period
+
+    def name(self, start: datetime) -> str:
+        return f"{PARENT}_p{start:%Y%m%d%H}"
+
+    def table(self, start: datetime) -> Table:
+        """The SQLite table of the period starting at `start`."""
+        table = self._tables.get(start)
+        if table is None:
+            name = self.name(start)
+            table = Table(
+                name,
+                self._metadata,
+                *_columns(),
+                Index(f"ix_{name}_triggered_at", "triggered_at"),
+                sqlite_autoincrement=True,
+            )
+            self._tables[start] = table
+        return table
+
+    def ensure(self, db: Session, moment: datetime) -> datetime:
+        """Create the partition holding `moment` if needed; return its start."""
+        start = self.period_start(moment)
+        if start in self._known or (self, start) in db.info.get(_CREATED, ()):
+            return start
+        conn = db.connection()
+        if self.native:
+            end = start + self.period
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {self.name(start)} PARTITION OF "
+                    f"{PARENT} FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+            )
+        else:
+            self._create_sqlite(conn, start)
+        # Only trusted by other sessions once the transaction commits
+        db.info.setdefault(_CREATED, set()).add((self, start))
+        return start
+
+    def _create_sqlite(self, conn: Connection, start: datetime):
+        table = self.table(start)
+        conn.execute(CreateTable(table, if_not_exists=True))
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+        seq = int((start - _EPOCH).total_seconds()) * _ID_STRIDE
+        conn.execute(_SEED_SEQUENCE, {"name": table.name, "seq": seq})
+
+    def periods(self, db: Session) -> List[datetime]:
+        """Start of every existing partition, oldest first."""
+        if self.native:
+            names = db.execute(_POSTGRES_CATALOG, {"parent": PARENT}).scalars()
+        else:
+            pattern = f"{PARENT}_p%"
+            names = db.execute(_SQLITE_CATALOG, {"pattern": pattern}).scalars()
+        starts = []
+        for name in names:
+            match = _NAME.match(name)
+            if match:
+                starts.append(datetime.strptime(match.group(1), "%Y%m%d%H"))
+        return sorted(starts)
+
+    def between(
+        self,
+        db: Session,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[datetime]:
+        """Existing partitions overlapping [start, end)."""
+        return [
+            period
+            for period in self.periods(db)
+            if (start is None or period + self.period > start)
+            and (end is None or period < end)
+        ]
+
+    def insert(self, db: Session, rows: Iterable[dict]):
+        """Insert event-log rows, each into the partition of its triggered_at."""
+        by_period: Dict[datetime, List[dict]] = {}
+        for row in rows:
+            if row.get("triggered_at") is None:
+                row = {**row, "triggered_at": datetime.utcnow()}
+            start = self.period_start(row["triggered_at"])
+            by_period.setdefault(start, []).append(row)
+        for start, period_rows in by_period.items():
+            self.ensure(db, start)
+            target = self.parent if self.native else self.table(start)
+            db.execute(insert(target), period_rows)
+
+    @property
+    def parent(self) -> Table:
+        """The partitioned Postgres table; the server routes its inserts."""
+        table = self._metadata.tables.get(PARENT)
+        if table is None:
+            table = Table(PARENT, self._metadata, *_columns(legacy=True))
+        return table
+
+    def drop_before(
+        self,
+        db: Session,
+        cutoff: datetime,
+        can_drop: Optional[Callable[[datetime], bool]] = None,
+    ) -> List[datetime]:
+        """
+        Drop every partition whose whole period is before `cutoff`, except
+        those `can_drop` rejects.
+        """
+        dropped = []
+        for start in self.periods(db):
+            if start + self.period > cutoff:
+                break
+            if can_drop is not None and not can_drop(start):
+                continue
+            self.drop(db, start)
+            dropped.append(start)
+        return dropped
+
+    def drop(self, db: Session, start: datetime):
+        db.execute(text(f"DROP TABLE IF EXISTS {self.name(start)}"))
+        self._known.discard(start)
+        table = self._tables.pop(start, None)
+        if table is not None:
+            self._metadata.remove(table)
+
+    def legacy_periods(self, db: Session) -> List[datetime]:
+        """SQLite partitions still holding text instead of ids."""
+        if self.native:
+            return []
+        inspector = inspect(db.connection())
+        legacy = []
+        for start in self.periods(db):
+            columns = inspector.get_columns(self.name(start))
+            if "name_id" not in {column["name"] for column in columns}:
+                legacy.append(start)
+        return legacy
+
+
+_registry: "WeakKeyDictionary[Engine, EventLogPartitions]" = WeakKeyDictionary()
+
+
+def event_log_partitions(db: Session) -> EventLogPartitions:
+    """The partition catalog of the database `db` is bound to."""
+    bind = db.get_bind()
+    engine = bind.engine if isinstance(bind, Connection) else bind
+    partitions = _registry.get(engine)
+    if partitions is None:
+        partitions = _registry[engine] = EventLogPartitions(engine)
+    return partitions
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_created(session: Session):
+    for partitions, start in session.info.pop(_CREATED, ()):
+        partitions._known.add(start)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_created(session: Session):
+    # SQLite may have committed the DDL on its own; the next insert re-checks
+    session.info.pop(_CREATED, None)
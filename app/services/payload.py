@@ -0,0 +1,68 @@
+"""
+Trigger payloads compiled into ready-to-send webhook bodies.
+
+A payload is a JSON document whose strings may contain `{{variable}}`
+placeholders, filled in on every fire:
+
+- `{{fire_time}}`: ISO 8601 time of the fire
+- `{{trigger_id}}`: id of the trigger
+- `{{seq}}`: number of the fire for this trigger in the running process
+
+The placeholders must sit inside JSON strings, and their values never need
+escaping, so rendering is a single bytes formatting call on the body. Any
+other `{{...}}` text is part of the message and sent as is.
+"""
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+VARIABLES = ("fire_time", "trigger_id", "seq")
+COMPILE_CACHE_SIZE = 4096
+
+_placeholder_re = re.compile(
+    rb"\{\{\s*(" + b"|".join(name.encode() for name in VARIABLES) + rb")\s*\}\}"
+)
+
+
+class CompiledPayload:
+    """Webhook body of one payload, split around its template variables."""
+
+    __slots__ = ("body", "variables", "_template")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.variables: Tuple[str, ...] = ()
+        self._template: Optional[bytes] = None
+
+        names = [m.decode() for m in _placeholder_re.findall(body)]
+        if names:
+            self.variables = tuple(names)
+            self._template = _placeholder_re.sub(b"%s", body.replace(b"%", b"%%"))
+
+    def render(self, fire_time: datetime, trigger_id: int, seq: int) -> bytes:
+        """The body for one fire; the shared bytes when there are no variables."""
+        if self._template is None:
+            return self.body
+        values = {
+            "fire_time": fire_time.isoformat().encode(),
+            "trigger_id": b"%d" % trigger_id,
+            "seq": b"%d" % seq,
+        }
+        return self._template % tuple(values[name] for name in self.variables)
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_payload(payload: str, test: bool = False) -> CompiledPayload:
+    """
+    Compile a payload string into its Discord webhook body.
+
+    Raises ValueError for invalid JSON.
+    Identical payloads share one compiled instance.
+    """
+    value = json.loads(payload)
+    if test and isinstance(value, dict):
+        value = {**value, "test": True}
+    content = json.dumps(value) if isinstance(value, dict) else str(value)
+    return CompiledPayload(json.dumps({"content": content}).encode())
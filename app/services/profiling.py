@@ -0,0 +1,303 @@
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingConfig:
+    ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+    SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.002"))
+    MAX_STACK_DEPTH = 128
+    MAX_PROFILES = 50
+    DEBUG_TOKEN = os.getenv("PROFILING_DEBUG_TOKEN")
+
+
+# Span timings of the request being handled, or None when it is not profiled.
+# Sync endpoints run in a copied context, so they share the same dict object.
+_spans: contextvars.ContextVar[Optional[Dict[str, List[float]]]] = (
+    contextvars.ContextVar("profiling_spans", default=None)
+)
+
+# Sampler of the current request, if it was picked for stack sampling.
+_sampler: contextvars.ContextVar[Optional["StackSampler"]] = contextvars.ContextVar(
+    "profiling_sampler", default=None
+)
+
+_profiles: Deque[Dict[str, Any]] = deque(maxlen=ProfilingConfig.MAX_PROFILES)
+_sampler_lock = threading.Lock()
+
+
+def _join_sampler() -> Optional["StackSampler"]:
+    """
+    Let the request's sampler follow work moved to a threadpool worker.
+
+    Returns the sampler if this call added the thread, for the caller to
+    detach it again when its span ends.
+    """
+    sampler = _sampler.get()
+    if sampler is not None and sampler.add_thread(threading.get_ident()):
+        return sampler
+    return None
+
+
+def _leave_sampler(sampler: Optional["StackSampler"]):
+    if sampler is not None:
+        sampler.remove_thread(threading.get_ident())
+
+
+def _record(timings: Dict[str, List[float]], name: str, elapsed: float):
+    entry = timings.get(name)
+    if entry is None:
+        timings[name] = [elapsed, 1]
+    else:
+        entry[0] += elapsed
+        entry[1] += 1
+
+
+class _Span:
+    __slots__ = ("_timings", "_name", "_start", "_joined")
+
+    def __init__(
+        self,
+        timings: Dict[str, List[float]],
+        name: str,
+        joined: Optional["StackSampler"] = None,
+    ):
+        self._timings = timings
+        self._name = name
+        self._joined = joined
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _record(self._timings, self._name, time.perf_counter() - self._start)
+        _leave_sampler(self._joined)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str):
+    """Time a block of code as a named span of the current request."""
+    timings = _spans.get()
+    if timings is None:
+        return _NOOP_SPAN
+    return _Span(timings, name, _join_sampler())
+
+
+def timed(name: str) -> Callable:
+    """Decorator recording every call of a sync or async function as a span."""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                timings = _spans.get()
+                if timings is None:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _record(timings, name, time.perf_counter() - start)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _spans.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            joined = _join_sampler()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(timings, name, time.perf_counter() - start)
+                # The worker goes back to the pool and may run other requests
+                _leave_sampler(joined)
+
+        return wrapper
+
+    return decorator
+
+
+def format_server_timing(timings: Dict[str, List[float]], total: float) -> str:
+    """Render span timings as a Server-Timing header value (durations in ms)."""
+    metrics = []
+    for name, (elapsed, count) in timings.items():
+        metric = f"{name};dur={elapsed * 1000:.2f}"
+        if count > 1:
+            metric += f';desc="x{count}"'
+        metrics.append(metric)
+    metrics.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(metrics)
+
+
+class StackSampler:
+    """
+    Samples thread stacks at a fixed interval from a helper thread.
+
+    It starts on the event loop thread; sync endpoints run in the threadpool,
+    so threads running instrumented code of the request are added when they
+    enter a span and removed when it ends. Requests shorter than a few intervals get few samples.
+    """
+
+    def __init__(self, thread_id: int, interval: float = ProfilingConfig.SAMPLE_INTERVAL):
+        self.thread_ids = {thread_id}
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def add_thread(self, thread_id: int) -> bool:
+        """Sample `thread_id` too; False if it already was."""
+        if thread_id in self.thread_ids:
+            return False
+        self.thread_ids.add(thread_id)
+        return True
+
+    def remove_thread(self, thread_id: int):
+        self.thread_ids.discard(thread_id)
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in tuple(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[_collapse_stack(frame)] += 1
+
+
+def _collapse_stack(frame) -> str:
+    stack = []
+    while frame is not None and len(stack) < ProfilingConfig.MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def _start_sampler() -> Optional[StackSampler]:
+    if random.random() >= ProfilingConfig.SAMPLE_RATE:
+        return None
+    # Only one request is sampled at a time; they share the event loop thread.
+    if not _sampler_lock.acquire(blocking=False):
+        return None
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    return sampler
+
+
+def _finish_sampler(
+    sampler: StackSampler, scope: Dict[str, Any], started_at: datetime, duration: float
+):
+    try:
+        samples = sampler.stop()
+    finally:
+        _sampler_lock.release()
+    _profiles.append(
+        {
+            "id": uuid.uuid4().hex,
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "started_at": started_at.isoformat(),
+            "duration_ms": round(duration * 1000, 2),
+            "sample_count": sum(samples.values()),
+            "samples": samples,
+        }
+    )
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Metadata of the stored profiles, newest first."""
+    return [
+        {key: value for key, value in profile.items() if key != "samples"}
+        for profile in reversed(_profiles)
+    ]
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    """A stored profile in collapsed-stack format (one `stack count` per line)."""
+    for profile in _profiles:
+        if profile["id"] == profile_id:
+            return "\n".join(
+                f"{stack} {count}" for stack, count in profile["samples"].most_common()
+            )
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware adding a Server-Timing header and sampling requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, List[float]] = {}
+        token = _spans.set(timings)
+        sampler = _start_sampler()
+        sampler_token = _sampler.set(sampler)
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    format_server_timing(timings, time.perf_counter() - start),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _spans.reset(token)
+            _sampler.reset(sampler_token)
+            if sampler:
+                _finish_sampler(
+                    sampler, scope, started_at, time.perf_counter() - start
+                )
@@ -0,0 +1,141 @@
+"""
+Thundering-herd smoothing for scheduled fires.
+
+Every trigger has an allowed lateness, its `jitter_seconds`. Two stages
+spend it:
+- Jitter: each fire time is moved by a fixed offset within that window,
+  taken from a hash of the trigger id. Cron triggers on the same minute and
+  interval triggers created together then fire spread over the window
+  instead of on the same tick, at the same offset on every fire and in
+  every process.
+- Dispatch smoothing: with `DISPATCH_RATE` set, fires that still come due
+  together are released at most that many per second, each held no longer
+  than what is left of its window.
+"""
+import hashlib
+import os
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, Optional
+
+from apscheduler.triggers.base import BaseTrigger
+
+
+class SmoothingConfig:
+    # Allowed lateness of triggers without their own jitter_seconds
+    DEFAULT_JITTER_SECONDS = int(os.getenv("SCHEDULER_DEFAULT_JITTER_SECONDS", "0"))
+    # Fires released per second during a burst; 0 disables the smoother
+    DISPATCH_RATE = float(os.getenv("SCHEDULER_DISPATCH_RATE", "0"))
+    # Seconds of dispatches the load metrics cover
+    METRICS_WINDOW_SECONDS = 300
+
+
+def allowed_lateness(trigger) -> int:
+    if trigger.jitter_seconds is None:
+        return SmoothingConfig.DEFAULT_JITTER_SECONDS
+    return trigger.jitter_seconds
+
+
+def jitter_offset(trigger_id: int, window_seconds: float) -> timedelta:
+    """The trigger's fixed offset in [0, window), in whole milliseconds."""
+    if window_seconds <= 0:
+        return timedelta(0)
+    digest = hashlib.blake2b(str(trigger_id).encode(), digest_size=8).digest()
+    fraction = int.from_bytes(digest, "big") / 2**64
+    return timedelta(milliseconds=int(fraction * window_seconds * 1000))
+
+
+class OffsetTrigger(BaseTrigger):
+    """Fires `offset` after each fire time of `trigger`."""
+
+    __slots__ = ("trigger", "offset")
+
+    def __init__(self, trigger: BaseTrigger, offset: timedelta):
+        self.trigger = trigger
+        self.offset = offset
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        if previous_fire_time is not None:
+            previous_fire_time -= self.offset
+        fire_time = self.trigger.get_next_fire_time(
+            previous_fire_time, now - self.offset
+        )
+        return None if fire_time is None else fire_time + self.offset
+
+    def __str__(self):
+        return f"{self.trigger} +{self.offset.total_seconds()}s"
+
+    def __repr__(self):
+        return f"<OffsetTrigger ({self.trigger!r}, offset={self.offset})>"
+
+
+class DispatchSmoother:
+    """Releases fires at most `rate` per second, within each fire's budget."""
+
+    def __init__(self, rate: float = SmoothingConfig.DISPATCH_RATE):
+        self.interval = timedelta(seconds=1 / rate)
+        self._next: Optional[datetime] = None
+        # Fires held back, and fires whose budget ran out before their slot
+        self.delayed = 0
+        self.overflow = 0
+        self.max_delay = 0.0
+
+    def delay(self, now: datetime, budget: float) -> float:
+        """Seconds to hold a fire due at `now`, at most `budget`."""
+        slot = now if self._next is None or self._next < now else self._next
+        wait = (slot - now).total_seconds()
+        if wait > budget:
+            # Sent at the end of its window, outside the pacing
+            self.overflow += 1
+            wait = max(budget, 0.0)
+        else:
+            self._next = slot + self.interval
+        if wait > 0:
+            self.delayed += 1
+            self.max_delay = max(self.max_delay, wait)
+        return wait
+
+
+def peak_to_average(times: Iterable[datetime], span_seconds: float) -> Dict:
+    """Peak and mean fires per second over `span_seconds`, and their ratio."""
+    per_second: Dict[int, int] = {}
+    total = 0
+    for moment in times:
+        second = int(moment.timestamp())
+        per_second[second] = per_second.get(second, 0) + 1
+        total += 1
+    peak = max(per_second.values(), default=0)
+    mean = total / span_seconds if span_seconds > 0 else 0.0
+    return {
+        "peak_per_sec": peak,
+        "mean_per_sec": round(mean, 3),
+        "peak_to_average": round(peak / mean, 1) if mean else 0.0,
+    }
+
+
+class DispatchMetrics:
+    """Dispatch times of the last `window` seconds, for load metrics."""
+
+    def __init__(self, window: int = SmoothingConfig.METRICS_WINDOW_SECONDS):
+        self.window = timedelta(seconds=window)
+        self._times: Deque[datetime] = deque()
+        self._lateness: Deque[float] = deque()
+
+    def record(self, dispatched_at: datetime, lateness: float):
+        """Record a dispatch; `lateness` is the seconds smoothing added."""
+        self._times.append(dispatched_at)
+        self._lateness.append(lateness)
+        cutoff = dispatched_at - self.window
+        while self._times and self._times[0] < cutoff:
+            self._times.popleft()
+            self._lateness.popleft()
+
+    def snapshot(self, smoother: Optional[DispatchSmoother] = None) -> Dict:
+        stats = peak_to_average(self._times, self.window.total_seconds())
+        stats["fires"] = len(self._times)
+        stats["max_lateness_ms"] = round(max(self._lateness, default=0.0) * 1000, 1)
+        if smoother is not None:
+            stats["delayed"] = smoother.delayed
+            stats["overflow"] = smoother.overflow
+            stats["max_delay_ms"] = round(smoother.max_delay * 1000, 1)
+        return stats
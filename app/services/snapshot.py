@@ -0,0 +1,187 @@
+"""
+Warm-restart snapshot of the scheduler's jobs.
+
+The scheduler periodically, and at shutdown, writes the triggers of its live
+jobs with their next fire times to one file. On startup it reads the file
+through a memory map instead of loading and planning every trigger from the
+database. The file is a fixed header, one fixed-size record per job, then
+the UTF-8 strings (name, payload, cron schedule) of each record in order:
+- header: magic, version, record count, the database watermark the jobs are
+  current with, and the write time.
+- record: trigger id, next fire time, one-shot schedule, interval, allowed
+  lateness, flags and the byte lengths of its strings. Times are
+  microseconds since the epoch.
+"""
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotConfig:
+    # Empty, the default, disables the snapshot
+    PATH = os.getenv("SCHEDULER_SNAPSHOT_PATH", "")
+    INTERVAL_SECONDS = int(os.getenv("SCHEDULER_SNAPSHOT_INTERVAL_SECONDS", "60"))
+    # Fires missed while the scheduler was down are replayed this many per second
+    CATCH_UP_RATE = float(os.getenv("SCHEDULER_CATCH_UP_RATE", "20"))
+
+
+_MAGIC = b"TSNP"
+_VERSION = 2
+# magic, version, records, watermark, written at
+_HEADER = struct.Struct("<4sHIqq")
+# trigger id, next fire, schedule, interval seconds, jitter seconds, flags,
+# name, payload and cron string lengths
+_RECORD = struct.Struct("<qqqIIBIII")
+_NONE = -(2**63)
+_RECURRING = 1
+_SCHEDULE_AWARE = 2
+_HAS_INTERVAL = 4
+_HAS_JITTER = 8
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class JobState(NamedTuple):
+    """A job's trigger as snapshotted; restored jobs run with it as argument."""
+
+    trigger_id: int
+    name: str
+    payload: str
+    # One-shot time or cron expression
+    schedule: Union[datetime, str, None]
+    is_recurring: bool
+    interval_seconds: Optional[int]
+    # UTC; the next fire the job was waiting for (all earlier ones ran)
+    next_run_time: Optional[datetime]
+    jitter_seconds: Optional[int] = None
+
+    # Only scheduled triggers have jobs
+    trigger_type = "scheduled"
+
+    @property
+    def id(self) -> int:
+        return self.trigger_id
+
+
+class Snapshot(NamedTuple):
+    # Latest trigger change (naive UTC) already applied to the jobs
+    watermark: datetime
+    written_at: datetime
+    jobs: List[JobState]
+
+
+def _micros(moment: Optional[datetime]) -> int:
+    if moment is None:
+        return _NONE
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def _moment(micros: int, aware: bool = True) -> Optional[datetime]:
+    if micros == _NONE:
+        return None
+    moment = _EPOCH + timedelta(microseconds=micros)
+    return moment.replace(tzinfo=timezone.utc) if aware else moment
+
+
+def write_snapshot(path: str, watermark: datetime, jobs: List[JobState]):
+    """Replace the snapshot at `path`; readers never see a partial file."""
+    records, strings = [], []
+    for job in jobs:
+        flags = _RECURRING if job.is_recurring else 0
+        if job.interval_seconds is not None:
+            flags |= _HAS_INTERVAL
+        if job.jitter_seconds is not None:
+            flags |= _HAS_JITTER
+        cron = ""
+        schedule = _NONE
+        if isinstance(job.schedule, str):
+            cron = job.schedule
+        elif job.schedule is not None:
+            schedule = _micros(job.schedule)
+            if job.schedule.tzinfo is not None:
+                flags |= _SCHEDULE_AWARE
+        name, payload, cron = (
+            value.encode() for value in (job.name, job.payload or "", cron)
+        )
+        records.append(
+            _RECORD.pack(
+                job.trigger_id,
+                _micros(job.next_run_time),
+                schedule,
+                job.interval_seconds or 0,
+                job.jitter_seconds or 0,
+                flags,
+                len(name),
+                len(payload),
+                len(cron),
+            )
+        )
+        strings += (name, payload, cron)
+
+    header = _HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        len(records),
+        _micros(watermark),
+        _micros(datetime.now(timezone.utc)),
+    )
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(header + b"".join(records) + b"".join(strings))
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: str) -> Optional[Snapshot]:
+    """The snapshot at `path`, or None if there is none or it is unreadable."""
+    try:
+        with open(path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data, memoryview(data) as view:
+            return _decode(view)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+        logger.warning(f"Ignoring unreadable scheduler snapshot {path}: {e}")
+        return None
+
+
+def _decode(view: memoryview) -> Snapshot:
+    magic, version, count, watermark, written_at = _HEADER.unpack_from(view)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("not a scheduler snapshot")
+    offset = _HEADER.size + count * _RECORD.size
+    if len(view) < offset:
+        raise ValueError("truncated")
+
+    jobs = []
+    records = _RECORD.iter_unpack(view[_HEADER.size : offset])
+    for trigger_id, next_run, schedule, interval, jitter, flags, *lengths in records:
+        name, payload, cron = (
+            str(view[offset + start : offset + start + length], "utf-8")
+            for start, length in zip(
+                (0, lengths[0], lengths[0] + lengths[1]), lengths
+            )
+        )
+        offset += sum(lengths)
+        jobs.append(
+            JobState(
+                trigger_id,
+                name,
+                payload,
+                cron or _moment(schedule, aware=bool(flags & _SCHEDULE_AWARE)),
+                bool(flags & _RECURRING),
+                interval if flags & _HAS_INTERVAL else None,
+                _moment(next_run),
+                jitter if flags & _HAS_JITTER else None,
+            )
+        )
+    if offset != len(view):
+        raise ValueError("size does not match its records")
+    return Snapshot(_moment(watermark, aware=False), _moment(written_at), jobs)
@@ -1,31 +1,81 @@
 import json
 import logging
 import os
-from typing import Dict, Any, Optional
-import aiohttp
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+from sqlalchemy import func
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
 from datetime import datetime, timedelta
 import asyncio
 
-import requests
-from fastapi.security import OAuth2
+from app.crud.event import add_event_logs, compact_event_logs, expire_event_logs
+from app.services.admission import AdaptiveLimiter, admission_limiter
+from app.services.archive import ArchiveConfig, EventArchive, event_archive
+from app.services.batching import BatchConfig, WebhookBatcher
 from app.services.cache import cache_client
+from app.services.clock import SystemClock
+from app.services.executions import Execution, ExecutionTracker
+from app.services.cron import CompiledCronTrigger, cron_trigger, next_fire_times
+from app.services.payload import compile_payload
+from app.services.profiling import timed
+from app.services.smoothing import (
+    DispatchMetrics,
+    DispatchSmoother,
+    OffsetTrigger,
+    SmoothingConfig,
+    allowed_lateness,
+    jitter_offset,
+)
+from app.services.snapshot import (
+    JobState,
+    Snapshot,
+    SnapshotConfig,
+    read_snapshot,
+    write_snapshot,
+)
 
 from app.services.db import SessionLocal
-from app.models import EventLog, Trigger
+from app.models import Trigger, TriggerTombstone
 from app.schemas import TriggerCreate
 
+if TYPE_CHECKING:
+    import aiohttp
+
 url = os.getenv("HTTP_URL")
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Seconds shutdown waits for running executions
+DRAIN_TIMEOUT = float(os.getenv("SCHEDULER_DRAIN_TIMEOUT", "10"))
 
-# Configure a more streamlined logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-formatter = logging.Formatter("%(asctime)s - %(levelname)s: %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+
+
+class SchedulerState(str, Enum):
+    STOPPED = "stopped"
+    STARTING = "starting"  # loading triggers from the database
+    READY = "ready"
+    DRAINING = "draining"  # no new fires, waiting for running executions
+
+
+class ReconcileConfig:
+    INTERVAL_SECONDS = int(os.getenv("RECONCILE_INTERVAL_SECONDS", "30"))
+    # Rows are re-read this far behind the watermark, so a transaction that
+    # stamped updated_at before a newer one but committed after it is not missed.
+    OVERLAP_SECONDS = int(os.getenv("RECONCILE_OVERLAP_SECONDS", "5"))
+    TOMBSTONE_RETENTION_HOURS = 48
+
+
+def _timing_key(trigger) -> tuple:
+    return (
+        trigger.trigger_type,
+        trigger.schedule,
+        trigger.is_recurring,
+        trigger.interval_seconds,
+        trigger.jitter_seconds,
+    )
 
 
 class TriggerScheduler:
@@ -37,51 +87,151 @@ class TriggerScheduler:
     def get_instance(cls):
         """Thread-safe singleton method."""
         if not cls._instance:
-            cls._instance = cls()
+            cls._instance = cls(snapshot_path=SnapshotConfig.PATH or None)
         return cls._instance
 
-    def __init__(self):
+    def __init__(
+        self,
+        clock=None,
+        session_factory=SessionLocal,
+        timezone=None,
+        archive: EventArchive = event_archive,
+        limiter: AdaptiveLimiter = admission_limiter,
+        snapshot_path: Optional[str] = None,
+        batch_window_ms: float = BatchConfig.WINDOW_MS,
+        dispatch_rate: float = SmoothingConfig.DISPATCH_RATE,
+    ):
         if hasattr(self, "_initialized"):
             return
 
-        self.scheduler = AsyncIOScheduler()
+        # Cron and naive one-shot schedules are read in the scheduler's
+        # timezone (the host's local zone unless given).
+        self.scheduler = (
+            AsyncIOScheduler(timezone=timezone) if timezone else AsyncIOScheduler()
+        )
+        self.clock = clock or SystemClock()
+        self.session_factory = session_factory
+        self.archive = archive
+        self.limiter = limiter
         self.active_jobs: Dict[int, Dict[str, Any]] = {}
+        # Latest updated_at/deleted_at applied from the database
+        self.watermark: Optional[datetime] = None
+        self._http: Optional["aiohttp.ClientSession"] = None
+        self.state = SchedulerState.STOPPED
+        self._in_flight = 0
+        # API-trigger executions, run in the background
+        self.executions = ExecutionTracker(limiter=limiter)
+        # Fires per trigger id, the `{{seq}}` payload variable
+        self._fire_counts: Dict[int, int] = {}
+        # Warm-restart snapshot file; None disables it
+        self.snapshot_path = snapshot_path
+        # Fires missed while down, by trigger id, until caught up
+        self._missed: Dict[int, tuple] = {}
+        self._catch_up_task: Optional[asyncio.Task] = None
+        # Combines webhook requests to the same URL; None sends each alone
+        self.batcher = (
+            WebhookBatcher(self._post, window_ms=batch_window_ms)
+            if batch_window_ms > 0
+            else None
+        )
+        # Paces bursts of scheduled fires; None dispatches them on time
+        self.smoother = DispatchSmoother(dispatch_rate) if dispatch_rate > 0 else None
+        self.dispatch_metrics = DispatchMetrics()
         self._initialized = True
 
-    async def add_trigger(self, trigger: TriggerCreate, test: bool = False):
+    def build_job_trigger(self, trigger: TriggerCreate):
+        """Build the APScheduler trigger for a scheduled trigger, or None."""
+        if trigger.trigger_type != "scheduled":
+            return None
+        now = self.clock.now()
+        # Spreads triggers due on the same tick over their allowed lateness
+        offset = jitter_offset(trigger.id, allowed_lateness(trigger))
+        if trigger.is_recurring:
+            return IntervalTrigger(
+                seconds=trigger.interval_seconds,
+                start_date=now + timedelta(seconds=trigger.interval_seconds) + offset,
+            )
+        tz = self.scheduler.timezone
+        if isinstance(trigger.schedule, str):
+            try:
+                job_trigger = cron_trigger(trigger.schedule, tz)
+            except ValueError:
+                # Syntax the compiler does not cover ("last", "2nd mon", ...)
+                job_trigger = CronTrigger.from_crontab(trigger.schedule, timezone=tz)
+            # Shared cron triggers are stateless; the offset wraps them
+            return OffsetTrigger(job_trigger, offset) if offset else job_trigger
+        if isinstance(trigger.schedule, datetime):
+            run_date = trigger.schedule
+            if run_date.tzinfo is None:
+                run_date = run_date.replace(tzinfo=tz)
+            # One-shot triggers that already passed are not run again.
+            if run_date < now:
+                return None
+            return DateTrigger(run_date=run_date + offset)
+        return None
+
+    def plan_job_triggers(self, triggers) -> Dict[int, Optional[tuple]]:
         """
-        Add a new trigger to the scheduler with optional test mode.
+        Build the job trigger of every trigger in a batch.
+
+        Returns `(job_trigger, next_run_time)` per trigger id, or None for
+        triggers that cannot be scheduled. The first fire of all cron
+        triggers without jitter is computed in one pass over their interned
+        schedules.
+        """
+        planned: Dict[int, Optional[tuple]] = {}
+        cron_ids, crons = [], []
+        for trigger in triggers:
+            try:
+                job_trigger = self.build_job_trigger(trigger)
+            except Exception as e:
+                logger.error(f"Trigger {trigger.id} scheduling failed: {e}")
+                planned[trigger.id] = None
+                continue
+            planned[trigger.id] = (job_trigger, None)
+            if isinstance(job_trigger, CompiledCronTrigger):
+                cron_ids.append(trigger.id)
+                crons.append(job_trigger.cron)
+
+        for trigger_id, fire_time in zip(
+            cron_ids, next_fire_times(crons, self.clock.now())
+        ):
+            planned[trigger_id] = (planned[trigger_id][0], fire_time)
+        return planned
+
+    @timed("scheduler.add_trigger")
+    async def add_trigger(
+        self,
+        trigger: TriggerCreate,
+        test: bool = False,
+        job_trigger=None,
+        next_run_time: Optional[datetime] = None,
+    ) -> Optional[Execution]:
+        """
+        Add a new trigger to the scheduler with optional test mode. API
+        triggers are not scheduled: their execution is queued and returned.
 
         :param trigger: Trigger object with scheduling details
         :param test: Flag to indicate if this is a test trigger
+        :param job_trigger: Prebuilt APScheduler trigger, if already known
+        :param next_run_time: Precomputed first fire time, if already known
         """
         try:
             job_id = str(trigger.id)
 
-            if job_id in self.active_jobs:
+            if trigger.id in self.active_jobs:
                 self.remove_trigger(trigger.id)
 
-            job_trigger = None
-            if trigger.trigger_type == "scheduled":
-                if trigger.is_recurring:
-                    job_trigger = IntervalTrigger(seconds=trigger.interval_seconds)
-                elif trigger.schedule:
-                    if isinstance(trigger.schedule, str):
-                        job_trigger = CronTrigger.from_crontab(trigger.schedule)
-                    elif isinstance(trigger.schedule, datetime):
-                        job_trigger = CronTrigger(
-                            year=trigger.schedule.year,
-                            month=trigger.schedule.month,
-                            day=trigger.schedule.day,
-                            hour=trigger.schedule.hour,
-                            minute=trigger.schedule.minute,
-                        )
+            if job_trigger is None:
+                job_trigger = self.build_job_trigger(trigger)
 
             if trigger.trigger_type == "api":
-                await self._execute_trigger(trigger, test)
-                return
+                return self.executions.submit(
+                    trigger.id, test, lambda: self._execute_trigger(trigger, test)
+                )
 
             if job_trigger:
+                job_options = {"next_run_time": next_run_time} if next_run_time else {}
                 job = self.scheduler.add_job(
                     self._execute_trigger,
                     trigger=job_trigger,
@@ -90,57 +240,36 @@ class TriggerScheduler:
                     max_instances=1,
                     misfire_grace_time=None,
                     coalesce=True,
+                    **job_options,
                 )
 
                 self.active_jobs[trigger.id] = {
                     "job": job,
                     "trigger": trigger,
                     "is_test": test,
+                    "timing": _timing_key(trigger),
                 }
 
         except Exception as e:
             log_method = logger.debug if test else logger.error
             log_method(f"{'Test ' if test else ''}Trigger scheduling failed: {e}")
 
+    @timed("scheduler.handle_http_request")
     async def _handle_http_request(
         self, payload: Any, test: bool, trigger_id: int
     ) -> Dict[str, Any]:
         try:
-            # Convert payload to dict if it's a string
-            payload_dict = json.loads(payload) if isinstance(payload, str) else payload
-
-            if test:
-                payload_dict = (
-                    {**payload_dict, "test": True}
-                    if isinstance(payload_dict, dict)
-                    else payload_dict
-                )
-
-            # Format payload for Discord webhook
-            formatted_payload = {
-                "content": (
-                    json.dumps(payload_dict)
-                    if isinstance(payload_dict, dict)
-                    else str(payload_dict)
-                )
-            }
+            compiled = compile_payload(payload, test)
+            seq = self._fire_counts.get(trigger_id, 0) + 1
+            self._fire_counts[trigger_id] = seq
+            body = compiled.render(self.clock.now(), trigger_id, seq)
 
-            headers = {"Content-Type": "application/json"}
-            logger.info(f"Sending webhook request: {formatted_payload}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Sending webhook request: {body.decode()}")
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url, json=formatted_payload, headers=headers
-                ) as response:
-                    logger.info(f"Webhook response status: {response.status}")
-
-                    if response.status in [200, 204]:
-                        logger.info("Webhook message sent successfully")
-                        return {"success": True, "message": "Message sent successfully"}
-                    else:
-                        response_text = await response.text()
-                        logger.error(f"Webhook send failed: {response_text}")
-                        return {"success": False, "error": response_text}
+            if self.batcher is not None:
+                return await self.batcher.submit(url, body)
+            return await self._post(url, body)
 
         except json.JSONDecodeError as je:
             logger.error(f"Invalid JSON payload: {je}")
@@ -149,6 +278,35 @@ class TriggerScheduler:
             logger.error(f"Webhook request error: {e}")
             return {"success": False, "error": str(e)}
 
+    async def _post(self, url: str, body: bytes) -> Dict[str, Any]:
+        """Send one webhook request; its result."""
+        async with self._http_session().post(
+            url, data=body, headers=JSON_HEADERS
+        ) as response:
+            logger.info(f"Webhook response status: {response.status}")
+
+            if response.status in [200, 204]:
+                logger.info("Webhook message sent successfully")
+                return {"success": True, "message": "Message sent successfully"}
+            else:
+                response_text = await response.text()
+                logger.error(f"Webhook send failed: {response_text}")
+                return {"success": False, "error": response_text}
+
+    def _http_session(self) -> "aiohttp.ClientSession":
+        """Session shared by all webhook requests, so connections are reused."""
+        if self._http is None or self._http.closed:
+            # Imported on first use: aiohttp is a large part of the app's import time
+            import aiohttp
+
+            self._http = aiohttp.ClientSession()
+        return self._http
+
+    async def close_http_session(self):
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
     async def _cleanup_test_trigger(self, trigger_id: int) -> bool:
         """Clean up test trigger from both cache and scheduler."""
         try:
@@ -168,82 +326,394 @@ class TriggerScheduler:
             logger.error(f"Test trigger cleanup failed: {e}")
             return False
 
-    async def _execute_trigger(self, trigger: TriggerCreate, test: bool = False):
-        """Execute the trigger's payload."""
+    def _write_event_log(self, db, trigger: TriggerCreate, test: bool):
+        add_event_logs(
+            db,
+            [
+                {
+                    "trigger_id": trigger.id,
+                    "trigger_type": trigger.trigger_type,
+                    "name": trigger.name,
+                    "payload": trigger.payload,
+                    "is_test": test,
+                }
+            ],
+        )
+
+    @timed("scheduler.execute_trigger")
+    async def _execute_trigger(
+        self, trigger: TriggerCreate, test: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Execute the trigger's payload; returns the webhook result, if any."""
+        self._in_flight += 1
+        result = None
         try:
-            with SessionLocal() as db:
-                event_log = EventLog(
-                    trigger_id=trigger.id,
-                    trigger_type=trigger.trigger_type,
-                    name=trigger.name,
-                    payload=trigger.payload,
-                    is_test=test,
-                )
+            if trigger.trigger_type == "scheduled" and not test:
+                await self._smooth_dispatch(trigger)
+            # Fires are never shed, but take capacity from API and test requests
+            with self.limiter.hold():
+                with self.session_factory() as db:
+                    self._write_event_log(db, trigger, test)
+                    db.commit()
 
-                db.add(event_log)
-                db.commit()
+                    logger.info(
+                        f"{'Test ' if test else ''}Trigger {trigger.id} executed"
+                    )
 
-                logger.info(f"{'Test ' if test else ''}Trigger {trigger.id} executed")
+                if trigger.trigger_type == "api":
+                    result = await self._handle_http_request(
+                        trigger.payload, test, trigger.id
+                    )
 
-            if trigger.trigger_type == "api":
-                await self._handle_http_request(trigger.payload, test, trigger.id)
-
-            if test:
-                await self._cleanup_test_trigger(trigger.id)
+                if test:
+                    await self._cleanup_test_trigger(trigger.id)
 
-                self.remove_trigger(trigger.id)
+                    self.remove_trigger(trigger.id)
 
         except Exception as e:
             log_method = logger.warning if test else logger.error
             log_method(f"{'Test ' if test else ''}Trigger {trigger.id} failed: {e}")
+            result = {"success": False, "error": str(e)}
+        finally:
+            self._in_flight -= 1
+        return result
+
+    async def _smooth_dispatch(self, trigger):
+        """Hold a fire for the smoother, within what is left of its lateness."""
+        lateness = allowed_lateness(trigger)
+        offset = jitter_offset(trigger.id, lateness).total_seconds()
+        now = self.clock.now()
+        delay = 0.0
+        if self.smoother is not None:
+            delay = self.smoother.delay(now, lateness - offset)
+            if delay > 0:
+                await self._hold(delay)
+        self.dispatch_metrics.record(now + timedelta(seconds=delay), offset + delay)
+
+    async def _hold(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    def dispatch_stats(self) -> Dict[str, Any]:
+        """Load of the recent scheduled fires: peak-to-average, lateness."""
+        return self.dispatch_metrics.snapshot(self.smoother)
 
     def remove_trigger(self, trigger_id: int):
         """Remove a scheduled trigger."""
+        self._missed.pop(trigger_id, None)
+        self._fire_counts.pop(trigger_id, None)
         if trigger_id in self.active_jobs:
-            job = self.active_jobs[trigger_id]["job"]
-            job.remove()
-            del self.active_jobs[trigger_id]
+            job = self.active_jobs.pop(trigger_id)["job"]
+            try:
+                job.remove()
+            except JobLookupError:
+                # One-shot jobs are dropped by APScheduler once they have run
+                pass
             logger.info(f"Trigger {trigger_id} removed")
 
+    async def apply_change(self, trigger: Trigger):
+        """
+        Bring the live job of a changed trigger in line with its row.
+
+        A name or payload change swaps the job arguments in place, keeping
+        the next fire time and interval phase; only a change of the timing
+        fields rebuilds the job trigger.
+        """
+        entry = self.active_jobs.get(trigger.id)
+        if entry is None or self.scheduler.get_job(str(trigger.id)) is None:
+            if entry is not None:
+                self.remove_trigger(trigger.id)
+            if trigger.trigger_type == "scheduled":
+                await self.add_trigger(trigger)
+            return
+
+        if trigger.trigger_type != "scheduled":
+            self.remove_trigger(trigger.id)
+            return
+
+        timing = _timing_key(trigger)
+        previous = entry["trigger"]
+        if (timing, trigger.name, trigger.payload) == (
+            entry["timing"],
+            previous.name,
+            previous.payload,
+        ):
+            return
+        if timing != entry["timing"]:
+            job_trigger = self.build_job_trigger(trigger)
+            if job_trigger is None:
+                self.remove_trigger(trigger.id)
+                return
+            entry["job"].reschedule(job_trigger)
+            entry["timing"] = timing
+            logger.info(f"Trigger {trigger.id} rescheduled")
+        entry["job"].modify(args=[trigger, entry["is_test"]])
+        entry["trigger"] = trigger
+
+    @staticmethod
+    def _latest_change(db) -> datetime:
+        stamps = [
+            db.query(func.max(Trigger.updated_at)).scalar(),
+            db.query(func.max(TriggerTombstone.deleted_at)).scalar(),
+        ]
+        return max((stamp for stamp in stamps if stamp), default=datetime(1970, 1, 1))
+
+    async def reconcile(self):
+        """Apply triggers changed or deleted in the database since the watermark."""
+        if self.watermark is None:
+            return
+        since = self.watermark - timedelta(seconds=ReconcileConfig.OVERLAP_SECONDS)
+        with self.session_factory() as db:
+            changed = (
+                db.query(Trigger)
+                .filter(Trigger.updated_at > since)
+                .order_by(Trigger.updated_at)
+                .all()
+            )
+            deleted = (
+                db.query(TriggerTombstone)
+                .filter(TriggerTombstone.deleted_at > since)
+                .all()
+            )
+
+        changed_ids = {trigger.id for trigger in changed}
+        for tombstone in deleted:
+            # A tombstone of a reused id is superseded by the new row
+            if tombstone.trigger_id not in changed_ids:
+                self.remove_trigger(tombstone.trigger_id)
+            self.watermark = max(self.watermark, tombstone.deleted_at)
+        for trigger in changed:
+            try:
+                await self.apply_change(trigger)
+            except Exception as e:
+                logger.error(f"Trigger {trigger.id} reconciliation failed: {e}")
+            self.watermark = max(self.watermark, trigger.updated_at)
+
     def remove_old_logs(self):
-        """Remove event logs older than 48 hours."""
-        with SessionLocal() as db:
-            db.query(EventLog).filter(
-                EventLog.triggered_at < datetime.utcnow() - timedelta(hours=48)
+        """
+        Compact sealed event-log partitions into the archive, then drop the
+        archived partitions older than 48 hours, and stale tombstones. Rows
+        live until their whole partition has expired.
+        """
+        now = self.clock.now().replace(tzinfo=None)
+        cutoff = now - timedelta(hours=48)
+        tombstone_cutoff = now - timedelta(
+            hours=ReconcileConfig.TOMBSTONE_RETENTION_HOURS
+        )
+        with self.session_factory() as db:
+            compact_event_logs(db, self.archive, now)
+            dropped = expire_event_logs(db, cutoff, now, archived=self.archive.has)
+            db.query(TriggerTombstone).filter(
+                TriggerTombstone.deleted_at < tombstone_cutoff
             ).delete()
             db.commit()
-        logger.info("Old logs cleaned up")
+        self.archive.prune(now - timedelta(days=ArchiveConfig.RETENTION_DAYS))
+        logger.info(f"Old logs cleaned up, {len(dropped)} partitions dropped")
 
     async def start(self):
-        """Start the scheduler."""
-        if not self.scheduler.running:
-            self.scheduler.start()
+        """Start the scheduler and load the triggers; READY once loaded."""
+        if self.scheduler.running:
+            return
+        self.state = SchedulerState.STARTING
+        try:
+            # Bind to this loop: a restart (a new lifespan) runs in a new one
+            self.scheduler.configure(
+                timezone=self.scheduler.timezone,
+                event_loop=asyncio.get_running_loop(),
+            )
+            # Paused while loading: a running scheduler wakes up on every add
+            self.scheduler.start(paused=True)
             self.scheduler.add_job(
                 self.remove_old_logs, trigger=CronTrigger.from_crontab("*/5 * * * *")
             )
 
-            with SessionLocal() as db:
-                to_schedule = db.query(Trigger).all()
-                for trigger in to_schedule:
-                    await self.add_trigger(trigger)
+            with self.session_factory() as db:
+                # Taken before the full load; the overlap window covers the gap
+                self.watermark = self._latest_change(db)
+                snapshot = self._usable_snapshot(self.watermark)
+                if snapshot is None:
+                    await self._schedule_all(db.query(Trigger).all())
+            if snapshot is not None:
+                latest, self.watermark = self.watermark, snapshot.watermark
+                await self._restore(snapshot.jobs)
+                if latest > self.watermark:
+                    await self.reconcile()
 
-            logger.info("Scheduler started with existing triggers")
+            self.scheduler.add_job(
+                self.reconcile,
+                trigger=IntervalTrigger(seconds=ReconcileConfig.INTERVAL_SECONDS),
+                id="reconcile",
+                max_instances=1,
+                coalesce=True,
+            )
+            if self.snapshot_path:
+                self.scheduler.add_job(
+                    self._snapshot_job,
+                    trigger=IntervalTrigger(seconds=SnapshotConfig.INTERVAL_SECONDS),
+                    id="snapshot",
+                    coalesce=True,
+                )
+            self.scheduler.resume()
+        except BaseException:
+            self.shutdown()
+            raise
+        self.state = SchedulerState.READY
+        if self._missed:
+            self._catch_up_task = asyncio.create_task(self._catch_up())
+        source = "its snapshot" if snapshot else "the database"
+        logger.info(f"Scheduler started with existing triggers from {source}")
+
+    async def _schedule_all(self, triggers):
+        planned = self.plan_job_triggers(triggers)
+        for trigger in triggers:
+            plan = planned[trigger.id]
+            # API triggers have no job; adding them would run them
+            if plan is None or plan[0] is None:
+                continue
+            job_trigger, next_run_time = plan
+            await self.add_trigger(
+                trigger, job_trigger=job_trigger, next_run_time=next_run_time
+            )
+
+    def _usable_snapshot(self, latest: datetime) -> Optional[Snapshot]:
+        """The snapshot, if the changes since it can be reconciled."""
+        if not self.snapshot_path:
+            return None
+        snapshot = read_snapshot(self.snapshot_path)
+        if snapshot is None:
+            return None
+        tombstones_kept = self.clock.now().replace(tzinfo=None) - timedelta(
+            hours=ReconcileConfig.TOMBSTONE_RETENTION_HOURS
+        )
+        if snapshot.watermark > latest:
+            reason = "it is ahead of the database"
+        elif snapshot.watermark < min(latest, tombstones_kept):
+            reason = "deletes since it may have been purged"
+        else:
+            return snapshot
+        logger.warning(f"Scheduler snapshot not used: {reason}")
+        return None
+
+    async def _restore(self, jobs: List[JobState]):
+        """
+        Rebuild the jobs of a snapshot. Interval triggers keep their phase;
+        a fire that came due while the scheduler was down is queued for the
+        catch-up, once per trigger.
+        """
+        now = self.clock.now()
+        to_plan = []
+        for state in jobs:
+            if state.next_run_time is not None and state.next_run_time <= now:
+                self._missed[state.trigger_id] = (state.next_run_time, state)
+            if not state.is_recurring or state.next_run_time is None:
+                to_plan.append(state)
+                continue
+            # Anchored on the fire it was waiting for, so the phase is kept
+            job_trigger = IntervalTrigger(
+                seconds=state.interval_seconds, start_date=state.next_run_time
+            )
+            await self.add_trigger(
+                state,
+                job_trigger=job_trigger,
+                next_run_time=job_trigger.get_next_fire_time(None, now),
+            )
+        await self._schedule_all(to_plan)
+
+    async def _catch_up(self):
+        """Run the missed fires, oldest first, at `CATCH_UP_RATE` per second."""
+        missed = sorted(self._missed.items(), key=lambda item: item[1][0])
+        logger.info(f"Catching up {len(missed)} missed fires")
+        for trigger_id, (_, trigger) in missed:
+            # Dropped if the trigger was deleted or rescheduled meanwhile
+            if self._missed.pop(trigger_id, None) is None:
+                continue
+            entry = self.active_jobs.get(trigger_id)
+            await self._execute_trigger(entry["trigger"] if entry else trigger)
+            await asyncio.sleep(1 / SnapshotConfig.CATCH_UP_RATE)
+
+    def write_snapshot(self):
+        """Write the live jobs to the snapshot file, if one is configured."""
+        if not self.snapshot_path or self.watermark is None:
+            return
+        jobs = []
+        for trigger_id in self.active_jobs.keys() | self._missed.keys():
+            entry = self.active_jobs.get(trigger_id)
+            # One-shot jobs are gone from APScheduler once they have run
+            job = entry and self.scheduler.get_job(str(trigger_id))
+            missed_at, trigger = self._missed.get(trigger_id, (None, None))
+            if missed_at is None and (job is None or entry["is_test"]):
+                continue
+            trigger = entry["trigger"] if entry else trigger
+            jobs.append(
+                JobState(
+                    trigger_id,
+                    trigger.name,
+                    trigger.payload,
+                    trigger.schedule,
+                    bool(trigger.is_recurring),
+                    trigger.interval_seconds,
+                    # A fire not caught up yet stays due in the next process
+                    missed_at or job.next_run_time,
+                    trigger.jitter_seconds,
+                )
+            )
+        try:
+            write_snapshot(self.snapshot_path, self.watermark, jobs)
+        except OSError as e:
+            logger.error(f"Scheduler snapshot failed: {e}")
+
+    async def _snapshot_job(self):
+        # A coroutine, so it runs on the loop that changes the jobs
+        self.write_snapshot()
+
+    async def drain(self, timeout: float = DRAIN_TIMEOUT):
+        """Stop firing, wait up to `timeout` for running executions, shut down."""
+        if self.state == SchedulerState.STOPPED:
+            return
+        self.state = SchedulerState.DRAINING
+        if self.scheduler.running:
+            self.scheduler.pause()
+        if self._catch_up_task is not None:
+            # Fires it has not reached are kept in the snapshot
+            self._catch_up_task.cancel()
+            self._catch_up_task = None
+        if self.batcher is not None:
+            self.batcher.flush_all()
+        deadline = asyncio.get_running_loop().time() + timeout
+        # Queued API executions count too: they run once a slot frees up
+        while (self._in_flight or self.executions.pending) and (
+            asyncio.get_running_loop().time() < deadline
+        ):
+            await asyncio.sleep(0.05)
+        if self._in_flight or self.executions.pending:
+            logger.warning(
+                f"Shutting down with {self._in_flight} executions running, "
+                f"{self.executions.pending} API executions unfinished"
+            )
+        self.write_snapshot()
+        self.shutdown()
+        await self.close_http_session()
 
     def shutdown(self):
         """Shutdown the scheduler gracefully."""
+        self.state = SchedulerState.STOPPED
         if self.scheduler.running:
-            self.scheduler.shutdown()
+            self.scheduler.shutdown(wait=False)
             logger.info("Scheduler stopped")
 
 
+# Cheap to build: the APScheduler loop, HTTP session and jobs are only
+# created by start() and on first use.
 scheduler = TriggerScheduler.get_instance()
 
 
-def initialize_scheduler():
-    """Initialize and start the scheduler."""
-    asyncio.create_task(scheduler.start())
+async def start_scheduler():
+    """Start the scheduler, logging (not raising) failures."""
+    try:
+        await scheduler.start()
+    except Exception as e:
+        logger.error(f"Scheduler start failed: {e}")
 
 
-def shutdown_scheduler():
-    """Shutdown the scheduler."""
-    scheduler.shutdown()
+async def shutdown_scheduler():
+    """Drain and stop the scheduler."""
+    await scheduler.drain()
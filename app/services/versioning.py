@@ -0,0 +1,47 @@
+"""Versions of collections read from the database, used as ETags."""
+import hashlib
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Trigger
+
+
+class CollectionVersion:
+    """
+    The row count and latest change time of a table, as an ETag.
+
+    Both come from one aggregate query, so a write made by any process
+    changes the tag, and every worker hands out the same tag for the same
+    rows. Inserts and updates move the latest `updated_at`, deletes the
+    count. Writes must bump `updated_at`, as reconciliation also needs.
+    """
+
+    def __init__(self, updated_at):
+        self._query = select(func.count(), func.max(updated_at)).select_from(
+            updated_at.table
+        )
+
+    def etag(self, db: Session) -> str:
+        count, updated_at = db.execute(self._query).one()
+        digest = hashlib.blake2b(
+            f"{count}:{updated_at}".encode(), digest_size=8
+        ).hexdigest()
+        # Weak: the same version is served gzipped or not.
+        return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+triggers_version = CollectionVersion(Trigger.updated_at)
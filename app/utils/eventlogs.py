@@ -1,38 +1,64 @@
-import json
-import logging
-from typing import List
 from datetime import datetime
-from app.models import EventLog
-from app.schemas import EventLogResponse
+from json.encoder import encode_basestring
+from typing import Iterable, Optional, Tuple
 
-logger = logging.getLogger(__name__)
+# Columns selected, in the field order of EventLogResponse
+LOG_FIELDS = (
+    "id",
+    "trigger_id",
+    "name",
+    "trigger_type",
+    "triggered_at",
+    "payload",
+    "is_test",
+)
+# Rows fetched per round trip while streaming a response
+LOG_FETCH_SIZE = 2000
 
+# One JSON object per row, keys encoded once here rather than per row
+_ROW_TEMPLATE = (
+    '{"id":%s,"trigger_id":%s,"name":%s,"trigger_type":%s,'
+    '"triggered_at":%s,"payload":%s,"is_test":%s}'
+)
+_BOOLEANS = {True: "true", False: "false", None: "null"}
 
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+LogRow = Tuple[int, Optional[int], str, str, Optional[datetime], Optional[str], bool]
 
 
-def serialize_logs(logs: List[EventLog]) -> str:
-    return json.dumps(
-        [EventLogResponse.from_orm(log).model_dump() for log in logs],
-        cls=DateTimeEncoder,
-    )
+def _string(value: Optional[str]) -> str:
+    return "null" if value is None else encode_basestring(value)
 
 
-def deserialize_logs(logs_str: str) -> List[EventLogResponse]:
-    def datetime_parser(dct):
-        for k, v in dct.items():
-            if isinstance(v, str):
-                try:
-                    dct[k] = datetime.fromisoformat(v)
-                except ValueError:
-                    pass
-        return dct
+def _datetime(value: Optional[datetime]) -> str:
+    return "null" if value is None else f'"{value.isoformat()}"'
 
-    return [
-        EventLogResponse(**log)
-        for log in json.loads(logs_str, object_hook=datetime_parser)
-    ]
+
+def encode_log_rows(rows: Iterable[LogRow]) -> bytes:
+    """Encode `LOG_FIELDS` rows as the JSON of a list of EventLogResponse."""
+    return (
+        "["
+        + ",".join(
+            [
+                _ROW_TEMPLATE
+                % (
+                    log_id,
+                    "null" if trigger_id is None else trigger_id,
+                    _string(name),
+                    _string(trigger_type),
+                    _datetime(triggered_at),
+                    _string(payload),
+                    _BOOLEANS[is_test],
+                )
+                for (
+                    log_id,
+                    trigger_id,
+                    name,
+                    trigger_type,
+                    triggered_at,
+                    payload,
+                    is_test,
+                ) in rows
+            ]
+        )
+        + "]"
+    ).encode()
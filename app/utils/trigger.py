@@ -16,6 +16,7 @@ def serialize_trigger(trigger: Trigger, test_id: Optional[int] = None) -> dict:
         "trigger_type": trigger.trigger_type,
         "schedule": trigger.schedule.isoformat() if trigger.schedule else None,
         "interval_seconds": trigger.interval_seconds,
+        "jitter_seconds": trigger.jitter_seconds,
         "is_recurring": trigger.is_recurring,
         "payload": trigger.payload,
         "created_at": datetime.utcnow().isoformat(),
@@ -0,0 +1,20 @@
+"""Benchmark suite for the platform's hot paths.
+
+Run with ``python -m benchmarks``; see ``python -m benchmarks --help``.
+Benchmarks register themselves with the ``benchmark`` decorator and return a
+flat dict of metrics. Metric names ending in ``_per_sec`` are better when
+higher, names ending in ``_ms``, ``_bytes`` or ``_mb`` are better when lower.
+"""
+from typing import Awaitable, Callable, Dict
+
+BENCHMARKS: Dict[str, Callable[..., Awaitable[dict]]] = {}
+
+
+def benchmark(name: str):
+    """Register an async benchmark function under the given name."""
+
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
@@ -0,0 +1,108 @@
+"""Command line entry point: ``python -m benchmarks``."""
+import argparse
+import asyncio
+import fnmatch
+import logging
+import os
+import sys
+import tempfile
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run the platform benchmarks."
+    )
+    parser.add_argument("-k", "--select", default="*", help="glob of benchmark names")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiplier for workload sizes"
+    )
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="allowed relative regression"
+    )
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    return parser.parse_args(argv)
+
+
+async def run(args, workdir: str) -> dict:
+    # Imported here so the app binds to the scratch database set up in main().
+    from app.services import trigger_scheduler
+    from app.services.cache import cache_client
+    from app.services.db import Base, SessionLocal, engine
+    from benchmarks import (  # noqa: F401
+        BENCHMARKS,
+        api,
+        archive,
+        cron,
+        dataset,
+        eventlogs,
+        scheduler,
+    )
+    from benchmarks.harness import BenchContext
+    from benchmarks.stubs import FakeMemcacheClient, WebhookStub
+
+    names = sorted(n for n in BENCHMARKS if fnmatch.fnmatch(n, args.select))
+    if args.list:
+        print("\n".join(sorted(BENCHMARKS)))
+        return {}
+
+    Base.metadata.create_all(bind=engine)
+    cache = FakeMemcacheClient()
+    cache_client._client = cache
+    webhook = WebhookStub()
+    trigger_scheduler.url = await webhook.start()
+    ctx = BenchContext(args.seed, args.scale, webhook, cache, workdir)
+
+    with SessionLocal() as db:
+        dataset.generate(
+            db,
+            triggers=ctx.size(5_000),
+            event_logs=ctx.size(50_000),
+            seed=args.seed,
+        )
+
+    results = {}
+    try:
+        for name in names:
+            start = time.perf_counter()
+            results[name] = await BENCHMARKS[name](ctx)
+            print(f"{name:<40} {time.perf_counter() - start:6.2f}s  {results[name]}")
+    finally:
+        await webhook.stop()
+    return results
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # The scheduler logs every execution at INFO level.
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        os.environ["ENV"] = "dev"
+        os.environ["SQLITE_DB_URL"] = f"sqlite:///{workdir}/bench.db"
+        sys.path.insert(0, os.getcwd())
+        results = asyncio.run(run(args, workdir))
+    if not results:
+        return 0
+
+    from benchmarks.results import compare, load_results, write_results
+
+    write_results(args.out, results, args.seed, args.scale)
+    print(f"results written to {args.out}")
+    if args.baseline:
+        baseline = {
+            name: metrics
+            for name, metrics in load_results(args.baseline).items()
+            if fnmatch.fnmatch(name, args.select)
+        }
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""Load tests for trigger CRUD, test triggers and event-log reads."""
+import json
+import time
+
+import httpx
+
+from app import app
+from app.services.trigger_scheduler import scheduler
+from benchmarks import benchmark
+from benchmarks.harness import BenchContext, run_load
+
+READ_CONCURRENCY = 16
+# Write paths hold the request's connection while `_execute_trigger` opens a
+# second one; stay below half of the default pool (5 + 10 overflow).
+WRITE_CONCURRENCY = 4
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    )
+
+
+def _api_trigger(index: int) -> dict:
+    return {
+        "name": f"bench-{index}",
+        "trigger_type": "api",
+        "payload": json.dumps({"index": index}),
+    }
+
+
+@benchmark("api.create_trigger")
+async def create_trigger(ctx: BenchContext) -> dict:
+    async with _client() as client:
+
+        async def send(i):
+            response = await client.post("/triggers/", json=_api_trigger(i))
+            return response.status_code == 200
+
+        return await run_load(send, ctx.size(500), WRITE_CONCURRENCY)
+
+
+@benchmark("api.list_triggers")
+async def list_triggers(ctx: BenchContext) -> dict:
+    async with _client() as client:
+
+        async def send(i):
+            return (await client.get("/triggers/")).status_code == 200
+
+        return await run_load(send, ctx.size(50), 4)
+
+
+@benchmark("api.poll_triggers_unchanged")
+async def poll_triggers_unchanged(ctx: BenchContext) -> dict:
+    """Dashboard polls of an unchanged listing with If-None-Match (304s)."""
+    async with _client() as client:
+        etag = (await client.get("/triggers/")).headers["etag"]
+
+        async def send(i):
+            response = await client.get("/triggers/", headers={"If-None-Match": etag})
+            return response.status_code == 304
+
+        return await run_load(send, ctx.size(2000), READ_CONCURRENCY)
+
+
+@benchmark("api.list_triggers_page")
+async def list_triggers_page(ctx: BenchContext) -> dict:
+    """Keyset pages of 100 id/name pairs."""
+    async with _client() as client:
+
+        async def send(i):
+            url = f"/triggers/?after_id={(i * 100) % 4000}&limit=100&fields=id,name"
+            return (await client.get(url)).status_code == 200
+
+        return await run_load(send, ctx.size(1000), READ_CONCURRENCY)
+
+
+@benchmark("api.get_trigger")
+async def get_trigger(ctx: BenchContext) -> dict:
+    async with _client() as client:
+
+        async def send(i):
+            return (await client.get(f"/triggers/{i % 1000 + 1}")).status_code == 200
+
+        return await run_load(send, ctx.size(2000), READ_CONCURRENCY)
+
+
+@benchmark("api.update_trigger")
+async def update_trigger(ctx: BenchContext) -> dict:
+    async with _client() as client:
+        # One-shot triggers are skipped: their schedule may already be due.
+        ids = [
+            t["id"]
+            for t in (await client.get("/triggers/")).json()
+            if t["trigger_type"] == "api" or t["is_recurring"]
+        ][:1000]
+
+        async def send(i):
+            response = await client.put(
+                f"/triggers/{ids[i % len(ids)]}", json={"name": f"renamed-{i}"}
+            )
+            return response.status_code == 200
+
+        return await run_load(send, ctx.size(500), WRITE_CONCURRENCY)
+
+
+@benchmark("api.delete_trigger")
+async def delete_trigger(ctx: BenchContext) -> dict:
+    async with _client() as client:
+        ids = []
+        for i in range(ctx.size(300)):
+            response = await client.post("/triggers/", json=_api_trigger(i))
+            ids.append(response.json()["id"])
+
+        async def send(i):
+            return (await client.delete(f"/triggers/{ids[i]}")).status_code == 200
+
+        return await run_load(send, len(ids), WRITE_CONCURRENCY)
+
+
+@benchmark("api.test_trigger")
+async def test_trigger(ctx: BenchContext) -> dict:
+    ctx.webhook.reset()
+    async with _client() as client:
+
+        async def send(i):
+            response = await client.post("/triggers/test/", json=_api_trigger(i))
+            return response.status_code == 200
+
+        result = await run_load(send, ctx.size(500), WRITE_CONCURRENCY)
+    # Executions run in the background; count them once all have finished
+    await scheduler.executions.join(timeout=60)
+    result["webhook_requests"] = ctx.webhook.requests
+    return result
+
+
+@benchmark("api.create_trigger_slow_webhook")
+async def create_trigger_slow_webhook(ctx: BenchContext) -> dict:
+    """
+    Create latency of API triggers while the webhook takes 250 ms. Queued
+    webhook calls count against admission, so part of the burst is shed
+    with a 503 (`shed`) rather than growing the queue.
+    """
+    ctx.webhook.reset()
+    ctx.webhook.delay = 0.25
+    shed = 0
+    try:
+        async with _client() as client:
+
+            async def send(i):
+                nonlocal shed
+                response = await client.post("/triggers/", json=_api_trigger(i))
+                if response.status_code in (429, 503):
+                    shed += 1
+                    return True
+                return response.status_code == 200
+
+            result = await run_load(send, ctx.size(200), WRITE_CONCURRENCY)
+        start = time.perf_counter()
+        await scheduler.executions.join(timeout=60)
+        result["drain_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    finally:
+        ctx.webhook.delay = 0.0
+    result["shed"] = shed
+    result["webhook_requests"] = ctx.webhook.requests
+    return result
+
+
+@benchmark("api.recent_logs")
+async def recent_logs(ctx: BenchContext) -> dict:
+    ctx.cache.clear()
+    async with _client() as client:
+
+        async def send(i):
+            return (await client.get("/event-logs/")).status_code == 200
+
+        return await run_load(send, ctx.size(100), 4)
+
+
+@benchmark("api.archived_logs_uncached")
+async def archived_logs_uncached(ctx: BenchContext) -> dict:
+    async with _client() as client:
+
+        async def send(i):
+            ctx.cache.clear()
+            return (await client.get("/event-logs/archived")).status_code == 200
+
+        return await run_load(send, ctx.size(10), 1)
+
+
+@benchmark("api.event_stats")
+async def event_stats(ctx: BenchContext) -> dict:
+    async with _client() as client:
+
+        async def send(i):
+            ctx.cache.clear()
+            return (await client.get("/event-logs/stats")).status_code == 200
+
+        return await run_load(send, ctx.size(50), 4)
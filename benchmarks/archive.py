@@ -0,0 +1,101 @@
+"""Archive segments: compaction rate, size and analytics latency over months."""
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.event import compact_event_logs
+from app.services.archive import EventArchive
+from app.services.db import Base
+from benchmarks import benchmark, dataset
+from benchmarks.dataset import NAMES
+
+
+def _best_ms(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+@benchmark("archive.analytics_90d")
+async def analytics_90d(ctx) -> dict:
+    """
+    Compaction rows/sec of one partition, then counts, hourly histogram and
+    per-trigger rates over 90 days of segments.
+    """
+    rng = random.Random(ctx.seed)
+    period = timedelta(hours=6)
+    end = datetime(2026, 3, 1)
+    start = end - timedelta(days=90)
+    rows_per_period = ctx.size(2_500)
+    triggers = 1_000
+
+    # Compaction, from a partitioned database
+    engine = create_engine(f"sqlite:///{os.path.join(ctx.workdir, 'archive.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    compact_rows = ctx.size(50_000)
+    with Session() as db:
+        dataset.generate(
+            db,
+            triggers=triggers,
+            event_logs=compact_rows,
+            seed=ctx.seed,
+            now=end - timedelta(seconds=1),
+            hours=6,
+        )
+    archive = EventArchive(os.path.join(ctx.workdir, "compacted"))
+    with Session() as db:
+        began = time.perf_counter()
+        compact_event_logs(db, archive, end + period)
+        compact_seconds = time.perf_counter() - began
+    engine.dispose()
+
+    # 90 days of segments, written directly
+    archive = EventArchive(os.path.join(ctx.workdir, "segments"))
+    moment = start
+    while moment < end:
+        rows = []
+        for _ in range(rows_per_period):
+            trigger_id = rng.randint(1, triggers)
+            rows.append(
+                (
+                    trigger_id,
+                    moment + timedelta(seconds=rng.random() * 6 * 3600),
+                    rng.choice(["scheduled", "api"]),
+                    f"{NAMES[trigger_id % len(NAMES)]}-{trigger_id}",
+                    rng.random() < 0.05,
+                )
+            )
+        archive.write(moment, moment + period, rows)
+        moment += period
+    files = os.listdir(archive.directory)
+    total_bytes = sum(
+        os.path.getsize(os.path.join(archive.directory, name)) for name in files
+    )
+    total_rows = rows_per_period * len(files)
+
+    cold = EventArchive(archive.directory)
+    return {
+        "rows": total_rows,
+        "segments": len(files),
+        "compact_rows_per_sec": round(compact_rows / compact_seconds, 1),
+        "row_bytes": round(total_bytes / total_rows, 2),
+        "cold_counts_ms": _best_ms(lambda: cold.counts(start, end), repeat=1),
+        "counts_ms": _best_ms(lambda: archive.counts(start, end)),
+        "histogram_hourly_ms": _best_ms(
+            lambda: archive.histogram(start, end, timedelta(hours=1))
+        ),
+        "histogram_one_name_ms": _best_ms(
+            lambda: archive.histogram(
+                start, end, timedelta(hours=1), name=f"{NAMES[1]}-1"
+            )
+        ),
+        "rates_ms": _best_ms(lambda: archive.trigger_rates(start, end)),
+    }
@@ -0,0 +1,100 @@
+"""Next-fire computation rate and memory per schedule for cron triggers."""
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.triggers.cron import CronTrigger
+
+from app.services.cron import CompiledCron, cron_trigger, next_fire_times
+from benchmarks import benchmark
+from benchmarks.harness import BenchContext
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _expressions(rng: random.Random, count: int):
+    return [
+        f"{rng.randint(0, 59)} {rng.choice(['*', '*/2', '*/6', '9-17', str(rng.randint(0, 23))])} "
+        f"{rng.choice(['*', '1', '1,15'])} * {rng.choice(['*', '0-4', '5,6'])}"
+        for _ in range(count)
+    ]
+
+
+@benchmark("cron.next_fire_rate")
+async def next_fire_rate(ctx: BenchContext) -> dict:
+    """Successive fire times of a mix of schedules, compiled vs CronTrigger."""
+    rng = random.Random(ctx.seed)
+    expressions = _expressions(rng, 200)
+    steps = ctx.size(50)
+
+    def rate(triggers) -> float:
+        computed = 0
+        start = time.perf_counter()
+        for trigger in triggers:
+            fire_time = trigger.get_next_fire_time(None, START)
+            for _ in range(steps):
+                if fire_time is None:
+                    break
+                fire_time = trigger.get_next_fire_time(fire_time, fire_time)
+                computed += 1
+        return round(computed / (time.perf_counter() - start), 1)
+
+    return {
+        "compiled_per_sec": rate([cron_trigger(e, timezone.utc) for e in expressions]),
+        "apscheduler_per_sec": rate(
+            [CronTrigger.from_crontab(e, timezone=timezone.utc) for e in expressions]
+        ),
+    }
+
+
+@benchmark("cron.batch_next_fire")
+async def batch_next_fire(ctx: BenchContext) -> dict:
+    """First fire of many triggers sharing a few expressions (startup path)."""
+    rng = random.Random(ctx.seed)
+    expressions = _expressions(rng, 20)
+    count = ctx.size(100_000)
+    picks = [rng.choice(expressions) for _ in range(count)]
+
+    start = time.perf_counter()
+    schedules = [cron_trigger(e, timezone.utc).cron for e in picks]
+    next_fire_times(schedules, START + timedelta(seconds=1))
+    batch_elapsed = time.perf_counter() - start
+
+    sample = picks[: max(1, count // 10)]
+    start = time.perf_counter()
+    for expression in sample:
+        CronTrigger.from_crontab(expression, timezone=timezone.utc).get_next_fire_time(
+            None, START
+        )
+    per_trigger_elapsed = (time.perf_counter() - start) / len(sample)
+
+    return {
+        "triggers": count,
+        "batch_per_sec": round(count / batch_elapsed, 1),
+        "apscheduler_per_sec": round(1 / per_trigger_elapsed, 1),
+    }
+
+
+@benchmark("cron.memory_per_schedule")
+async def memory_per_schedule(ctx: BenchContext) -> dict:
+    """Allocated bytes per distinct schedule, compiled vs CronTrigger."""
+    rng = random.Random(ctx.seed)
+    expressions = sorted(set(_expressions(rng, ctx.size(5_000))))
+
+    def measure(build) -> float:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [build(e) for e in expressions]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return round((after - before) / len(expressions), 1)
+
+    return {
+        "schedules": len(expressions),
+        "compiled_bytes": measure(CompiledCron),
+        "apscheduler_bytes": measure(
+            lambda e: CronTrigger.from_crontab(e, timezone=timezone.utc)
+        ),
+    }
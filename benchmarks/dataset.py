@@ -0,0 +1,98 @@
+"""Fixed-seed generator for large triggers/event_logs tables."""
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.crud.event import add_event_logs
+from app.models import EventLog, Trigger
+
+NAMES = ["billing", "digest", "heartbeat", "sync", "report", "cleanup", "alert"]
+BATCH_SIZE = 10_000
+
+
+def _payload(rng: random.Random) -> str:
+    return json.dumps(
+        {
+            "source": rng.choice(NAMES),
+            "level": rng.choice(["info", "warning", "error"]),
+            "data": "x" * rng.randint(16, 512),
+        }
+    )
+
+
+def _insert_logs(db: Session, rows: list, partitioned: bool):
+    if partitioned:
+        add_event_logs(db, rows)
+    else:
+        db.execute(insert(EventLog), rows)
+
+
+def generate(
+    db: Session,
+    triggers: int,
+    event_logs: int,
+    seed: int = 42,
+    now: Optional[datetime] = None,
+    hours: int = 48,
+    partitioned: bool = True,
+):
+    """
+    Insert `triggers` triggers and `event_logs` logs spread over `hours`,
+    into the event-log partitions or, with `partitioned=False`, into the
+    single `event_logs` table.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+
+    trigger_rows = []
+    for i in range(triggers):
+        kind = rng.random()
+        row = {
+            "name": f"{rng.choice(NAMES)}-{i}",
+            "payload": _payload(rng),
+            "created_at": now,
+            "updated_at": now,
+        }
+        if kind < 0.6:
+            row.update(
+                trigger_type="scheduled",
+                is_recurring=True,
+                interval_seconds=rng.choice([60, 300, 900, 3600]),
+            )
+        elif kind < 0.8:
+            row.update(
+                trigger_type="scheduled",
+                is_recurring=False,
+                schedule=now + timedelta(seconds=rng.randint(60, 30 * 86400)),
+            )
+        else:
+            row.update(trigger_type="api", is_recurring=False)
+        trigger_rows.append(row)
+    for start in range(0, len(trigger_rows), BATCH_SIZE):
+        db.execute(insert(Trigger), trigger_rows[start : start + BATCH_SIZE])
+
+    payloads = [_payload(rng) for _ in range(64)]
+    span = hours * 3600
+    log_rows = []
+    for _ in range(event_logs):
+        trigger_id = rng.randint(1, max(triggers, 1))
+        log_rows.append(
+            {
+                "trigger_id": trigger_id,
+                "triggered_at": now - timedelta(seconds=rng.random() * span),
+                "trigger_type": rng.choice(["scheduled", "api"]),
+                "name": f"{NAMES[trigger_id % len(NAMES)]}-{trigger_id}",
+                "payload": rng.choice(payloads),
+                "is_test": rng.random() < 0.05,
+            }
+        )
+        if len(log_rows) >= BATCH_SIZE:
+            _insert_logs(db, log_rows, partitioned)
+            log_rows = []
+    if log_rows:
+        _insert_logs(db, log_rows, partitioned)
+    db.commit()
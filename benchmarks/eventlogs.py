@@ -0,0 +1,204 @@
+"""Event-log storage: response encoding, and partitioned vs single-table cost."""
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.event import add_event_logs, expire_event_logs, select_event_logs
+from app.models import EventLog
+from app.schemas import EventLogResponse
+from app.services.db import Base
+from app.utils.eventlogs import LOG_FIELDS, LOG_FETCH_SIZE, encode_log_rows
+from benchmarks import benchmark, dataset
+from benchmarks.harness import BenchContext
+
+_responses = TypeAdapter(list[EventLogResponse])
+
+
+def _legacy_body(db) -> bytes:
+    """The previous endpoint: ORM rows, from_orm, then response_model."""
+    logs = db.query(EventLog).all()
+    models = [EventLogResponse.from_orm(log) for log in logs]
+    content = [model.model_dump() for model in models]
+    validated = _responses.validate_python(content)
+    return json.dumps(_responses.dump_python(validated, mode="json")).encode()
+
+
+def _fast_body(db) -> bytes:
+    columns = [EventLog.__table__.c[field] for field in LOG_FIELDS]
+    return encode_log_rows(db.query(*columns).yield_per(LOG_FETCH_SIZE))
+
+
+@benchmark("eventlogs.encode_100k")
+async def encode_100k(ctx: BenchContext) -> dict:
+    """Rows/sec and peak Python heap of one full-table event-log response."""
+    engine = create_engine(f"sqlite:///{os.path.join(ctx.workdir, 'logs.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    rows = ctx.size(100_000)
+    with Session() as db:
+        dataset.generate(
+            db, triggers=1_000, event_logs=rows, seed=ctx.seed, partitioned=False
+        )
+
+    results = {"rows": rows}
+    for name, encode in (("fast", _fast_body), ("legacy", _legacy_body)):
+        with Session() as db:
+            start = time.perf_counter()
+            body = encode(db)
+            results[f"{name}_rows_per_sec"] = round(
+                rows / (time.perf_counter() - start), 1
+            )
+        with Session() as db:
+            tracemalloc.start()
+            encode(db)
+            results[f"{name}_peak_mb"] = round(
+                tracemalloc.get_traced_memory()[1] / 2**20, 2
+            )
+            tracemalloc.stop()
+        results[f"{name}_body_bytes"] = len(body)
+    engine.dispose()
+    return results
+
+
+def _timed_ms(func, repeat: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+@benchmark("eventlogs.partition_growth")
+async def partition_growth(ctx: BenchContext) -> dict:
+    """
+    Insert, last-2h query and oldest-6h expiry cost at 12h and 48h of
+    history, in time partitions vs the single event_logs table.
+    """
+    rows_per_hour = ctx.size(2_000)
+    inserts = 200
+    now = datetime.utcnow()
+    results = {"rows_per_hour": rows_per_hour}
+    for hours in (12, 48):
+        for layout in ("partitioned", "table"):
+            path = os.path.join(ctx.workdir, f"growth_{layout}_{hours}h.db")
+            engine = create_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(bind=engine)
+            Session = sessionmaker(bind=engine)
+            with Session() as db:
+                dataset.generate(
+                    db,
+                    triggers=100,
+                    event_logs=rows_per_hour * hours,
+                    seed=ctx.seed,
+                    now=now,
+                    hours=hours,
+                    partitioned=layout == "partitioned",
+                )
+
+            def insert_one():
+                # One transaction per fire, like the scheduler
+                for i in range(inserts):
+                    with Session() as db:
+                        row = {
+                            "trigger_id": 1,
+                            "triggered_at": now,
+                            "trigger_type": "api",
+                            "name": "bench",
+                            "payload": "{}",
+                            "is_test": False,
+                        }
+                        if layout == "partitioned":
+                            add_event_logs(db, [row])
+                        else:
+                            db.execute(EventLog.__table__.insert(), [row])
+                        db.commit()
+
+            def recent():
+                with Session() as db:
+                    query = select_event_logs(db, start=now - timedelta(hours=2))
+                    db.execute(query).all()
+
+            def expire():
+                cutoff = now - timedelta(hours=hours - 6)
+                with Session() as db:
+                    expire_event_logs(db, cutoff, now)
+                    db.commit()
+
+            prefix = f"{layout}_{hours}h"
+            results[f"{prefix}_insert_ms"] = round(_timed_ms(insert_one) / inserts, 4)
+            results[f"{prefix}_recent_ms"] = _timed_ms(recent, repeat=5)
+            results[f"{prefix}_expire_ms"] = _timed_ms(expire)
+            engine.dispose()
+    return results
+
+
+@benchmark("eventlogs.dedup_storage")
+async def dedup_storage(ctx: BenchContext) -> dict:
+    """
+    Bytes per row, insert throughput and read cost of logs of triggers with
+    2 KB payloads: deduplicated partitions vs the text event_logs table.
+    """
+    rows = ctx.size(20_000)
+    triggers = 50
+    batch = 500
+    fires = 200
+    now = datetime.utcnow()
+    payloads = [
+        json.dumps({"trigger": i, "text": "x" * 2048}) for i in range(triggers)
+    ]
+
+    def log(i: int) -> dict:
+        return {
+            "trigger_id": i % triggers,
+            "triggered_at": now - timedelta(seconds=rows - i),
+            "trigger_type": "scheduled",
+            "name": f"trigger-{i % triggers}",
+            "payload": payloads[i % triggers],
+            "is_test": False,
+        }
+
+    results = {"rows": rows, "payload_bytes": len(payloads[0])}
+    for layout in ("text", "dedup"):
+        path = os.path.join(ctx.workdir, f"dedup_{layout}.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        def insert(logs):
+            with Session() as db:
+                if layout == "dedup":
+                    add_event_logs(db, logs)
+                else:
+                    db.execute(EventLog.__table__.insert(), logs)
+                db.commit()
+
+        empty = os.path.getsize(path)
+        start = time.perf_counter()
+        for offset in range(0, rows, batch):
+            insert([log(i) for i in range(offset, min(offset + batch, rows))])
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path) - empty
+
+        def insert_one():
+            # One transaction per fire, like the scheduler
+            for i in range(fires):
+                insert([log(i)])
+
+        def recent():
+            with Session() as db:
+                query = select_event_logs(db, start=now - timedelta(hours=2))
+                db.execute(query).all()
+
+        results[f"{layout}_bytes_per_row"] = round(size / rows, 1)
+        results[f"{layout}_insert_rows_per_sec"] = round(rows / elapsed)
+        results[f"{layout}_fire_insert_ms"] = round(_timed_ms(insert_one) / fires, 4)
+        results[f"{layout}_recent_ms"] = _timed_ms(recent, repeat=3)
+        engine.dispose()
+    return results
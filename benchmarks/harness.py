@@ -0,0 +1,70 @@
+"""Shared helpers for benchmarks: context, load generation and summaries."""
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from benchmarks.stubs import FakeMemcacheClient, WebhookStub
+
+
+class BenchContext:
+    def __init__(
+        self,
+        seed: int,
+        scale: float,
+        webhook: WebhookStub,
+        cache: FakeMemcacheClient,
+        workdir: Optional[str] = None,
+    ):
+        self.seed = seed
+        self.scale = scale
+        self.webhook = webhook
+        self.cache = cache
+        self.workdir = workdir
+
+    def size(self, n: int) -> int:
+        """Scale a workload size, never below 1."""
+        return max(1, int(n * self.scale))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> dict:
+    """Throughput and latency percentiles (latencies in seconds)."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_per_sec": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run_load(
+    send: Callable[[int], Awaitable[bool]], total: int, concurrency: int
+) -> dict:
+    """Issue `total` calls of `send(i)` from `concurrency` concurrent workers."""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            ok = await send(index)
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
@@ -0,0 +1,77 @@
+"""Result files and regression checks between benchmark runs."""
+import json
+import platform
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+HIGHER_IS_BETTER = ("_per_sec",)
+LOWER_IS_BETTER = ("_ms", "_bytes", "_mb")
+# Counts that must never grow; other plain counts (requests, fires) describe the workload.
+ERRORS = "errors"
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(path: str, results: Dict[str, dict], seed: int, scale: float):
+    document = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": seed,
+            "scale": scale,
+        },
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(
+    current: Dict[str, dict], baseline: Dict[str, dict], threshold: float = 0.1
+) -> List[str]:
+    """
+    Describe every metric that got worse than `baseline` by more than `threshold`.
+
+    Any increase of an `errors` count is a regression, as are benchmarks and
+    numeric metrics of the baseline that the current run no longer reports.
+    """
+    regressions = []
+    for name, previous in baseline.items():
+        if name not in current:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        metrics = current[name]
+        for metric, old in previous.items():
+            if not isinstance(old, (int, float)):
+                continue
+            value = metrics.get(metric)
+            if not isinstance(value, (int, float)):
+                regressions.append(f"{name}.{metric}: missing from this run")
+                continue
+            if metric == ERRORS:
+                if value > old:
+                    regressions.append(f"{name}.{metric}: {old:g} -> {value:g}")
+                continue
+            if old == 0:
+                continue
+            change = (value - old) / abs(old)
+            if metric.endswith(HIGHER_IS_BETTER) and change < -threshold:
+                regressions.append(f"{name}.{metric}: {old:g} -> {value:g} ({change:+.1%})")
+            elif metric.endswith(LOWER_IS_BETTER) and change > threshold:
+                regressions.append(f"{name}.{metric}: {old:g} -> {value:g} ({change:+.1%})")
+    return regressions
@@ -0,0 +1,277 @@
+"""Scheduler fire-rate and per-execution cost."""
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.events import EVENT_JOB_EXECUTED
+
+from app.models import Trigger
+from app.services.payload import compile_payload
+from app.services.db import SessionLocal
+from app.services.simulation import SchedulerSimulation
+from app.services.snapshot import read_snapshot
+from app.services.trigger_scheduler import TriggerScheduler
+from benchmarks import benchmark
+from benchmarks.harness import BenchContext, percentile
+
+
+def _trigger(trigger_id: int, trigger_type: str = "scheduled") -> Trigger:
+    trigger = Trigger(
+        name=f"bench-{trigger_id}",
+        trigger_type=trigger_type,
+        payload=json.dumps({"id": trigger_id}),
+        is_recurring=trigger_type == "scheduled",
+        interval_seconds=1 if trigger_type == "scheduled" else None,
+    )
+    trigger.id = 1_000_000 + trigger_id
+    return trigger
+
+
+@benchmark("scheduler.fire_rate")
+async def fire_rate(ctx: BenchContext) -> dict:
+    """Many 1-second interval triggers firing in lockstep for a few seconds."""
+    duration = 3.0
+    scheduler = TriggerScheduler()
+    lags = []
+
+    def on_executed(event):
+        lags.append(
+            (datetime.now(timezone.utc) - event.scheduled_run_time).total_seconds()
+        )
+
+    scheduler.scheduler.add_listener(on_executed, EVENT_JOB_EXECUTED)
+    scheduler.scheduler.start()
+    try:
+        for i in range(ctx.size(500)):
+            await scheduler.add_trigger(_trigger(i))
+        start = time.perf_counter()
+        await asyncio.sleep(duration)
+        elapsed = time.perf_counter() - start
+    finally:
+        scheduler.scheduler.shutdown(wait=False)
+
+    return {
+        "triggers": ctx.size(500),
+        "fires": len(lags),
+        "fires_per_sec": round(len(lags) / elapsed, 2),
+        "completion_lag_p50_ms": round(percentile(lags, 50) * 1000, 3),
+        "completion_lag_p99_ms": round(percentile(lags, 99) * 1000, 3),
+    }
+
+
+@benchmark("scheduler.execute_api_trigger")
+async def execute_api_trigger(ctx: BenchContext) -> dict:
+    """Sequential executions: event log commit plus webhook round trip."""
+    scheduler = TriggerScheduler()
+    trigger = _trigger(0, trigger_type="api")
+    count = ctx.size(300)
+    ctx.webhook.reset()
+    start = time.perf_counter()
+    try:
+        for _ in range(count):
+            await scheduler._execute_trigger(trigger)
+        elapsed = time.perf_counter() - start
+    finally:
+        await scheduler.close_http_session()
+    return {
+        "executions": count,
+        "executions_per_sec": round(count / elapsed, 2),
+        "mean_ms": round(elapsed / count * 1000, 3),
+        "webhook_requests": ctx.webhook.requests,
+    }
+
+
+@benchmark("scheduler.payload_render")
+async def payload_render(ctx: BenchContext) -> dict:
+    """Webhook body per fire: compiled template vs parse/merge/dump per fire."""
+    payload = json.dumps(
+        {
+            "event": "report",
+            "fired": "{{fire_time}}",
+            "seq": "{{seq}}",
+            "tags": list(range(20)),
+        }
+    )
+    count = ctx.size(100_000)
+    fire_time = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    start = time.perf_counter()
+    for seq in range(count):
+        value = {**json.loads(payload), "test": True}
+        json.dumps({"content": json.dumps(value)}).encode()
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for seq in range(count):
+        compile_payload(payload, True).render(fire_time, 1, seq)
+    compiled_elapsed = time.perf_counter() - start
+
+    return {
+        "renders": count,
+        "compiled_per_sec": round(count / compiled_elapsed, 1),
+        "legacy_per_sec": round(count / legacy_elapsed, 1),
+    }
+
+
+async def _timed_start(scheduler: TriggerScheduler) -> float:
+    start = time.perf_counter()
+    await scheduler.start()
+    elapsed = time.perf_counter() - start
+    scheduler.scheduler.pause()
+    return elapsed
+
+
+@benchmark("scheduler.warm_restart")
+async def warm_restart(ctx: BenchContext) -> dict:
+    """
+    Start over the generated triggers: full database load vs snapshot. Both
+    then build the same APScheduler jobs; `db_load_ms` and `snapshot_read_ms`
+    are the part that differs.
+    """
+    path = os.path.join(ctx.workdir, "scheduler.snapshot")
+    cold = TriggerScheduler(snapshot_path=path)
+    try:
+        cold_elapsed = await _timed_start(cold)
+        start = time.perf_counter()
+        cold.write_snapshot()
+        write_elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+    finally:
+        cold.shutdown()
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        cold.plan_job_triggers(db.query(Trigger).all())
+    load_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    read_snapshot(path)
+    read_elapsed = time.perf_counter() - start
+
+    warm = TriggerScheduler(snapshot_path=path)
+    try:
+        warm_elapsed = await _timed_start(warm)
+    finally:
+        warm.shutdown()
+        os.remove(path)
+    return {
+        "jobs": len(warm.active_jobs),
+        "cold_start_ms": round(cold_elapsed * 1000, 3),
+        "warm_start_ms": round(warm_elapsed * 1000, 3),
+        "db_load_ms": round(load_elapsed * 1000, 3),
+        "snapshot_read_ms": round(read_elapsed * 1000, 3),
+        "snapshot_write_ms": round(write_elapsed * 1000, 3),
+        "snapshot_bytes": size,
+    }
+
+
+async def _fire_at_rate(scheduler: TriggerScheduler, rate: int, fires: int) -> list:
+    """Open-loop webhook fires at `rate` per second; their latencies."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    latencies = []
+
+    async def fire(i: int):
+        sent = loop.time()
+        await scheduler._handle_http_request(f'"fire {i} of the benchmark"', False, i)
+        latencies.append(loop.time() - sent)
+
+    tasks = []
+    for i in range(fires):
+        delay = start + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(i)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+@benchmark("scheduler.webhook_batching")
+async def webhook_batching(ctx: BenchContext) -> dict:
+    """
+    Webhook requests and fire-to-result latency at several fire rates to one
+    URL, sent one by one vs batched over a 50 ms window of up to 10 fires.
+    """
+    results = {"window_ms": 50}
+    for rate in (10, 100, 1000):
+        fires = ctx.size(rate)
+        for layout, window_ms in (("single", 0), ("batched", 50)):
+            scheduler = TriggerScheduler(batch_window_ms=window_ms)
+            ctx.webhook.reset()
+            try:
+                latencies = await _fire_at_rate(scheduler, rate, fires)
+            finally:
+                await scheduler.close_http_session()
+            prefix = f"rate_{rate}_{layout}"
+            results[f"{prefix}_requests"] = ctx.webhook.requests
+            results[f"{prefix}_p50_ms"] = round(percentile(latencies, 50) * 1000, 3)
+            results[f"{prefix}_p99_ms"] = round(percentile(latencies, 99) * 1000, 3)
+        results[f"rate_{rate}_requests_saved"] = (
+            results[f"rate_{rate}_single_requests"]
+            - results[f"rate_{rate}_batched_requests"]
+        )
+    return results
+
+
+@benchmark("scheduler.simulated_month")
+async def simulated_month(ctx: BenchContext) -> dict:
+    """A month of interval, cron and one-shot triggers on the virtual clock."""
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rng = random.Random(ctx.seed)
+    sim = SchedulerSimulation(start)
+    for i in range(ctx.size(100)):
+        trigger = _trigger(i)
+        trigger.interval_seconds = rng.choice([900, 3600, 21600, 86400])
+        sim.add_trigger(trigger)
+    for i in range(ctx.size(50)):
+        trigger = _trigger(10_000 + i)
+        trigger.is_recurring = False
+        trigger.schedule = f"{rng.randint(0, 59)} {rng.choice(['*', '*/6', '9'])} * * *"
+        sim.add_trigger(trigger)
+    for i in range(ctx.size(50)):
+        trigger = _trigger(20_000 + i)
+        trigger.is_recurring = False
+        trigger.schedule = start + timedelta(minutes=rng.randint(1, 30 * 1440))
+        sim.add_trigger(trigger)
+
+    cpu_start = time.process_time()
+    await sim.run(start + timedelta(days=30))
+    result = sim.stats()
+    result["cpu_ms"] = round((time.process_time() - cpu_start) * 1000, 1)
+    return result
+
+
+@benchmark("scheduler.herd_smoothing")
+async def herd_smoothing(ctx: BenchContext) -> dict:
+    """
+    Peak-to-average fires per second of cron triggers all due at the top of
+    the hour and interval triggers created together, on the virtual clock:
+    on time, with 120 s of jitter, and with jitter plus a 20/s smoother.
+    """
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    results = {"triggers": 2 * ctx.size(1000)}
+    for layout, jitter, rate in (
+        ("on_time", 0, 0),
+        ("jitter", 120, 0),
+        ("smoothed", 120, 20),
+    ):
+        sim = SchedulerSimulation(start, dispatch_rate=rate)
+        for i in range(ctx.size(1000)):
+            trigger = _trigger(i)
+            trigger.is_recurring = False
+            trigger.schedule = "0 * * * *"
+            trigger.jitter_seconds = jitter
+            sim.add_trigger(trigger)
+            trigger = _trigger(10_000 + i)
+            trigger.interval_seconds = 900
+            trigger.jitter_seconds = jitter
+            sim.add_trigger(trigger)
+        await sim.run(start + timedelta(hours=24))
+        load = sim.load()["dispatched"]
+        results[f"{layout}_peak_fires"] = load["peak_per_sec"]
+        results[f"{layout}_peak_to_average"] = load["peak_to_average"]
+        lateness = sim.scheduler.dispatch_stats()["max_lateness_ms"]
+        results[f"{layout}_max_lateness_ms"] = lateness
+    return results
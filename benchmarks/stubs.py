@@ -0,0 +1,79 @@
+"""In-process stand-ins for memcached and the webhook endpoint."""
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+
+class FakeMemcacheClient:
+    """Dict-backed replacement for pymemcache's PooledClient."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._store: Dict[str, Tuple[bytes, float]] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at and expires_at < time.monotonic():
+            del self._store[key]
+            return None
+        return value
+
+    def set(self, key: str, value, expire: int = 0) -> bool:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        self._store[key] = (value, time.monotonic() + expire if expire else 0)
+        return True
+
+    def delete(self, key: str) -> bool:
+        return self._store.pop(key, None) is not None
+
+    def clear(self):
+        self._store.clear()
+
+    def close(self):
+        pass
+
+
+class WebhookStub:
+    """Local HTTP server that accepts webhook posts with an optional delay."""
+
+    def __init__(self, delay: float = 0.0, status: int = 204):
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+        self.bodies = []
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.bodies.append(await request.read())
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return web.Response(status=self.status)
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/"
+        return self.url
+
+    def reset(self):
+        self.requests = 0
+        self.bodies.clear()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
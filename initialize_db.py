@@ -1,9 +1,13 @@
-from app.services.db import engine, Base
-from app.models import Trigger,EventLog
+from app.services.db import SessionLocal, create_tables
+from app.models import Trigger,EventLog,EventPayload,EventString,TriggerTombstone
+from app.crud.event import upgrade_event_logs
 
 def initialize_database():
     print("Creating SQLite database and tables...")
-    Base.metadata.create_all(bind=engine)
+    create_tables()
+    with SessionLocal() as db:
+        upgrade_event_logs(db)
+        db.commit()
     print("Database and tables created successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+import collections
+import heapq
+import itertools
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from app.routers import trigger as trigger_router
+from app.services.admission import AdaptiveLimiter, Overloaded, Priority
+
+client = TestClient(app)
+
+SERVICE_SECONDS = 0.01
+WORKERS = 4
+TARGET_MS = 30
+
+
+def test_priority_classes_are_shed_in_order():
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, test_share=0.5)
+    limiter.acquire(Priority.API)
+    limiter.acquire(Priority.API)
+
+    # Test requests only get the first half of the limit
+    with pytest.raises(Overloaded) as shed:
+        limiter.acquire(Priority.TEST)
+    assert shed.value.status_code == 429
+    limiter.acquire(Priority.API)
+    limiter.acquire(Priority.API)
+    with pytest.raises(Overloaded) as shed:
+        limiter.acquire(Priority.API)
+    assert shed.value.status_code == 503 and shed.value.retry_after >= 1
+
+    # Scheduled fires are never shed, and push the rest out for longer
+    with limiter.hold():
+        assert limiter.in_flight == 5
+    assert limiter.rejected == {
+        Priority.SCHEDULED: 0,
+        Priority.API: 1,
+        Priority.TEST: 1,
+    }
+
+
+def test_limit_backs_off_on_latency_and_grows_back():
+    now = [0.0]
+    limiter = AdaptiveLimiter(
+        initial=10, min_limit=2, target_ms=100, clock=lambda: now[0]
+    )
+    for _ in range(10):
+        limiter.acquire(Priority.API)
+    now[0] = 0.5
+    # A burst of slow completions is one cut, not ten
+    for _ in range(10):
+        limiter.release(0.0)
+    assert limiter.limit == 9
+
+    for _ in range(100):
+        started = limiter.acquire(Priority.API)
+        limiter.release(started)
+    # Not grown while mostly idle
+    assert limiter.limit == 9
+    for _ in range(9):
+        limiter.acquire(Priority.API)
+    for _ in range(9):
+        limiter.release(now[0])
+    assert limiter.limit > 9
+
+
+def _load(clients: int, limited: bool, seconds: float = 0.8):
+    """
+    Closed-loop clients against a service of WORKERS parallel slots, simulated
+    in virtual time: the limiter reads the simulation clock.
+    """
+    now = [0.0]
+    limiter = AdaptiveLimiter(
+        initial=WORKERS, min_limit=1, target_ms=TARGET_MS, clock=lambda: now[0]
+    )
+    # (time, order, client, sent, started); sent is None for a new request
+    events = [(0.0, client, client, None, None) for client in range(clients)]
+    heapq.heapify(events)
+    order = itertools.count(clients)
+    queue = collections.deque()
+    busy = 0
+    latencies = []
+
+    def serve(client, sent, started):
+        heapq.heappush(
+            events, (now[0] + SERVICE_SECONDS, next(order), client, sent, started)
+        )
+
+    while events:
+        now[0], _, client, sent, started = heapq.heappop(events)
+        if sent is not None:
+            # A request completes and its slot goes to the next queued one
+            if now[0] <= seconds:
+                latencies.append(now[0] - sent)
+            if limited:
+                limiter.release(started)
+            if queue:
+                serve(*queue.popleft())
+            else:
+                busy -= 1
+        if now[0] >= seconds:
+            continue
+        started = None
+        if limited:
+            try:
+                started = limiter.acquire(Priority.API)
+            except Overloaded:
+                # Retried after a pause, without reaching the service
+                heapq.heappush(
+                    events,
+                    (now[0] + SERVICE_SECONDS, next(order), client, None, None),
+                )
+                continue
+        if busy < WORKERS:
+            busy += 1
+            serve(client, now[0], started)
+        else:
+            queue.append((client, now[0], started))
+
+    latencies.sort()
+    return len(latencies) / seconds, latencies[int(len(latencies) * 0.99)]
+
+
+def test_goodput_and_latency_hold_under_10x_overload():
+    goodput, p99 = _load(WORKERS, limited=True)
+    overload_goodput, overload_p99 = _load(10 * WORKERS, limited=True)
+    _, unlimited_p99 = _load(10 * WORKERS, limited=False)
+
+    assert overload_goodput >= 0.8 * goodput
+    # Admitted requests stay near the target instead of queueing
+    assert overload_p99 <= 2 * TARGET_MS / 1000
+    assert unlimited_p99 >= 2 * overload_p99
+
+
+def test_shed_requests_get_retry_after(monkeypatch):
+    limiter = AdaptiveLimiter(initial=2, min_limit=1, max_limit=2, test_share=0.5)
+    monkeypatch.setattr(trigger_router, "admission_limiter", limiter)
+    trigger = {"name": str(uuid.uuid4()), "trigger_type": "api", "payload": "{}"}
+
+    with limiter.hold():
+        response = client.post("/triggers/test/", json=trigger)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        assert client.get("/triggers/?limit=1").status_code == 200
+        with limiter.hold():
+            response = client.get("/triggers/?limit=1")
+            assert response.status_code == 503
+            assert "Retry-After" in response.headers
+    assert limiter.in_flight == 0
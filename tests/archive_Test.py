@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import app
+from app.crud.event import add_event_logs, compact_event_logs, expire_event_logs
+from app.routers import event_log
+from app.services import archive as archive_module
+from app.services.archive import EventArchive
+from app.services.db import Base
+from app.services.partitions import event_log_partitions
+from app.services.trigger_scheduler import TriggerScheduler
+
+client = TestClient(app)
+START = datetime(2026, 3, 1)
+HOUR = timedelta(hours=1)
+
+
+def make_session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def log(triggered_at, name="report", trigger_id=1, is_test=False):
+    return {
+        "trigger_id": trigger_id,
+        "triggered_at": triggered_at,
+        "trigger_type": "scheduled",
+        "name": name,
+        "payload": "{}",
+        "is_test": is_test,
+    }
+
+
+def test_segment_analytics(tmp_path):
+    archive = EventArchive(str(tmp_path))
+    archive.write(
+        START,
+        START + 6 * HOUR,
+        [
+            # Out of order, as rows come back from a union of tables
+            (2, START + 2 * HOUR, "api", "digest", False),
+            (1, START, "scheduled", "report", False),
+            (1, START + HOUR, "scheduled", "report", False),
+            (None, START + HOUR, "api", "report", True),
+        ],
+    )
+    archive.write(
+        START + 6 * HOUR,
+        START + 12 * HOUR,
+        [(1, START + 7 * HOUR, "scheduled", "report", False)],
+    )
+    end = START + 12 * HOUR
+
+    assert archive.counts(START, end) == [("report", 3), ("digest", 1)]
+    assert archive.counts(START, end, by="trigger_type", include_tests=True) == [
+        ("scheduled", 3),
+        ("api", 2),
+    ]
+    assert dict(archive.counts(START, end, by="trigger_id", include_tests=True)) == {
+        1: 3,
+        2: 1,
+        None: 1,
+    }
+    # Ranges cut through segments
+    assert archive.counts(START + HOUR, START + 7 * HOUR) == [
+        ("report", 1),
+        ("digest", 1),
+    ]
+
+    histogram = archive.histogram(START, end, 3 * HOUR, name="report")
+    assert histogram == [
+        (START, 2),
+        (START + 3 * HOUR, 0),
+        (START + 6 * HOUR, 1),
+        (START + 9 * HOUR, 0),
+    ]
+    assert archive.trigger_rates(START, end) == [(1, 3, 0.25), (2, 1, 0.083)]
+
+
+def test_sealed_partitions_are_archived_before_they_are_dropped(tmp_path):
+    Session = make_session_factory()
+    archive = EventArchive(str(tmp_path))
+    now = datetime.utcnow()
+    with Session() as db:
+        partitions = event_log_partitions(db)
+        period = partitions.period
+        old = now - timedelta(days=3)
+        add_event_logs(db, [log(old), log(old, name="digest"), log(now)])
+        db.commit()
+
+        # Partitions are kept until archived
+        assert expire_event_logs(db, now - period, now, archived=archive.has) == []
+
+    scheduler = TriggerScheduler(session_factory=Session, archive=archive)
+    scheduler.remove_old_logs()
+
+    with Session() as db:
+        periods = partitions.periods(db)
+    assert archive.has(partitions.period_start(old))
+    # The period still being written is neither archived nor dropped
+    assert not archive.has(periods[0]) and periods[0] <= now < periods[0] + period
+    assert archive.counts(now - timedelta(days=7), now) == [
+        ("report", 1),
+        ("digest", 1),
+    ]
+
+
+def test_prune_opens_each_segment_once(tmp_path, monkeypatch):
+    archive = EventArchive(str(tmp_path))
+    for period in range(4):
+        start = START + period * 6 * HOUR
+        archive.write(start, start + 6 * HOUR, [])
+    opened = []
+
+    class CountingSegment(archive_module.Segment):
+        def __init__(self, path):
+            opened.append(path)
+            super().__init__(path)
+
+    monkeypatch.setattr(archive_module, "Segment", CountingSegment)
+    cutoff = START + 9 * HOUR
+    assert archive.prune(cutoff) == 1
+    # The segment the cutoff falls in is kept, and remembered
+    assert archive.prune(cutoff) == 0
+    assert opened == [archive.path(START), archive.path(START + 6 * HOUR)]
+    assert archive._starts() == [START + period * 6 * HOUR for period in (1, 2, 3)]
+
+
+def test_empty_period_is_archived(tmp_path):
+    Session = make_session_factory()
+    archive = EventArchive(str(tmp_path))
+    with Session() as db:
+        event_log_partitions(db).ensure(db, START)
+        db.commit()
+        assert compact_event_logs(db, archive, START + timedelta(days=1)) == [START]
+    assert archive.counts(START, START + timedelta(days=1)) == []
+    assert archive.histogram(START, START + 2 * HOUR, HOUR) == [
+        (START, 0),
+        (START + HOUR, 0),
+    ]
+
+
+def test_analytics_endpoints(tmp_path, monkeypatch):
+    archive = EventArchive(str(tmp_path))
+    archive.write(
+        START, START + 6 * HOUR, [(5, START + HOUR, "api", "billing", False)]
+    )
+    monkeypatch.setattr(event_log, "event_archive", archive)
+    span = {"start": "2026-03-01T00:00:00Z", "end": "2026-03-01T06:00:00Z"}
+
+    response = client.get("/event-logs/analytics/counts", params=span)
+    assert response.json() == [{"key": "billing", "count": 1}]
+
+    response = client.get(
+        "/event-logs/analytics/histogram", params={**span, "bucket_seconds": 7200}
+    )
+    assert [bucket["count"] for bucket in response.json()] == [1, 0, 0]
+
+    response = client.get("/event-logs/analytics/rates", params=span)
+    assert response.json() == [{"trigger_id": 5, "count": 1, "per_hour": 0.167}]
+
+    response = client.get(
+        "/event-logs/analytics/histogram",
+        params={"start": "2020-01-01T00:00:00", "bucket_seconds": 60},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,85 @@
+import asyncio
+import json
+from app.services import trigger_scheduler
+from app.services.batching import WebhookBatcher
+from app.services.trigger_scheduler import TriggerScheduler
+from benchmarks.stubs import WebhookStub
+
+
+def message(content: str) -> bytes:
+    return json.dumps({"content": content}).encode()
+
+
+class Recorder:
+    def __init__(self, result=None):
+        self.result = result or {"success": True}
+        self.sent = []
+
+    async def __call__(self, url, body):
+        self.sent.append((url, json.loads(body)))
+        return self.result
+
+
+def test_bodies_are_combined_per_destination():
+    async def main():
+        send = Recorder()
+        batcher = WebhookBatcher(send, window_ms=20, max_size=10)
+        results = await asyncio.gather(
+            *(batcher.submit("a", message(f"a{i}")) for i in range(3)),
+            batcher.submit("b", message("b0")),
+            batcher.submit("a", b'{"embeds": []}'),
+        )
+        assert results == [{"success": True}] * 5
+        assert sorted(send.sent, key=str) == [
+            ("a", {"content": "a0\na1\na2"}),
+            ("a", {"embeds": []}),
+            ("b", {"content": "b0"}),
+        ]
+        assert (batcher.requests, batcher.bodies) == (3, 5)
+
+    asyncio.run(main())
+
+
+def test_batches_are_cut_at_max_size_and_content_limit():
+    async def main():
+        send = Recorder({"success": False, "error": "rate limited"})
+        # A full batch goes out without waiting for the window
+        batcher = WebhookBatcher(send, window_ms=10_000, max_size=2, max_content=10)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit("a", message("1234")) for _ in range(2))),
+            timeout=1,
+        )
+        # Every body gets the result of the request that carried it
+        assert results == [{"success": False, "error": "rate limited"}] * 2
+        assert send.sent == [("a", {"content": "1234\n1234"})]
+
+        send.sent.clear()
+        batcher = WebhookBatcher(send, window_ms=10, max_size=10, max_content=10)
+        await asyncio.gather(
+            *(batcher.submit("a", message(text)) for text in ("12345", "6789", "0"))
+        )
+        assert send.sent == [("a", {"content": "12345\n6789"}), ("a", {"content": "0"})]
+
+    asyncio.run(main())
+
+
+def test_scheduler_sends_fires_in_one_request(monkeypatch):
+    async def main():
+        stub = WebhookStub()
+        monkeypatch.setattr(trigger_scheduler, "url", await stub.start())
+        scheduler = TriggerScheduler(batch_window_ms=50)
+        results = await asyncio.gather(
+            *(
+                scheduler._handle_http_request(f'"fire {i}"', False, i)
+                for i in range(5)
+            )
+        )
+        assert all(result["success"] for result in results)
+        assert stub.requests == 1
+        assert json.loads(stub.bodies[0])["content"].splitlines() == [
+            f"fire {i}" for i in range(5)
+        ]
+        await scheduler.close_http_session()
+        await stub.stop()
+
+    asyncio.run(main())
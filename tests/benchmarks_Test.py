@@ -0,0 +1,21 @@
+from benchmarks.results import compare
+
+
+def test_compare_flags_worse_metrics():
+    baseline = {"api.x": {"p50_ms": 10.0, "requests_per_sec": 100.0, "requests": 50}}
+    current = {"api.x": {"p50_ms": 12.0, "requests_per_sec": 95.0, "requests": 80}}
+    assert compare(current, baseline, 0.1) == ["api.x.p50_ms: 10 -> 12 (+20.0%)"]
+
+
+def test_compare_flags_new_errors():
+    baseline = {"api.x": {"errors": 0}}
+    assert compare({"api.x": {"errors": 3}}, baseline) == ["api.x.errors: 0 -> 3"]
+    assert compare({"api.x": {"errors": 0}}, baseline) == []
+
+
+def test_compare_reports_missing_results():
+    baseline = {"api.x": {"p50_ms": 1.0, "errors": 0}, "api.y": {"p50_ms": 1.0}}
+    assert compare({"api.x": {"p50_ms": 1.0}}, baseline) == [
+        "api.x.errors: missing from this run",
+        "api.y: missing from this run",
+    ]
@@ -0,0 +1,8 @@
+import pytest
+from initialize_db import initialize_database
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    # Bring the checked-in app.db up to the current models, as a deploy does
+    initialize_database()
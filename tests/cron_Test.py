@@ -0,0 +1,133 @@
+import random
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import pytest
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
+from app.models import Trigger
+from app.services.cron import (
+    CompiledCronTrigger,
+    compile_cron,
+    cron_trigger,
+    next_fire_times,
+)
+from app.services.clock import VirtualClock
+from app.services.trigger_scheduler import TriggerScheduler
+
+NOW = datetime(2026, 2, 27, 22, 58, 30, tzinfo=timezone.utc)
+
+
+def random_expression(rng):
+    def field(low, high):
+        kind = rng.random()
+        if kind < 0.4:
+            return "*"
+        if kind < 0.55:
+            return f"*/{rng.randint(2, 7)}"
+        first = rng.randint(low, high)
+        if kind < 0.75:
+            return str(first)
+        if kind < 0.9:
+            return f"{first}-{rng.randint(first, high)}"
+        return f"{first},{rng.randint(low, high)}"
+
+    return " ".join(
+        [field(0, 59), field(0, 23), field(1, 31), field(1, 12), field(0, 6)]
+    )
+
+
+def test_matches_apscheduler():
+    rng = random.Random(7)
+    for _ in range(300):
+        expression = random_expression(rng)
+        start = NOW + timedelta(minutes=rng.randint(0, 500_000))
+        try:
+            reference = CronTrigger.from_crontab(expression, timezone=timezone.utc)
+        except ValueError:
+            with pytest.raises(ValueError):
+                compile_cron(expression)
+            continue
+        expected = reference.get_next_fire_time(None, start)
+        assert compile_cron(expression).next_fire(start) == expected, expression
+
+
+def test_next_fire_after_previous_fire():
+    trigger = cron_trigger("30 2 * * *", timezone.utc)
+    fired = datetime(2026, 3, 1, 2, 30, tzinfo=timezone.utc)
+    assert trigger.get_next_fire_time(fired, fired) == fired + timedelta(days=1)
+
+
+def test_named_values():
+    fire = compile_cron("15 9 * jan-mar mon-fri").next_fire(NOW)
+    assert fire == datetime(2026, 3, 2, 9, 15, tzinfo=timezone.utc)
+
+
+def test_identical_expressions_are_interned():
+    assert compile_cron("*/5 * * * *") is compile_cron(" */5  *  * * * ")
+
+
+def test_impossible_date_never_fires():
+    assert compile_cron("0 0 30 2 *").next_fire(NOW) is None
+
+
+def test_invalid_expressions():
+    for expression in ["* * * *", "60 * * * *", "* * * * 7", "*/0 * * * *", "* * * * */7"]:
+        with pytest.raises(ValueError):
+            compile_cron(expression)
+
+
+def test_batch_matches_single():
+    schedules = [compile_cron(e) for e in ["0 * * * *", "*/15 * * * *"] * 50]
+    assert next_fire_times(schedules, NOW) == [s.next_fire(NOW) for s in schedules]
+
+
+def test_scheduler_uses_compiled_schedules():
+    scheduler = TriggerScheduler(clock=VirtualClock(NOW), timezone=timezone.utc)
+    cron = Trigger(trigger_type="scheduled", schedule="0 * * * *")
+    job_trigger = scheduler.build_job_trigger(cron)
+    assert isinstance(job_trigger, CompiledCronTrigger)
+    assert job_trigger is scheduler.build_job_trigger(cron)
+
+    fallback = Trigger(trigger_type="scheduled", schedule="0 0 last * *")
+    assert isinstance(scheduler.build_job_trigger(fallback), CronTrigger)
+
+
+def test_one_shot_uses_run_date():
+    scheduler = TriggerScheduler(clock=VirtualClock(NOW), timezone=timezone.utc)
+    run_date = NOW + timedelta(hours=1, seconds=15)
+    job_trigger = scheduler.build_job_trigger(
+        Trigger(trigger_type="scheduled", schedule=run_date.replace(tzinfo=None))
+    )
+    assert isinstance(job_trigger, DateTrigger)
+    assert job_trigger.get_next_fire_time(None, NOW) == run_date
+
+    past = Trigger(trigger_type="scheduled", schedule=NOW - timedelta(minutes=1))
+    assert scheduler.build_job_trigger(past) is None
+
+
+def test_schedules_use_scheduler_timezone():
+    kolkata = ZoneInfo("Asia/Kolkata")
+    scheduler = TriggerScheduler(clock=VirtualClock(NOW), timezone=kolkata)
+    cron = scheduler.build_job_trigger(
+        Trigger(trigger_type="scheduled", schedule="0 9 * * *")
+    )
+    assert cron.get_next_fire_time(None, NOW) == datetime(2026, 2, 28, 9, tzinfo=kolkata)
+
+    run_date = datetime(2026, 3, 1, 12, 0)
+    one_shot = scheduler.build_job_trigger(
+        Trigger(trigger_type="scheduled", schedule=run_date)
+    )
+    assert one_shot.get_next_fire_time(None, NOW) == run_date.replace(tzinfo=kolkata)
+
+
+def test_plan_skips_unschedulable_triggers():
+    scheduler = TriggerScheduler(clock=VirtualClock(NOW), timezone=timezone.utc)
+    bad = Trigger(trigger_type="scheduled", schedule="not a cron")
+    bad.id = 1
+    good = Trigger(trigger_type="scheduled", schedule="0 * * * *")
+    good.id = 2
+    planned = scheduler.plan_job_triggers([bad, good])
+    assert planned[1] is None
+    job_trigger, next_run_time = planned[2]
+    assert isinstance(job_trigger, CompiledCronTrigger)
+    assert next_run_time == datetime(2026, 2, 27, 23, 0, tzinfo=timezone.utc)
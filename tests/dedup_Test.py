@@ -0,0 +1,119 @@
+from datetime import datetime
+from sqlalchemy import (
+    Column,
+    MetaData,
+    Table,
+    create_engine,
+    func,
+    insert,
+    inspect,
+    select,
+)
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.crud.event import add_event_logs, select_event_logs, upgrade_event_logs
+from app.models import EventLog, EventPayload, EventString
+from app.services.db import Base
+from app.services.partitions import event_log_partitions
+
+START = datetime(2026, 3, 1)
+PAYLOAD = '{"text": "' + "x" * 2048 + '"}'
+
+
+def make_session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def log(name="heartbeat", payload=PAYLOAD, second=0):
+    return {
+        "trigger_id": 1,
+        "triggered_at": START.replace(second=second),
+        "trigger_type": "scheduled",
+        "name": name,
+        "payload": payload,
+    }
+
+
+def count(db, model):
+    return db.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_repeated_names_and_payloads_are_stored_once():
+    Session = make_session_factory()
+    with Session() as db:
+        add_event_logs(db, [log(second=i) for i in range(30)])
+        add_event_logs(db, [log(payload=None), log(name="digest", payload="{}")])
+        db.commit()
+    with Session() as db:
+        add_event_logs(db, [log(second=59)])
+        db.commit()
+
+        assert count(db, EventString) == 3
+        assert count(db, EventPayload) == 2
+        rows = db.execute(select_event_logs(db)).all()
+        assert len(rows) == 33
+        assert {(row.name, row.trigger_type, row.payload) for row in rows} == {
+            ("heartbeat", "scheduled", PAYLOAD),
+            ("heartbeat", "scheduled", None),
+            ("digest", "scheduled", "{}"),
+        }
+
+
+def test_ids_of_a_rolled_back_insert_are_not_cached():
+    Session = make_session_factory()
+    with Session() as db:
+        add_event_logs(db, [log(name="first")])
+        db.rollback()
+    with Session() as db:
+        # SQLite hands the rolled-back id out again, to another name
+        add_event_logs(db, [log(name="second")])
+        db.commit()
+    with Session() as db:
+        add_event_logs(db, [log(name="first")])
+        db.commit()
+        query = select_event_logs(db, fields=("name", "trigger_type"))
+        assert sorted(db.execute(query).tuples()) == [
+            ("first", "scheduled"),
+            ("second", "scheduled"),
+        ]
+
+
+def test_partitions_from_before_dedup_are_upgraded():
+    Session = make_session_factory()
+    with Session() as db:
+        partitions = event_log_partitions(db)
+        name = partitions.name(START)
+        # The layout partitions had before deduplication
+        old = EventLog.__table__.c
+        legacy = Table(
+            name,
+            MetaData(),
+            *(Column(c.name, c.type, primary_key=c.primary_key) for c in old),
+        )
+        legacy.create(db.connection())
+        db.execute(insert(legacy), [{**log(second=i), "id": 10 + i} for i in range(3)])
+        db.commit()
+        assert partitions.legacy_periods(db) == [START]
+
+        upgrade_event_logs(db)
+        db.commit()
+        assert partitions.legacy_periods(db) == []
+        columns = inspect(db.connection()).get_columns(name)
+        assert "payload" not in {column["name"] for column in columns}
+        rows = db.execute(select_event_logs(db)).all()
+        assert [(row.id, row.payload) for row in rows] == [
+            (10, PAYLOAD),
+            (11, PAYLOAD),
+            (12, PAYLOAD),
+        ]
+
+        # New rows continue after the kept ids
+        add_event_logs(db, [log(second=30)])
+        ids = db.execute(select_event_logs(db, fields=("id",))).scalars().all()
+        assert len(set(ids)) == 4
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from app import app
+from app.crud.event import add_event_logs, select_event_logs
+from app.schemas import EventLogResponse
+from app.services.db import SessionLocal
+from app.utils.eventlogs import encode_log_rows
+
+client = TestClient(app)
+responses = TypeAdapter(list[EventLogResponse])
+
+
+def test_encoding_matches_response_model():
+    rows = [
+        (1, 2, "plain", "api", datetime(2026, 1, 1, 8, 30), "{}", False),
+        (
+            2,
+            3,
+            'quote " \\ é \n',
+            "scheduled",
+            datetime(2026, 1, 1, 8, 30, 0, 5),
+            '{"a": "b"}',
+            True,
+        ),
+    ]
+    fields = EventLogResponse.model_fields
+    models = [EventLogResponse(**dict(zip(fields, row))) for row in rows]
+    expected = responses.dump_python(models, mode="json")
+    assert json.loads(encode_log_rows(rows)) == expected
+
+
+def test_nullable_columns_encode_as_null():
+    body = encode_log_rows([(1, None, "n", "api", None, None, None)])
+    assert json.loads(body) == [
+        {
+            "id": 1,
+            "trigger_id": None,
+            "name": "n",
+            "trigger_type": "api",
+            "triggered_at": None,
+            "payload": None,
+            "is_test": None,
+        }
+    ]
+
+
+def test_archived_logs_endpoint():
+    triggered_at = datetime.utcnow() - timedelta(hours=3)
+    with SessionLocal() as db:
+        add_event_logs(
+            db,
+            [
+                {
+                    "trigger_id": 1,
+                    "trigger_type": "api",
+                    "name": "archived-log",
+                    "payload": '{"k": 1}',
+                    "triggered_at": triggered_at,
+                }
+            ],
+        )
+        db.commit()
+        (log_id,) = db.execute(
+            select_event_logs(
+                db,
+                fields=("id",),
+                start=triggered_at,
+                end=triggered_at + timedelta(microseconds=1),
+            )
+        ).first()
+
+    response = client.get("/event-logs/archived")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    logs = {log.id: log for log in responses.validate_python(response.json())}
+    assert logs[log_id].name == "archived-log"
+    assert logs[log_id].payload == '{"k": 1}'
@@ -0,0 +1,70 @@
+import asyncio
+import time
+import uuid
+from fastapi.testclient import TestClient
+from app import create_app
+from app.services import trigger_scheduler
+from app.services.executions import ExecutionStatus, ExecutionTracker
+from benchmarks.stubs import WebhookStub
+
+
+def test_tracker_runs_in_background_with_bounded_concurrency():
+    async def main():
+        tracker = ExecutionTracker(concurrency=1, history=2)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return {"success": True}
+
+        async def failing():
+            return {"success": False, "error": "webhook said no"}
+
+        first = tracker.submit(1, False, slow)
+        second = tracker.submit(2, False, failing)
+        assert first.status == ExecutionStatus.QUEUED
+        await asyncio.sleep(0.01)
+        # Only one slot: the second waits behind the first
+        assert first.status == ExecutionStatus.RUNNING
+        assert second.status == ExecutionStatus.QUEUED
+        assert (await tracker.wait(first, 0.01)).status == ExecutionStatus.RUNNING
+
+        release.set()
+        await tracker.join(timeout=1)
+        assert first.status == ExecutionStatus.SUCCEEDED
+        assert second.status == ExecutionStatus.FAILED
+        assert second.error == "webhook said no"
+        assert tracker.pending == 0
+
+        third = tracker.submit(3, True, failing)
+        assert tracker.get(first.id) is None
+        assert tracker.get(third.id) is third
+        await tracker.join()
+
+    asyncio.run(main())
+
+
+def test_api_trigger_returns_before_the_webhook(monkeypatch):
+    stub = WebhookStub(delay=0.5)
+    with TestClient(create_app()) as client:
+        monkeypatch.setattr(trigger_scheduler, "url", client.portal.call(stub.start))
+        trigger = {"name": str(uuid.uuid4()), "trigger_type": "api", "payload": "{}"}
+
+        started = time.perf_counter()
+        response = client.post("/triggers/", json=trigger)
+        assert time.perf_counter() - started < 0.4
+        assert response.status_code == 200
+        execution = response.json()["execution"]
+        assert execution["status"] in ("queued", "running")
+
+        status = client.get(f"/triggers/executions/{execution['id']}?wait=5").json()
+        assert status["status"] == "succeeded"
+        assert status["trigger_id"] == response.json()["id"]
+        assert stub.requests == 1
+
+        response = client.post("/triggers/test/?wait=5", json=trigger)
+        assert response.json()["execution"]["status"] == "succeeded"
+        assert response.json()["execution"]["is_test"]
+
+        assert client.get("/triggers/executions/unknown").status_code == 404
+        client.portal.call(stub.stop)
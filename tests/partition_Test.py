@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.crud.event import add_event_logs, expire_event_logs, select_event_logs
+from app.models import Trigger
+from app.services.archive import EventArchive
+from app.services.db import Base
+from app.services.partitions import event_log_partitions
+from app.services.trigger_scheduler import TriggerScheduler
+
+START = datetime(2026, 3, 1)
+
+
+def make_session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def log(triggered_at, name="log"):
+    return {
+        "trigger_id": 1,
+        "triggered_at": triggered_at,
+        "trigger_type": "scheduled",
+        "name": name,
+        "payload": "{}",
+    }
+
+
+def test_logs_are_routed_to_their_period():
+    Session = make_session_factory()
+    with Session() as db:
+        partitions = event_log_partitions(db)
+        period = partitions.period
+        times = [START, START + period / 2, START + period, START + 2 * period]
+        add_event_logs(db, [log(moment) for moment in times])
+        db.commit()
+
+        assert partitions.periods(db) == [START, START + period, START + 2 * period]
+        ids = db.execute(select_event_logs(db, fields=("id",))).scalars().all()
+        assert len(set(ids)) == 4
+
+        # A range inside the second period reads that partition alone
+        query = select_event_logs(db, start=START + period, end=START + 2 * period)
+        sql = str(query)
+        assert partitions.name(START + period) in sql
+        assert partitions.name(START) not in sql
+        assert partitions.name(START + 2 * period) not in sql
+        rows = db.execute(query).all()
+        assert [row.triggered_at for row in rows] == [START + period]
+
+
+def test_expiry_drops_whole_partitions():
+    Session = make_session_factory()
+    with Session() as db:
+        partitions = event_log_partitions(db)
+        period = partitions.period
+        now = START + 10 * period
+        add_event_logs(db, [log(START), log(START + period), log(START + period * 2)])
+        db.commit()
+
+        # The cutoff falls inside the third period, which is kept whole
+        cutoff = START + period * 2.5
+        assert expire_event_logs(db, cutoff, now) == [START, START + period]
+        db.commit()
+
+        assert partitions.periods(db) == [START + 2 * period, now + period]
+        rows = db.execute(select_event_logs(db, fields=("triggered_at",))).all()
+        assert rows == [(START + 2 * period,)]
+
+
+def test_partition_created_in_rolled_back_transaction_is_recreated():
+    Session = make_session_factory()
+    with Session() as db:
+        add_event_logs(db, [log(START)])
+        db.rollback()
+        add_event_logs(db, [log(START, name="kept")])
+        db.commit()
+    with Session() as db:
+        add_event_logs(db, [log(START, name="next")])
+        db.commit()
+        names = db.execute(select_event_logs(db, fields=("name",))).scalars()
+        assert sorted(names) == ["kept", "next"]
+
+
+def test_scheduler_writes_and_expires_through_partitions(tmp_path):
+    Session = make_session_factory()
+    archive = EventArchive(str(tmp_path))
+    scheduler = TriggerScheduler(session_factory=Session, archive=archive)
+    trigger = Trigger(name="fired", trigger_type="scheduled", payload="{}")
+    trigger.id = 1
+    with Session() as db:
+        add_event_logs(db, [log(datetime.utcnow() - timedelta(days=5), "expired")])
+        db.commit()
+
+    asyncio.run(scheduler._execute_trigger(trigger))
+    scheduler.remove_old_logs()
+
+    with Session() as db:
+        names = db.execute(select_event_logs(db, fields=("name",))).scalars()
+        assert list(names) == ["fired"]
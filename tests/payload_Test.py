@@ -0,0 +1,82 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+import pytest
+from app.models import Trigger
+from app.services import trigger_scheduler
+from app.services.clock import VirtualClock
+from app.services.payload import compile_payload
+from app.services.trigger_scheduler import TriggerScheduler
+from benchmarks.stubs import WebhookStub
+
+FIRE_TIME = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def legacy_body(payload, test):
+    value = json.loads(payload)
+    if test and isinstance(value, dict):
+        value = {**value, "test": True}
+    content = json.dumps(value) if isinstance(value, dict) else str(value)
+    return json.dumps({"content": content}).encode()
+
+
+def test_body_matches_previous_format():
+    for payload in ['{"a": 1, "b": "é"}', "[1, 2]", '"text"', "{}"]:
+        for test in (False, True):
+            compiled = compile_payload(payload, test)
+            assert compiled.render(FIRE_TIME, 1, 1) == legacy_body(payload, test)
+
+
+def test_identical_payloads_compile_once():
+    assert compile_payload('{"a": 1}') is compile_payload('{"a": 1}')
+    assert compile_payload('{"a": 1}').render(FIRE_TIME, 1, 1) is compile_payload(
+        '{"a": 1}'
+    ).body
+
+
+def test_template_variables():
+    compiled = compile_payload(
+        '{"msg": "#{{seq}} of {{ trigger_id }} at {{fire_time}} (100%)"}'
+    )
+    body = json.loads(compiled.render(FIRE_TIME, 42, 7))
+    assert json.loads(body["content"]) == {
+        "msg": "#7 of 42 at 2026-03-01T12:30:00+00:00 (100%)"
+    }
+
+
+def test_other_braces_are_sent_as_is():
+    payload = '{"msg": "{{nope}} {{ seq}} {{seq }}} 50%"}'
+    body = json.loads(compile_payload(payload).render(FIRE_TIME, 1, 3))
+    assert json.loads(body["content"]) == {"msg": "{{nope}} 3 3} 50%"}
+
+
+def test_invalid_payloads_are_rejected_on_save():
+    trigger = Trigger(name="t", trigger_type="api", payload='{"a": {{seq}}}')
+    with pytest.raises(ValueError, match="Payload must be valid JSON"):
+        trigger.validate_trigger()
+
+
+def test_dispatch_sends_rendered_body(monkeypatch):
+    async def main():
+        stub = WebhookStub()
+        monkeypatch.setattr(trigger_scheduler, "url", await stub.start())
+        scheduler = TriggerScheduler(clock=VirtualClock(FIRE_TIME))
+        try:
+            for _ in range(2):
+                result = await scheduler._handle_http_request(
+                    '{"n": "{{seq}}"}', False, 5
+                )
+                assert result["success"]
+        finally:
+            await scheduler.close_http_session()
+            await stub.stop()
+        return [json.loads(body)["content"] for body in stub.bodies]
+
+    assert asyncio.run(main()) == ['{"n": "1"}', '{"n": "2"}']
+
+
+def test_removed_triggers_forget_their_fire_count():
+    scheduler = TriggerScheduler()
+    scheduler._fire_counts[5] = 3
+    scheduler.remove_trigger(5)
+    assert scheduler._fire_counts == {}
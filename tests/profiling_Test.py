@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fastapi.testclient import TestClient
+from app import app, create_app
+from app.routers import trigger as trigger_router
+from app.services import profiling
+from app.services.profiling import ProfilingConfig, span, format_server_timing, timed
+
+
+def profiled_client(monkeypatch):
+    monkeypatch.setattr(ProfilingConfig, "ENABLED", True)
+    monkeypatch.setattr(ProfilingConfig, "SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(ProfilingConfig, "DEBUG_TOKEN", "secret")
+    return TestClient(create_app())
+
+
+def test_span_is_noop_outside_profiled_request():
+    with span("anything") as s:
+        pass
+    assert s is span("other")
+
+
+def test_worker_threads_leave_the_sampler_after_their_span():
+    sampler = profiling.StackSampler(threading.get_ident())
+    seen = []
+
+    @timed("outer")
+    def work():
+        with span("inner"):
+            pass
+        seen.append(set(sampler.thread_ids))
+
+    def run():
+        profiling._spans.set({})
+        profiling._sampler.set(sampler)
+        work()
+        return threading.get_ident()
+
+    with ThreadPoolExecutor(1) as pool:
+        worker = pool.submit(run).result()
+    # The nested span keeps the worker attached until the outer one ends
+    assert seen == [{threading.get_ident(), worker}]
+    assert sampler.thread_ids == {threading.get_ident()}
+
+
+def test_format_server_timing():
+    header = format_server_timing({"cache.get": [0.002, 2]}, 0.005)
+    assert header == 'cache.get;dur=2.00;desc="x2", total;dur=5.00'
+
+
+def test_no_server_timing_when_disabled():
+    response = TestClient(app).get("/triggers/")
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+
+def test_server_timing_header(monkeypatch):
+    client = profiled_client(monkeypatch)
+    response = client.get("/triggers/")
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert "crud.get_all_triggers;dur=" in timing
+    assert "total;dur=" in timing
+
+
+def test_profiles_require_token(monkeypatch):
+    client = profiled_client(monkeypatch)
+    client.get("/triggers/")
+    assert client.get("/debug/profiles").status_code == 403
+    assert (
+        client.get("/debug/profiles", headers={"X-Debug-Token": "wrong"}).status_code
+        == 403
+    )
+
+
+def test_download_profile(monkeypatch):
+    client = profiled_client(monkeypatch)
+
+    # get_triggers is a sync endpoint, so it runs in a threadpool worker
+    @timed("crud.get_all_triggers")
+    def slow_get_all_triggers(db, **params):
+        time.sleep(0.05)
+        return []
+
+    monkeypatch.setattr(trigger_router, "get_all_triggers", slow_get_all_triggers)
+    client.get("/triggers/")
+    headers = {"X-Debug-Token": "secret"}
+    profiles = client.get("/debug/profiles", headers=headers).json()
+    assert profiles and profiles[0]["path"] == "/triggers/"
+    response = client.get(f"/debug/profiles/{profiles[0]['id']}", headers=headers)
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    assert "get_triggers (trigger.py" in response.text
+    assert profiles[0]["started_at"] < datetime.utcnow().isoformat()
@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Trigger, TriggerTombstone
+from app.services.db import Base
+from app.services.trigger_scheduler import TriggerScheduler
+
+
+def make_scheduler():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return TriggerScheduler(session_factory=sessionmaker(bind=engine))
+
+
+def insert(scheduler, **fields):
+    with scheduler.session_factory() as db:
+        trigger = Trigger(name="t", trigger_type="scheduled", payload="{}", **fields)
+        db.add(trigger)
+        db.commit()
+        return trigger.id
+
+
+def update(scheduler, trigger_id, **fields):
+    with scheduler.session_factory() as db:
+        trigger = db.get(Trigger, trigger_id)
+        for key, value in fields.items():
+            setattr(trigger, key, value)
+        db.commit()
+
+
+def run(scheduler, steps):
+    async def main():
+        await scheduler.start()
+        scheduler.scheduler.pause()
+        try:
+            await steps()
+        finally:
+            scheduler.shutdown()
+
+    asyncio.run(main())
+
+
+def test_payload_change_keeps_job_and_phase():
+    scheduler = make_scheduler()
+    trigger_id = insert(scheduler, is_recurring=True, interval_seconds=3600)
+
+    async def steps():
+        job = scheduler.active_jobs[trigger_id]["job"]
+        next_run = job.next_run_time
+        update(scheduler, trigger_id, payload='{"v": 2}', name="renamed")
+        await scheduler.reconcile()
+        assert scheduler.active_jobs[trigger_id]["job"] is job
+        assert job.next_run_time == next_run
+        assert job.args[0].payload == '{"v": 2}'
+        assert job.args[0].name == "renamed"
+
+    run(scheduler, steps)
+
+
+def test_timing_change_reschedules():
+    scheduler = make_scheduler()
+    trigger_id = insert(scheduler, is_recurring=True, interval_seconds=3600)
+
+    async def steps():
+        update(scheduler, trigger_id, interval_seconds=60)
+        await scheduler.reconcile()
+        job = scheduler.scheduler.get_job(str(trigger_id))
+        assert job.trigger.interval == timedelta(seconds=60)
+
+    run(scheduler, steps)
+
+
+def test_external_insert_and_delete_are_picked_up():
+    scheduler = make_scheduler()
+
+    async def steps():
+        trigger_id = insert(scheduler, is_recurring=True, interval_seconds=60)
+        await scheduler.reconcile()
+        assert scheduler.scheduler.get_job(str(trigger_id)) is not None
+
+        with scheduler.session_factory() as db:
+            db.delete(db.get(Trigger, trigger_id))
+            db.add(TriggerTombstone(trigger_id=trigger_id))
+            db.commit()
+        await scheduler.reconcile()
+        assert scheduler.scheduler.get_job(str(trigger_id)) is None
+        assert trigger_id not in scheduler.active_jobs
+
+    run(scheduler, steps)
+
+
+def test_reconcile_reads_only_changed_rows():
+    scheduler = make_scheduler()
+    with scheduler.session_factory() as db:
+        old = datetime.utcnow() - timedelta(hours=1)
+        db.add_all(
+            Trigger(
+                name=f"t{i}",
+                trigger_type="scheduled",
+                is_recurring=True,
+                interval_seconds=60,
+                payload="{}",
+                updated_at=old - timedelta(minutes=i),
+            )
+            for i in range(200)
+        )
+        db.commit()
+
+    loaded = []
+
+    def on_load(target, context):
+        loaded.append(target.id)
+
+    event.listen(Trigger, "load", on_load)
+
+    async def steps():
+        loaded.clear()
+        await scheduler.reconcile()
+        # Only the overlap window behind the latest change is re-read
+        assert loaded == [1]
+        update(scheduler, 7, payload='{"v": 2}')
+        loaded.clear()
+        await scheduler.reconcile()
+        assert sorted(loaded) == [1, 7]
+        loaded.clear()
+        await scheduler.reconcile()
+        assert loaded == [7]
+
+    try:
+        run(scheduler, steps)
+    finally:
+        event.remove(Trigger, "load", on_load)
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app.models import Trigger
+from app.services.simulation import SchedulerSimulation
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def make_trigger(trigger_id, **fields):
+    trigger = Trigger(name=f"sim-{trigger_id}", payload="{}", **fields)
+    trigger.id = trigger_id
+    return trigger
+
+
+def test_interval_trigger_keeps_phase():
+    sim = SchedulerSimulation(START)
+    sim.add_trigger(
+        make_trigger(1, trigger_type="scheduled", is_recurring=True, interval_seconds=3600)
+    )
+    asyncio.run(sim.run(START + timedelta(days=30)))
+    fires = sim.fires_by_trigger()[1]
+    assert len(fires) == 30 * 24
+    assert fires[0] == START + timedelta(hours=1)
+    assert all(b - a == timedelta(hours=1) for a, b in zip(fires, fires[1:]))
+
+
+def test_one_shot_fires_once():
+    when = START + timedelta(days=3, hours=4, minutes=5)
+    sim = SchedulerSimulation(START)
+    sim.add_trigger(make_trigger(2, trigger_type="scheduled", schedule=when))
+    asyncio.run(sim.run(START + timedelta(days=30)))
+    assert sim.fires_by_trigger()[2] == [when]
+
+
+def test_cron_trigger_fires_daily():
+    sim = SchedulerSimulation(START)
+    sim.add_trigger(make_trigger(3, trigger_type="scheduled", schedule="30 2 * * *"))
+    asyncio.run(sim.run(START + timedelta(days=31)))
+    fires = sim.fires_by_trigger()[3]
+    assert len(fires) == 31
+    assert all(f.hour == 2 and f.minute == 30 for f in fires)
+
+
+def test_month_replays_in_order_with_stubbed_sinks():
+    sim = SchedulerSimulation(START)
+    for i in range(50):
+        sim.add_trigger(
+            make_trigger(
+                100 + i,
+                trigger_type="scheduled",
+                is_recurring=True,
+                interval_seconds=900 + i * 60,
+            )
+        )
+    records = asyncio.run(sim.run(START + timedelta(days=30)))
+    times = [r.scheduled_at for r in records]
+    assert times == sorted(times)
+    assert sim.sink.event_logs == len(records)
+    assert sim.clock.now() == START + timedelta(days=30)
+    assert sim.stats()["fires"] == len(records)
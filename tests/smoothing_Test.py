@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app import app
+from app.models import Trigger
+from app.services.simulation import SchedulerSimulation
+from app.services.smoothing import DispatchSmoother, jitter_offset
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+TRIGGERS = 600
+JITTER_SECONDS = 120
+
+
+def make_trigger(trigger_id, **fields):
+    trigger = Trigger(
+        name=f"herd-{trigger_id}", payload="{}", trigger_type="scheduled", **fields
+    )
+    trigger.id = trigger_id
+    return trigger
+
+
+def test_jitter_is_a_fixed_offset_within_the_window():
+    offsets = [jitter_offset(i, 60) for i in range(1000)]
+    assert offsets == [jitter_offset(i, 60) for i in range(1000)]
+    assert all(timedelta(0) <= offset < timedelta(seconds=60) for offset in offsets)
+    assert len(set(offsets)) > 900
+    assert jitter_offset(1, 0) == timedelta(0)
+
+    sim = SchedulerSimulation(START)
+    sim.add_trigger(make_trigger(7, schedule="0 * * * *", jitter_seconds=60))
+    sim.add_trigger(
+        make_trigger(8, is_recurring=True, interval_seconds=600, jitter_seconds=60)
+    )
+    asyncio.run(sim.run(START + timedelta(hours=3)))
+    fires = sim.fires_by_trigger()
+    # The same offset past every unjittered fire
+    assert fires[7] == [
+        START + timedelta(hours=h) + jitter_offset(7, 60) for h in range(3)
+    ]
+    assert fires[8][0] == START + timedelta(minutes=10) + jitter_offset(8, 60)
+    assert all(b - a == timedelta(minutes=10) for a, b in zip(fires[8], fires[8][1:]))
+
+
+def test_smoother_paces_a_burst_within_each_budget():
+    smoother = DispatchSmoother(rate=5)
+    delays = [smoother.delay(START, budget=1.0) for _ in range(8)]
+    assert delays == [0.0, 0.2, 0.4, 0.6, 0.8, 1.0, 1.0, 1.0]
+    assert (smoother.delayed, smoother.overflow) == (7, 2)
+    # Slots taken by the burst do not delay a fire after it
+    assert smoother.delay(START + timedelta(seconds=5), budget=1.0) == 0.0
+
+
+def test_herd_is_spread_within_allowed_lateness():
+    def run(jitter_seconds, dispatch_rate):
+        sim = SchedulerSimulation(START, dispatch_rate=dispatch_rate)
+        for i in range(TRIGGERS):
+            sim.add_trigger(
+                make_trigger(i, schedule="0 * * * *", jitter_seconds=jitter_seconds)
+            )
+        asyncio.run(sim.run(START + timedelta(hours=5, minutes=30)))
+        return sim
+
+    herd = run(jitter_seconds=0, dispatch_rate=0)
+    smoothed = run(jitter_seconds=JITTER_SECONDS, dispatch_rate=10)
+    before = herd.load()["dispatched"]
+    after = smoothed.load()["dispatched"]
+    assert before["peak_per_sec"] == TRIGGERS
+    assert len(smoothed.fire_log) == len(herd.fire_log) == 6 * TRIGGERS
+    assert after["peak_per_sec"] <= 10
+    assert after["peak_to_average"] * 50 <= before["peak_to_average"]
+
+    for record in smoothed.fire_log:
+        top_of_hour = record.dispatched_at.replace(minute=0, second=0, microsecond=0)
+        lateness = record.dispatched_at - top_of_hour
+        assert lateness <= timedelta(seconds=JITTER_SECONDS)
+    stats = smoothed.scheduler.dispatch_stats()
+    assert 0 < stats["max_lateness_ms"] <= JITTER_SECONDS * 1000
+
+
+def test_dispatch_metrics_endpoint():
+    response = TestClient(app).get("/metrics/dispatch")
+    assert response.status_code == 200
+    assert {"fires", "peak_to_average", "max_lateness_ms"} <= set(response.json())
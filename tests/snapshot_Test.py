@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.crud.event import select_event_logs
+from app.models import Trigger
+from app.services.clock import SystemClock
+from app.services.db import Base
+from app.services.snapshot import JobState, read_snapshot, write_snapshot
+from app.services.trigger_scheduler import TriggerScheduler
+
+
+class ShiftedClock(SystemClock):
+    """The wall clock, some hours ahead: a restart after a long outage."""
+
+    def __init__(self, hours: float):
+        self.offset = timedelta(hours=hours)
+
+    def now(self) -> datetime:
+        return super().now() + self.offset
+
+
+def make_session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def insert(Session, **fields):
+    with Session() as db:
+        trigger = Trigger(name="t", trigger_type="scheduled", payload="{}", **fields)
+        db.add(trigger)
+        db.commit()
+        return trigger.id
+
+
+def run(scheduler, steps=None):
+    async def main():
+        await scheduler.start()
+        scheduler.scheduler.pause()
+        if steps:
+            await steps()
+        await scheduler.drain(timeout=1)
+
+    asyncio.run(main())
+
+
+def fires(Session, trigger_id):
+    with Session() as db:
+        query = select_event_logs(db, fields=("trigger_id",))
+        return db.execute(query).scalars().all().count(trigger_id)
+
+
+def test_snapshot_round_trip_and_corruption(tmp_path):
+    path = str(tmp_path / "scheduler.snapshot")
+    jobs = [
+        JobState(1, "cron", "{}", "*/5 * * * *", False, None, None),
+        JobState(
+            2,
+            "héllo",
+            '{"a": 1}',
+            None,
+            True,
+            60,
+            datetime(2026, 1, 1, 0, 0, 30, tzinfo=timezone.utc),
+            jitter_seconds=30,
+        ),
+        JobState(3, "once", "{}", datetime(2026, 2, 1, 9), False, None, None),
+    ]
+    write_snapshot(path, datetime(2026, 1, 1), jobs)
+    snapshot = read_snapshot(path)
+    assert snapshot.jobs == jobs
+    assert snapshot.watermark == datetime(2026, 1, 1)
+
+    with open(path, "r+b") as file:
+        file.truncate(40)
+    assert read_snapshot(path) is None
+    assert read_snapshot(str(tmp_path / "missing")) is None
+
+
+def test_warm_restart_keeps_phase_and_catches_up(tmp_path):
+    Session = make_session_factory()
+    path = str(tmp_path / "scheduler.snapshot")
+    now = datetime.now(timezone.utc)
+    interval_id = insert(Session, is_recurring=True, interval_seconds=3600)
+    once_at = now.replace(tzinfo=None) + timedelta(minutes=30)
+    once_id = insert(Session, schedule=once_at)
+
+    first = TriggerScheduler(session_factory=Session, snapshot_path=path)
+    phase = None
+
+    async def record_phase():
+        nonlocal phase
+        phase = first.active_jobs[interval_id]["job"].next_run_time
+
+    run(first, record_phase)
+    assert len(read_snapshot(path).jobs) == 2
+
+    # Back up two hours later: both were due while the scheduler was down
+    second = TriggerScheduler(
+        clock=ShiftedClock(hours=2), session_factory=Session, snapshot_path=path
+    )
+
+    async def catch_up():
+        await second._catch_up_task
+        job = second.active_jobs[interval_id]["job"]
+        # The next fire is on the old phase, not an interval after the restart
+        assert job.next_run_time > second.clock.now()
+        assert (job.next_run_time - phase) % timedelta(hours=1) == timedelta(0)
+        assert once_id not in second.active_jobs
+
+    run(second, catch_up)
+    # Each missed trigger fires once, however many fires it missed
+    assert fires(Session, interval_id) == 1
+    assert fires(Session, once_id) == 1
+    assert [job.trigger_id for job in read_snapshot(path).jobs] == [interval_id]
+
+
+def test_snapshot_is_validated_against_the_database(tmp_path):
+    Session = make_session_factory()
+    path = str(tmp_path / "scheduler.snapshot")
+    trigger_id = insert(Session, is_recurring=True, interval_seconds=3600)
+    run(TriggerScheduler(session_factory=Session, snapshot_path=path))
+
+    # Changed after the snapshot: reconciled on top of it
+    with Session() as db:
+        db.get(Trigger, trigger_id).interval_seconds = 60
+        db.commit()
+    restarted = TriggerScheduler(session_factory=Session, snapshot_path=path)
+
+    async def rescheduled():
+        job = restarted.scheduler.get_job(str(trigger_id))
+        assert job.trigger.interval == timedelta(seconds=60)
+
+    run(restarted, rescheduled)
+
+    # A snapshot of a newer database is not trusted
+    other = TriggerScheduler(session_factory=make_session_factory(), snapshot_path=path)
+
+    async def empty():
+        assert other.active_jobs == {}
+
+    run(other, empty)
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from app import create_app
+from app.models import Trigger
+from app.services.clock import VirtualClock
+from app.services.simulation import SimulatedTriggerScheduler, SimulationSink
+from app.services.trigger_scheduler import SchedulerState, scheduler
+
+# Cold `import app` in a fresh interpreter (best of a few runs)
+IMPORT_SECONDS_BUDGET = float(os.getenv("IMPORT_SECONDS_BUDGET", "1.5"))
+# Peak bytes allocated by Python code while importing, per tracemalloc
+IMPORT_MB_BUDGET = float(os.getenv("IMPORT_MB_BUDGET", "40"))
+# Only needed on first use, never while importing
+LAZY_MODULES = ["requests", "aiohttp", "jinja2", "numpy"]
+
+PROBE = """
+import json, sys, threading, time, tracemalloc
+trace = sys.argv[1] == "trace"
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+import app
+from app.services.cache import cache_client
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "peak_mb": tracemalloc.get_traced_memory()[1] / 2**20 if trace else 0,
+    "modules": [m for m in %r if m in sys.modules],
+    "threads": threading.active_count(),
+    "cache_client_built": cache_client._client is not None,
+}))
+""" % (LAZY_MODULES,)
+
+
+def probe(mode):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, mode],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_is_within_budget():
+    runs = [probe("time") for _ in range(3)]
+    seconds = min(run["seconds"] for run in runs)
+    assert seconds < IMPORT_SECONDS_BUDGET, f"import app took {seconds:.2f}s"
+
+    traced = probe("trace")
+    assert traced["peak_mb"] < IMPORT_MB_BUDGET, f"{traced['peak_mb']:.1f} MB"
+    assert traced["modules"] == []
+    assert traced["threads"] == 1
+    assert not traced["cache_client_built"]
+
+
+def test_readiness_follows_scheduler_lifecycle():
+    app = create_app()
+    assert TestClient(app).get("/ready").status_code == 503
+
+    with TestClient(app) as client:
+        for _ in range(100):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+            client.portal.call(asyncio.sleep, 0.05)
+        assert response.json() == {"status": "ready"}
+    assert scheduler.state == SchedulerState.STOPPED
+    assert TestClient(app).get("/ready").json() == {"status": "stopped"}
+
+
+def test_drain_waits_for_running_executions():
+    class SlowWebhookScheduler(SimulatedTriggerScheduler):
+        async def _handle_http_request(self, payload, test, trigger_id):
+            await asyncio.sleep(0.2)
+            return await super()._handle_http_request(payload, test, trigger_id)
+
+    async def main():
+        clock = VirtualClock(datetime(2026, 3, 1, tzinfo=timezone.utc))
+        slow = SlowWebhookScheduler(clock, SimulationSink())
+        slow.scheduler.start()
+        slow.state = SchedulerState.READY
+        trigger = Trigger(name="slow", trigger_type="api", payload="{}")
+        trigger.id = 1
+        execution = asyncio.create_task(slow._execute_trigger(trigger))
+        await asyncio.sleep(0.01)
+
+        drain = asyncio.create_task(slow.drain(timeout=5))
+        await asyncio.sleep(0.05)
+        assert slow.state == SchedulerState.DRAINING
+        await drain
+        assert execution.done()
+        assert slow.state == SchedulerState.STOPPED
+        assert slow.sink.webhook_requests == 1
+
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app import app
+from app.models import Trigger
+from app.services.db import SessionLocal, engine
+
+client = TestClient(app)
+
+
+def create_triggers(count):
+    for _ in range(count):
+        response = client.post(
+            "/triggers/",
+            json={
+                "name": str(uuid.uuid4()),
+                "trigger_type": "scheduled",
+                "is_recurring": True,
+                "interval_seconds": 3600,
+                "payload": "{}",
+            },
+        )
+        assert response.status_code == 200
+
+
+def count_statements(func):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return result, statements
+
+
+def test_unchanged_poll_is_304_without_reading_rows():
+    create_triggers(1)
+    first = client.get("/triggers/")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    for _ in range(3):
+        response, statements = count_statements(
+            lambda: client.get("/triggers/", headers={"If-None-Match": etag})
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        # Only the version: a count and a max over the index, no rows
+        assert len(statements) == 1
+        assert "count(" in statements[0] and "max(" in statements[0]
+
+
+def test_write_changes_etag():
+    etag = client.get("/triggers/").headers["etag"]
+    create_triggers(1)
+    response = client.get("/triggers/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_write_from_another_process_changes_etag():
+    etag = client.get("/triggers/").headers["etag"]
+    # Not through the API, as another worker or a script would write
+    with SessionLocal() as db:
+        db.add(Trigger(name=str(uuid.uuid4()), trigger_type="api", payload="{}"))
+        db.commit()
+    response = client.get("/triggers/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    etag = response.headers["etag"]
+    with SessionLocal() as db:
+        db.delete(db.query(Trigger).order_by(Trigger.id.desc()).first())
+        db.commit()
+    response = client.get("/triggers/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_keyset_pagination_follows_link():
+    create_triggers(5)
+    everything = client.get("/triggers/").json()
+    pages, url = [], "/triggers/?limit=2"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.extend(response.json())
+        url = response.links.get("next", {}).get("url")
+    assert pages == everything
+
+
+def test_field_selection():
+    create_triggers(1)
+    rows = client.get("/triggers/?fields=name,interval_seconds&limit=1").json()
+    assert rows and set(rows[0]) == {"name", "interval_seconds"}
+
+    response = client.get("/triggers/?fields=name,secret")
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+
+def test_large_listing_is_compressed():
+    create_triggers(20)
+    response = client.get("/triggers/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) >= 20